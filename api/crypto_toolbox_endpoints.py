@@ -44,102 +44,329 @@ Scrapes crypto-toolbox.vercel.app indicators with Playwright and exposes them vi
 - `cache_age_seconds` = 0 when freshly scraped
 
 ## Dependencies
-- Playwright (async_api) for browser automation
+- httpx + orjson for the direct HTTP path (`CRYPTO_TOOLBOX_API_URL`)
+- Playwright (async_api) for browser automation (fallback path)
 - Chromium browser installed via `playwright install chromium`
 
+## Fetch Strategy
+- If `CRYPTO_TOOLBOX_API_URL` points to the upstream JSON/XHR payload, rows are
+  fetched directly with a shared `httpx.AsyncClient` (no Chromium, no hydration wait)
+- Playwright is only used when the HTTP path is disabled, returns non-200 or
+  the payload does not match the expected schema
+
 ## Lifecycle
 - Browser launched at startup (shared across requests)
+- Pool of pre-created BrowserContexts (one per concurrency slot), each
+  recycled after CONTEXT_MAX_USES scrapes to bound memory growth
+- Images, fonts, media and stylesheets are blocked on every pooled context
+- Browser health tracked by a background watcher task (+ disconnect event),
+  so the request path only reads a flag
 - Browser closed at shutdown
-- Semaphore(2) to limit concurrent scraping
+- Event loop: run the worker with `uvicorn --loop uvloop --http httptools`
+  (Linux; both ship with uvicorn[standard]) for faster async HTTP and CDP
+  WebSocket traffic. The loop must be chosen by Uvicorn before startup, so it
+  is not installed from startup_playwright
+- Semaphore(SCRAPE_CONCURRENCY) to limit concurrent Playwright pages
+  (`CRYPTO_TOOLBOX_CONCURRENCY`, default 8; the context pool has the same size).
+  Sizing: ~100 MB of Chromium RSS headroom per page, aim for
+  min(cpu_cores * 2, 8). The direct HTTP path does not use the semaphore
+
+## Multi-Worker Mode (opt-in)
+- `CRYPTO_TOOLBOX_SHARED_BROWSER=1`: one worker (owner of a file lock) launches
+  Chromium with `--remote-debugging-port=CRYPTO_TOOLBOX_CDP_PORT` and publishes
+  the endpoint; other workers attach with `connect_over_cdp` instead of
+  launching their own browser (single Chromium for N Uvicorn workers)
+
+## Metrics (Prometheus, exposed on /metrics when enabled in api/main.py)
+- `crypto_toolbox_cache_hits_total{source}`: memory / memory_stale / redis / redis_stale
+- `crypto_toolbox_cache_misses_total`: requests that had to wait for a scrape
+- `crypto_toolbox_coalesced_waiters_total`: misses served by an in-flight scrape
+- `crypto_toolbox_not_modified_total`: 304 answers (ETag match)
+- `crypto_toolbox_fetch_total{path}`: http / playwright fetch path used
+- `crypto_toolbox_scrape_seconds`: scrape latency histogram
 
 ## Cache Strategy
 - In-memory cache (no Redis in dev)
 - TTL: 1800 seconds (30 minutes)
-- asyncio.Lock to prevent thundering herd on refresh
+- Stale-while-revalidate: between TTL and 2×TTL the stale payload is served
+  immediately (`cache_source` = `*_stale`, header `X-Cache: STALE`) while a
+  single background task refreshes it; requests only block on a cold cache
+- Single-flight refresh: concurrent misses share one in-flight scrape task
 - Force refresh via `force=true` query parameter
+- Prewarmed in the background at startup and right after `/cache/clear`
+- Disk snapshot (`CRYPTO_TOOLBOX_CACHE_FILE`): each fresh payload is written
+  atomically in a background thread and reloaded at startup if younger than
+  STALE_TTL, so restarts without Redis do not start cold
+- HTTP caching: weak `ETag` derived from the cached payload, `If-None-Match`
+  answered with `304 Not Modified`, `Cache-Control: max-age=30, stale-while-revalidate=1800`
 """
 
 import asyncio
-import json
+import contextlib
 import logging
+import operator
+import os
+import re
+import tempfile
 import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from pathlib import Path
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple, Union
+
+import httpx
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from filelock import FileLock, Timeout
+from prometheus_client import Counter, Histogram
 
-from fastapi import APIRouter, HTTPException, Query
-from playwright.async_api import async_playwright, Browser, Page
+from api.utils.cache import compute_etag, etag_matches
 
 logger = logging.getLogger(__name__)
 
+# Playwright is only needed for the browser fallback path
+try:
+    from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    Browser = BrowserContext = Page = Any
+    PLAYWRIGHT_AVAILABLE = False
+    logger.debug("Playwright not available, crypto-toolbox limited to HTTP path")
+
+# HTTP/2 requires the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # Optional Redis support
 try:
     import redis.asyncio as aioredis
-    from config.settings import get_settings
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
     logger.debug("Redis not available for crypto-toolbox caching")
 
+# Prometheus metrics (default registry)
+CACHE_HITS = Counter(
+    "crypto_toolbox_cache_hits_total",
+    "Crypto-toolbox requests served from cache",
+    ["source"]
+)
+CACHE_MISSES = Counter(
+    "crypto_toolbox_cache_misses_total",
+    "Crypto-toolbox requests that waited for a scrape"
+)
+COALESCED_WAITERS = Counter(
+    "crypto_toolbox_coalesced_waiters_total",
+    "Crypto-toolbox cache misses joined to an in-flight scrape"
+)
+NOT_MODIFIED = Counter(
+    "crypto_toolbox_not_modified_total",
+    "Crypto-toolbox requests answered 304 Not Modified"
+)
+FETCH_PATH = Counter(
+    "crypto_toolbox_fetch_total",
+    "Crypto-toolbox fetches by path",
+    ["path"]
+)
+SCRAPE_LATENCY = Histogram(
+    "crypto_toolbox_scrape_seconds",
+    "Crypto-toolbox scrape duration (fetch + parse)",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30)
+)
+
+
+class CacheEntry(NamedTuple):
+    """
+    Immutable memory cache snapshot.
+
+    Writers build a new entry and rebind `_cache_entry` in one assignment, so
+    readers never observe new data with old timestamps (no lock on the hit path).
+    Times use the monotonic clock and are precomputed at write time.
+    """
+    data: Dict[str, Any]
+    payload_bytes: bytes  # orjson-serialized data, reused for every cache hit
+    etag: str
+    scraped_at_mono: float
+    expires_at: float  # Fresh until (monotonic)
+    stale_until: float  # Served stale with background refresh until (monotonic)
+
+
 # Router
-router = APIRouter(prefix="/api/crypto-toolbox", tags=["Crypto Toolbox"])
+router = APIRouter(
+    prefix="/api/crypto-toolbox",
+    tags=["Crypto Toolbox"],
+    default_response_class=ORJSONResponse
+)
 
-# Global state (module-level, safe for single-worker Uvicorn)
+# Global state (module-level, per worker; see Multi-Worker Mode for browser sharing)
 _browser: Optional[Browser] = None
+_browser_owner_lock: Optional[FileLock] = None  # Held by the worker owning the shared browser
+_browser_healthy: bool = False  # Maintained by _watch_browser / disconnect event, read on the hot path
+_watcher_task: Optional[asyncio.Task] = None
 _playwright_instance = None
-_lock_refresh = asyncio.Lock()
-_cache: Dict[str, Any] = {"data": None, "timestamp": 0.0}
-_concurrency = asyncio.Semaphore(2)  # Max 2 concurrent scrapes
+_inflight: Optional[asyncio.Task] = None  # Scrape shared by all concurrent cache misses
+_cache_entry: Optional["CacheEntry"] = None  # Swapped atomically, never mutated in place
+_refresh_task: Optional[asyncio.Task] = None  # Background stale-while-revalidate refresh
+_prewarm_task: Optional[asyncio.Task] = None
+_persist_task: Optional[asyncio.Task] = None  # Last fire-and-forget disk write
+SCRAPE_CONCURRENCY = max(1, int(os.getenv("CRYPTO_TOOLBOX_CONCURRENCY", "8")))
+_concurrency = asyncio.Semaphore(SCRAPE_CONCURRENCY)  # Max concurrent Playwright scrapes
+_context_pool: Optional[asyncio.Queue] = None  # (BrowserContext | None, uses) slots
 _redis_client: Optional[aioredis.Redis] = None if REDIS_AVAILABLE else None
+_http_client: Optional[httpx.AsyncClient] = None
 
 # Configuration
 CACHE_TTL = 7200  # 2 hours (extended from 30min to reduce scraping frequency)
+STALE_TTL = CACHE_TTL * 2  # Stale data still served (with background refresh) until this age
 CRYPTO_TOOLBOX_URL = "https://crypto-toolbox.vercel.app/signaux"
+# Upstream JSON endpoint backing the /signaux table (empty = Playwright only)
+CRYPTO_TOOLBOX_API_URL = os.getenv("CRYPTO_TOOLBOX_API_URL", "")
 REDIS_CACHE_KEY = "crypto_toolbox:data"
+DISK_CACHE_PATH = Path(os.getenv("CRYPTO_TOOLBOX_CACHE_FILE", "data/cache/crypto_toolbox.json"))
+HTTP_CACHE_CONTROL = "max-age=30, stale-while-revalidate=1800"
+# Parsing patterns (compiled once at import)
+_THRESH_RE = re.compile(r'(>=|<=|>|<)\s*([\d.]+)')
+_VALUE_RE = re.compile(r'[\d.]+')
+# BMO thresholds: groups (threshold text, operator, number, label), e.g. ">=1.5 (short)"
+_BMO_THRESH_RE = re.compile(r'((>=?)\s*([\d.]+))\s*\(([^)]+)\)')
+_OP_TABLE = {'>=': operator.ge, '<=': operator.le, '>': operator.gt, '<': operator.lt}
+
+# Table cell texts as [[td, td, ...], ...] (one page.evaluate call instead of per-cell locators)
+_EXTRACT_ROWS_JS = """() => Array.from(document.querySelectorAll('table tbody tr'))
+    .map(r => Array.from(r.querySelectorAll('td')).map(c => c.innerText))"""
+SHARED_BROWSER = os.getenv("CRYPTO_TOOLBOX_SHARED_BROWSER", "0") == "1"
+CDP_PORT = int(os.getenv("CRYPTO_TOOLBOX_CDP_PORT", "9222"))
+CDP_LOCK_FILE = Path(tempfile.gettempdir()) / "crypto_toolbox_browser.lock"
+CDP_ENDPOINT_FILE = Path(tempfile.gettempdir()) / "crypto_toolbox_browser.endpoint"
+BROWSER_ARGS = ["--no-sandbox", "--disable-dev-shm-usage"]
+CONTEXT_POOL_SIZE = SCRAPE_CONCURRENCY  # One context per concurrency slot
+CONTEXT_MAX_USES = 50  # Recycle a context after N scrapes
+SCRAPE_TIMEOUT = 20  # Hard wall (seconds) for one Playwright scrape
+BROWSER_WATCH_INTERVAL = 5  # Seconds between background browser health checks
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
 
 
 # ============================================================================
 # Lifecycle Hooks (called from api/startup.py)
 # ============================================================================
 
+async def _launch_browser() -> Browser:
+    """
+    Launch Chromium, or attach to the shared one when SHARED_BROWSER is enabled.
+
+    In shared mode the worker that acquires CDP_LOCK_FILE owns the browser and
+    writes its CDP endpoint to CDP_ENDPOINT_FILE; other workers connect to it.
+
+    Returns:
+        Browser instance
+    """
+    global _browser_owner_lock
+
+    chromium = _playwright_instance.chromium
+
+    if not SHARED_BROWSER:
+        return await chromium.launch(headless=True, args=BROWSER_ARGS)
+
+    if _browser_owner_lock is None:
+        lock = FileLock(str(CDP_LOCK_FILE))
+        try:
+            lock.acquire(timeout=0)
+            _browser_owner_lock = lock
+        except Timeout:
+            pass
+
+    if _browser_owner_lock is not None:
+        browser = await chromium.launch(
+            headless=True,
+            args=BROWSER_ARGS + [f"--remote-debugging-port={CDP_PORT}"]
+        )
+        CDP_ENDPOINT_FILE.write_text(f"http://127.0.0.1:{CDP_PORT}")
+        logger.info(f"🔗 Shared browser owner, CDP endpoint on port {CDP_PORT}")
+        return browser
+
+    # Another worker owns the browser: wait for its endpoint, then attach
+    for _ in range(20):
+        if CDP_ENDPOINT_FILE.exists():
+            endpoint = CDP_ENDPOINT_FILE.read_text().strip()
+            try:
+                browser = await chromium.connect_over_cdp(endpoint)
+                logger.info(f"🔗 Connected to shared browser at {endpoint}")
+                return browser
+            except Exception as e:
+                logger.debug(f"Shared browser not ready yet: {e}")
+        await asyncio.sleep(0.5)
+
+    raise RuntimeError("Shared browser endpoint not available")
+
+
 async def startup_playwright():
     """
     Initialize Playwright and launch browser (called at app startup).
 
     Notes:
-    - Launches Chromium in headless mode
+    - Launches Chromium in headless mode (or attaches to the shared one, see
+      Multi-Worker Mode)
     - Reuses single browser instance across requests
-    - Safe for single-worker Uvicorn deployment
-    - Also initializes Redis cache if available
+    - Re-launches when the previous browser is disconnected
+    - Restores the disk cache snapshot (see _load_disk_cache)
+    - Initializes Redis cache if available and schedules a background cache
+      prewarm (see _prewarm) before touching the browser: both serve the
+      primary HTTP fetch path, so they survive a missing Playwright install
+      or a failed Chromium launch (only the browser part raises)
     """
-    global _browser, _playwright_instance, _redis_client
+    global _browser, _playwright_instance, _redis_client, _browser_healthy, _watcher_task, _prewarm_task
+    global _cache_entry
+
+    # Restore last payload from disk (survives restarts without Redis)
+    if _cache_entry is None:
+        try:
+            _cache_entry = await asyncio.to_thread(_load_disk_cache)
+        except Exception as e:
+            logger.warning(f"⚠️ Crypto-toolbox disk cache unreadable: {e}")
+
+    # Redis + prewarm serve the HTTP fetch path too: set them up before the
+    # browser, so a missing Playwright or a failed launch only loses the fallback
+    if REDIS_AVAILABLE and _redis_client is None:
+        try:
+            # Same source as api/startup.py and api/deps.py (Settings has no REDIS_URL)
+            _redis_client = await aioredis.from_url(
+                os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                encoding="utf-8",
+                decode_responses=True
+            )
+            await _redis_client.ping()
+            logger.info("✅ Redis cache initialized for crypto-toolbox")
+        except Exception as e:
+            logger.warning(f"⚠️ Redis cache not available: {e}")
+            _redis_client = None
 
-    if _browser is not None:
+    # Warm the cache before traffic arrives (not on crash re-launch with data cached)
+    if _cache_entry is None and (_prewarm_task is None or _prewarm_task.done()):
+        _prewarm_task = asyncio.create_task(_prewarm())
+
+    if _browser is not None and _browser.is_connected():
         logger.warning("Playwright browser already initialized")
         return
 
+    if not PLAYWRIGHT_AVAILABLE:
+        raise RuntimeError("Playwright is not installed")
+
     try:
         logger.info("🎭 Initializing Playwright browser...")
-        _playwright_instance = await async_playwright().start()
-        _browser = await _playwright_instance.chromium.launch(
-            headless=True,
-            args=["--no-sandbox", "--disable-dev-shm-usage"]
-        )
+        if _playwright_instance is None:
+            _playwright_instance = await async_playwright().start()
+        _browser = await _launch_browser()
         logger.info("✅ Playwright browser launched successfully")
 
-        # Initialize Redis if available
-        if REDIS_AVAILABLE:
-            try:
-                settings = get_settings()
-                _redis_client = await aioredis.from_url(
-                    settings.REDIS_URL,
-                    encoding="utf-8",
-                    decode_responses=True
-                )
-                await _redis_client.ping()
-                logger.info("✅ Redis cache initialized for crypto-toolbox")
-            except Exception as e:
-                logger.warning(f"⚠️ Redis cache not available: {e}")
-                _redis_client = None
+        _browser_healthy = True
+        _browser.on("disconnected", _on_browser_disconnected)
+        if _watcher_task is None or _watcher_task.done():
+            _watcher_task = asyncio.create_task(_watch_browser())
+
+        await _prefill_context_pool(_browser)
     except Exception as e:
         logger.error(f"❌ Failed to launch Playwright browser: {e}")
         raise
@@ -149,11 +376,21 @@ async def shutdown_playwright():
     """
     Close browser and cleanup Playwright (called at app shutdown).
     """
-    global _browser, _playwright_instance, _redis_client
+    global _browser, _playwright_instance, _redis_client, _http_client, _context_pool, _browser_owner_lock
+    global _browser_healthy, _watcher_task
 
     # Only log if browser was actually initialized
     browser_was_active = _browser is not None or _playwright_instance is not None
 
+    # Close shared HTTP client
+    if _http_client:
+        try:
+            await _http_client.aclose()
+        except Exception as e:
+            logger.warning(f"⚠️ Error closing HTTP client: {e}")
+        finally:
+            _http_client = None
+
     # Close Redis connection
     if _redis_client:
         try:
@@ -164,6 +401,15 @@ async def shutdown_playwright():
         finally:
             _redis_client = None
 
+    # Stop health watcher
+    _browser_healthy = False
+    if _watcher_task is not None:
+        _watcher_task.cancel()
+        _watcher_task = None
+
+    # Drop pooled contexts (closed together with the browser)
+    _context_pool = None
+
     if _browser:
         try:
             logger.info("🛑 Closing Playwright browser...")
@@ -174,6 +420,16 @@ async def shutdown_playwright():
         finally:
             _browser = None
 
+    # Release shared browser ownership so another worker can take over
+    if _browser_owner_lock is not None:
+        try:
+            CDP_ENDPOINT_FILE.unlink(missing_ok=True)
+            _browser_owner_lock.release()
+        except Exception as e:
+            logger.warning(f"⚠️ Error releasing shared browser lock: {e}")
+        finally:
+            _browser_owner_lock = None
+
     if _playwright_instance:
         try:
             await _playwright_instance.stop()
@@ -187,19 +443,41 @@ async def shutdown_playwright():
         logger.debug("⏭️ Playwright shutdown skipped (never initialized)")
 
 
+def _on_browser_disconnected(browser: Browser) -> None:
+    """
+    Browser "disconnected" event: flag it immediately (no wait for the watcher).
+    """
+    global _browser_healthy
+
+    if browser is _browser:
+        _browser_healthy = False
+
+
+async def _watch_browser() -> None:
+    """
+    Background task refreshing `_browser_healthy` every BROWSER_WATCH_INTERVAL seconds.
+    """
+    global _browser_healthy
+
+    while True:
+        await asyncio.sleep(BROWSER_WATCH_INTERVAL)
+        _browser_healthy = _browser is not None and _browser.is_connected()
+
+
 async def _ensure_browser() -> Browser:
     """
     Ensure browser is available, re-launch if crashed.
 
+    Only reads the `_browser_healthy` flag; connectivity is probed off the
+    request path by _watch_browser.
+
     Returns:
         Browser instance
 
     Raises:
         RuntimeError: If browser cannot be initialized
     """
-    global _browser
-
-    if _browser is None or not _browser.is_connected():
+    if not _browser_healthy:
         logger.warning("⚠️ Browser not connected, re-launching...")
         await startup_playwright()
 
@@ -209,6 +487,122 @@ async def _ensure_browser() -> Browser:
     return _browser
 
 
+# ============================================================================
+# BrowserContext Pool
+# ============================================================================
+
+def _get_context_pool() -> asyncio.Queue:
+    """
+    Return the context pool, creating CONTEXT_POOL_SIZE empty slots on first use.
+
+    A slot holds (context, uses); context None means "create on next acquire".
+    """
+    global _context_pool
+
+    if _context_pool is None:
+        _context_pool = asyncio.Queue()
+        for _ in range(CONTEXT_POOL_SIZE):
+            _context_pool.put_nowait((None, 0))
+    return _context_pool
+
+
+async def _block_heavy_resources(route) -> None:
+    """
+    Route handler: abort assets irrelevant to scraping (images, fonts, media, CSS).
+    """
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _new_context(browser: Browser) -> BrowserContext:
+    """
+    Create a lightweight BrowserContext for scraping.
+
+    Heavy resources are blocked once per context (not per page).
+    """
+    context = await browser.new_context(
+        viewport={"width": 800, "height": 600},
+        java_script_enabled=True,
+        service_workers="block"
+    )
+    await context.route("**/*", _block_heavy_resources)
+    return context
+
+
+async def _close_context(context: Optional[BrowserContext]) -> None:
+    """
+    Close a context, ignoring errors (browser may already be gone).
+    """
+    if context is None:
+        return
+    try:
+        await context.close()
+    except Exception as e:
+        logger.debug(f"Context close error (ignored): {e}")
+
+
+async def _prefill_context_pool(browser: Browser) -> None:
+    """
+    Pre-create contexts for all idle pool slots (called after browser launch).
+    """
+    pool = _get_context_pool()
+    slots = [pool.get_nowait() for _ in range(pool.qsize())]
+
+    for context, uses in slots:
+        if context is None or context.browser is not browser:
+            await _close_context(context)
+            try:
+                context, uses = await _new_context(browser), 0
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to pre-create browser context: {e}")
+                context, uses = None, 0
+        pool.put_nowait((context, uses))
+
+    logger.debug(f"Browser context pool ready ({len(slots)} idle slots)")
+
+
+async def _acquire_context() -> tuple:
+    """
+    Take a context from the pool, creating it if the slot is empty or stale.
+
+    Returns:
+        Tuple (context, uses)
+    """
+    browser = await _ensure_browser()
+    pool = _get_context_pool()
+    context, uses = await pool.get()
+
+    # Stale context from a previous (crashed) browser: replace it
+    if context is not None and context.browser is not browser:
+        await _close_context(context)
+        context = None
+
+    if context is None:
+        try:
+            context, uses = await _new_context(browser), 0
+        except Exception:
+            pool.put_nowait((None, 0))
+            raise
+
+    return context, uses
+
+
+async def _release_context(context: BrowserContext, uses: int, recycle: bool = False) -> None:
+    """
+    Return a context to the pool, recycling it after CONTEXT_MAX_USES scrapes
+    (or immediately when `recycle` is set, e.g. after a timeout).
+    """
+    uses += 1
+    if recycle or uses >= CONTEXT_MAX_USES:
+        logger.debug(f"♻️ Recycling browser context after {uses} uses")
+        await _close_context(context)
+        context, uses = None, 0
+
+    _get_context_pool().put_nowait((context, uses))
+
+
 # ============================================================================
 # Scraping Logic (Ported from crypto_toolbox_api.py)
 # ============================================================================
@@ -223,21 +617,227 @@ def _parse_comparison(txt: str) -> tuple:
     Returns:
         Tuple (operator, threshold_value) or (None, None) if no match
     """
-    import re
-    m = re.search(r'(>=|<=|>|<)\s*([\d.,]+)', txt.replace(',', ''))
+    m = _THRESH_RE.search(txt.replace(',', ''))
     return (m.group(1), float(m.group(2))) if m else (None, None)
 
 
-async def _scrape_crypto_toolbox() -> Dict[str, Any]:
+def _parse_thresholds(raw: str) -> List[Tuple[str, str, float, str]]:
     """
-    Scrape crypto-toolbox.vercel.app indicators with Playwright.
+    Parse all BMO sub-indicator thresholds of a cell in one regex pass.
 
-    Parsing logic ported from crypto_toolbox_api.py (Flask version).
-    Handles special cases:
+    Args:
+        raw: Threshold cell text (e.g. ">=1 (short)\n>0.9 (long)")
+
+    Returns:
+        List of (threshold_text, operator, threshold_value, label)
+    """
+    return [
+        (thr_str, op, float(num), label)
+        for thr_str, op, num, label in _BMO_THRESH_RE.findall(raw)
+    ]
+
+
+def _parse_rows(rows: List[List[str]]) -> List[Dict[str, Any]]:
+    """
+    Convert raw table rows into indicator dicts.
+
+    Shared by the HTTP and Playwright fetch paths. Handles special cases:
     - BMO (par Prof. Chaîne): Multiple sub-indicators
     - Comparison operators: >=, <=, >, <
     - Numeric value extraction with regex
 
+    Args:
+        rows: List of [name, value, threshold, ...] cell texts
+
+    Returns:
+        List of indicator dicts (see JSON Response Contract)
+    """
+    indicators = []
+
+    for cells in rows:
+        if len(cells) < 3:
+            continue
+
+        name = cells[0].strip()
+        val_raw = cells[1].strip()
+        thr_raw = cells[2].strip()
+
+        logger.debug(f"Raw row: {name} | {val_raw} | {thr_raw}")
+
+        # Special handling for BMO (multiple sub-indicators)
+        if name == "BMO (par Prof. Chaîne)":
+            vals = _VALUE_RE.findall(val_raw.replace(',', ''))
+
+            for v_str, (thr_str, op, thr, label) in zip(vals, _parse_thresholds(thr_raw)):
+                val = float(v_str)
+                in_zone = _OP_TABLE[op](val, thr)
+
+                indicators.append({
+                    'name': f"{name} ({label})",
+                    'value': v_str,
+                    'value_numeric': val,
+                    'threshold': thr_str,
+                    'threshold_numeric': thr,
+                    'in_critical_zone': in_zone,
+                    'raw_value': val_raw,
+                    'raw_threshold': thr_raw
+                })
+            continue
+
+        # Normal indicator processing
+        val_match = _VALUE_RE.search(val_raw.replace(',', ''))
+        if val_match:
+            val = float(val_match.group())
+            op, thr = _parse_comparison(thr_raw)
+
+            if op is not None:
+                in_zone = _OP_TABLE[op](val, thr)
+
+                indicators.append({
+                    'name': name,
+                    'value': val_raw.replace('\n', ' '),
+                    'value_numeric': val,
+                    'threshold': thr_raw.replace('\n', ' '),
+                    'threshold_numeric': thr,
+                    'threshold_operator': op,
+                    'in_critical_zone': in_zone,
+                    'raw_value': val_raw,
+                    'raw_threshold': thr_raw
+                })
+
+    return indicators
+
+
+def _rows_from_payload(payload: Any) -> Optional[List[List[str]]]:
+    """
+    Extract [name, value, threshold] rows from the upstream JSON payload.
+
+    Accepts either a list of rows or a dict with an "indicators" list, where each
+    row is a [name, value, threshold] list or a {"name", "value", "threshold"} dict.
+
+    Returns:
+        List of rows, or None on schema mismatch
+    """
+    items = payload.get("indicators") if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        return None
+
+    rows = []
+    for item in items:
+        if isinstance(item, dict):
+            cells = [item.get("name"), item.get("value"), item.get("threshold")]
+        elif isinstance(item, (list, tuple)):
+            cells = list(item[:3])
+        else:
+            return None
+
+        if len(cells) < 3 or any(c is None for c in cells):
+            return None
+        rows.append([str(c) for c in cells])
+
+    return rows
+
+
+async def _get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared HTTP client (created lazily, reused across scrapes).
+    """
+    global _http_client
+
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=10),
+            headers={"Accept": "application/json"}
+        )
+    return _http_client
+
+
+async def _fetch_rows_http() -> Optional[List[List[str]]]:
+    """
+    Fetch table rows directly from the upstream JSON endpoint (no browser).
+
+    Returns:
+        List of rows, or None if the HTTP path is disabled or unusable
+        (caller then falls back to Playwright)
+    """
+    if not CRYPTO_TOOLBOX_API_URL:
+        return None
+
+    try:
+        client = await _get_http_client()
+        response = await client.get(CRYPTO_TOOLBOX_API_URL)
+        if response.status_code != 200:
+            logger.warning(f"⚠️ HTTP path returned {response.status_code}, falling back to Playwright")
+            return None
+
+        rows = _rows_from_payload(orjson.loads(response.content))
+        if rows is None:
+            logger.warning("⚠️ HTTP path schema mismatch, falling back to Playwright")
+        return rows
+
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+        logger.warning(f"⚠️ HTTP path failed ({e}), falling back to Playwright")
+        return None
+
+
+async def _fetch_rows_playwright() -> List[List[str]]:
+    """
+    Load the page with Playwright and read the indicators table.
+
+    The whole scrape is bounded by SCRAPE_TIMEOUT so a hung page cannot hold a
+    concurrency slot forever; on timeout the context is recycled.
+
+    Returns:
+        List of rows (cell texts)
+
+    Raises:
+        TimeoutError: If the scrape exceeds SCRAPE_TIMEOUT
+    """
+    async with _concurrency:
+        context, uses = await _acquire_context()
+        recycle = False
+        try:
+            async with asyncio.timeout(SCRAPE_TIMEOUT), contextlib.AsyncExitStack() as stack:
+                page: Page = await context.new_page()
+                stack.push_async_callback(_close_page, page)
+
+                logger.info(f"🌐 Loading {CRYPTO_TOOLBOX_URL}")
+                await page.goto(CRYPTO_TOOLBOX_URL, wait_until="domcontentloaded", timeout=15000)
+                # Return as soon as the first data cell is rendered (no networkidle, no fixed sleep)
+                await page.locator("table tbody tr td").first.wait_for(timeout=8000)
+
+                # Extract the whole table in a single CDP round trip
+                rows = await page.evaluate(_EXTRACT_ROWS_JS)
+                logger.info(f"🔍 Found {len(rows)} table rows")
+                return rows
+
+        except TimeoutError:
+            recycle = True
+            logger.error(f"❌ Playwright scrape exceeded {SCRAPE_TIMEOUT}s, recycling context")
+            raise
+
+        finally:
+            await _release_context(context, uses, recycle=recycle)
+
+
+async def _close_page(page: Page) -> None:
+    """
+    Close a page, ignoring errors (context may already be gone).
+    """
+    try:
+        await page.close()
+    except Exception as e:
+        logger.debug(f"Page close error (ignored): {e}")
+
+
+async def _scrape_crypto_toolbox() -> Dict[str, Any]:
+    """
+    Scrape crypto-toolbox indicators (direct HTTP first, Playwright fallback).
+
+    Parsing logic ported from crypto_toolbox_api.py (Flask version), see _parse_rows.
+
     Returns:
         Dict with structure:
         {
@@ -252,235 +852,343 @@ async def _scrape_crypto_toolbox() -> Dict[str, Any]:
     Raises:
         Exception: If scraping fails (page load, parsing errors)
     """
-    import re
+    with SCRAPE_LATENCY.time():
+        rows = await _fetch_rows_http()
+        if rows is not None:
+            FETCH_PATH.labels("http").inc()
+        else:
+            FETCH_PATH.labels("playwright").inc()
+            rows = await _fetch_rows_playwright()
 
-    browser = await _ensure_browser()
+        indicators = _parse_rows(rows)
+    logger.info(f"✅ Successfully scraped {len(indicators)} indicators")
 
-    async with _concurrency:
-        page: Page = await browser.new_page()
+    # ✅ Validation: Detect invalid data (all zeros)
+    if indicators:
+        non_zero_count = sum(1 for ind in indicators if ind.get("value_numeric", 0) != 0)
+        zero_percentage = 100 - (non_zero_count / len(indicators) * 100)
+
+        # Reject if more than 80% of indicators are zero (likely scraping failure)
+        if zero_percentage > 80:
+            logger.error(f"❌ Invalid scraping result: {zero_percentage:.1f}% of indicators are zero (likely page load failure)")
+            raise Exception(f"Scraping validation failed: {zero_percentage:.1f}% indicators at zero - rejecting invalid data")
+
+        # Warning if 50-80% are zero
+        if zero_percentage > 50:
+            logger.warning(f"⚠️ Suspicious scraping result: {zero_percentage:.1f}% of indicators are zero")
+
+        logger.debug(f"✅ Data validation passed: {non_zero_count}/{len(indicators)} indicators have non-zero values")
+
+    return {
+        "success": True,
+        "indicators": indicators,
+        "total_count": len(indicators),
+        "critical_count": sum(1 for ind in indicators if ind.get("in_critical_zone")),
+        "scraped_at": datetime.now().isoformat(),
+        "source": "crypto-toolbox.vercel.app"
+    }
+
+
+def _write_disk_cache(payload_bytes: bytes) -> None:
+    """
+    Atomically write the serialized payload to DISK_CACHE_PATH (tmp + os.replace).
+    """
+    DISK_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = DISK_CACHE_PATH.with_suffix(".tmp")
+    tmp_path.write_bytes(payload_bytes)
+    os.replace(tmp_path, DISK_CACHE_PATH)
+
+
+def _load_disk_cache() -> Optional[CacheEntry]:
+    """
+    Rebuild a CacheEntry from the disk snapshot if it is younger than STALE_TTL.
+
+    The file mtime gives the scrape age, mapped back onto the monotonic clock.
+    Entries older than CACHE_TTL are served stale and refreshed in background.
+    """
+    try:
+        age = time.time() - DISK_CACHE_PATH.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if age >= STALE_TTL:
+        return None
+
+    payload_bytes = DISK_CACHE_PATH.read_bytes()
+    scraped_at_mono = time.monotonic() - max(age, 0.0)
+    logger.info(f"💾 Crypto-toolbox cache restored from disk (age: {int(age)}s)")
+    return CacheEntry(
+        data=orjson.loads(payload_bytes),
+        payload_bytes=payload_bytes,
+        etag=compute_etag(payload_bytes),
+        scraped_at_mono=scraped_at_mono,
+        expires_at=scraped_at_mono + CACHE_TTL,
+        stale_until=scraped_at_mono + STALE_TTL
+    )
+
+
+def _persist_to_disk(payload_bytes: bytes) -> None:
+    """
+    Fire-and-forget disk write of a fresh payload (off the event loop).
+    """
+    global _persist_task
+
+    async def _write() -> None:
         try:
-            logger.info(f"🌐 Loading {CRYPTO_TOOLBOX_URL}")
-            await page.goto(CRYPTO_TOOLBOX_URL, timeout=15000)
-            # Wait for table instead of networkidle (faster)
-            await page.wait_for_selector("table tbody tr", timeout=10000)
-            await asyncio.sleep(0.5)  # Reduced delay for client-side hydration
-
-            # Parse table rows
-            rows = await page.locator("table tbody tr").all()
-            logger.info(f"🔍 Found {len(rows)} table rows")
-
-            indicators = []
-
-            for row in rows:
-                cells = await row.locator("td").all()
-                if len(cells) < 3:
-                    continue
-
-                name = (await cells[0].inner_text()).strip()
-                val_raw = (await cells[1].inner_text()).strip()
-                thr_raw = (await cells[2].inner_text()).strip()
-
-                logger.debug(f"Raw row: {name} | {val_raw} | {thr_raw}")
-
-                # Special handling for BMO (multiple sub-indicators)
-                if name == "BMO (par Prof. Chaîne)":
-                    vals = re.findall(r'[\d.]+', val_raw.replace(',', ''))
-                    thrs = re.findall(r'(>=?\s*[\d.]+)\s*\(([^)]+)\)', thr_raw)
-
-                    for v_str, (thr_str, label) in zip(vals, thrs):
-                        val = float(v_str)
-                        op, thr = _parse_comparison(thr_str)
-                        in_zone = (op == '>=' and val >= thr) or (op == '>' and val > thr)
-
-                        indicators.append({
-                            'name': f"{name} ({label})",
-                            'value': v_str,
-                            'value_numeric': val,
-                            'threshold': thr_str,
-                            'threshold_numeric': thr,
-                            'in_critical_zone': in_zone,
-                            'raw_value': val_raw,
-                            'raw_threshold': thr_raw
-                        })
-                    continue
-
-                # Normal indicator processing
-                val_match = re.search(r'[\d.,]+', val_raw.replace(',', ''))
-                if val_match:
-                    val = float(val_match.group())
-                    op, thr = _parse_comparison(thr_raw)
-
-                    if op is not None:
-                        in_zone = {
-                            '>=': val >= thr,
-                            '<=': val <= thr,
-                            '>': val > thr,
-                            '<': val < thr
-                        }.get(op, False)
-
-                        indicators.append({
-                            'name': name,
-                            'value': val_raw.replace('\n', ' '),
-                            'value_numeric': val,
-                            'threshold': thr_raw.replace('\n', ' '),
-                            'threshold_numeric': thr,
-                            'threshold_operator': op,
-                            'in_critical_zone': in_zone,
-                            'raw_value': val_raw,
-                            'raw_threshold': thr_raw
-                        })
-
-            logger.info(f"✅ Successfully scraped {len(indicators)} indicators")
-
-            # ✅ Validation: Detect invalid data (all zeros)
-            if indicators:
-                non_zero_count = sum(1 for ind in indicators if ind.get("value_numeric", 0) != 0)
-                zero_percentage = 100 - (non_zero_count / len(indicators) * 100)
-
-                # Reject if more than 80% of indicators are zero (likely scraping failure)
-                if zero_percentage > 80:
-                    logger.error(f"❌ Invalid scraping result: {zero_percentage:.1f}% of indicators are zero (likely page load failure)")
-                    raise Exception(f"Scraping validation failed: {zero_percentage:.1f}% indicators at zero - rejecting invalid data")
-
-                # Warning if 50-80% are zero
-                if zero_percentage > 50:
-                    logger.warning(f"⚠️ Suspicious scraping result: {zero_percentage:.1f}% of indicators are zero")
-
-                logger.debug(f"✅ Data validation passed: {non_zero_count}/{len(indicators)} indicators have non-zero values")
+            await asyncio.to_thread(_write_disk_cache, payload_bytes)
+        except Exception as e:
+            logger.warning(f"⚠️ Crypto-toolbox disk cache write error: {e}")
+
+    _persist_task = asyncio.create_task(_write())
+
+
+async def _refresh_cache() -> Dict[str, Any]:
+    """
+    Scrape fresh data and update memory/Redis caches (run via _join_refresh).
+
+    Returns:
+        Fresh data dict, or previous cache with scraping_failed=True on failure
+    """
+    global _cache_entry
+
+    # Scrape fresh data
+    logger.info("🔄 Scraping fresh data...")
+    try:
+        data = await _scrape_crypto_toolbox()
+
+        # ✅ Validation before caching: Don't cache if data looks invalid
+        indicators = data.get("indicators", [])
+        if indicators:
+            non_zero_count = sum(1 for ind in indicators if ind.get("value_numeric", 0) != 0)
+            zero_percentage = 100 - (non_zero_count / len(indicators) * 100)
+
+            # If >80% zeros, keep old cache (don't overwrite good data with bad)
+            entry = _cache_entry
+            if zero_percentage > 80 and entry:
+                logger.error(f"❌ Not caching invalid data ({zero_percentage:.1f}% zeros) - keeping previous cache")
+                cache_age = int(time.monotonic() - entry.scraped_at_mono)
+                return {
+                    **entry.data,
+                    "cached": True,
+                    "cache_age_seconds": cache_age,
+                    "cache_source": "memory_fallback",
+                    "scraping_failed": True,
+                    "failure_reason": f"Invalid data detected ({zero_percentage:.1f}% zeros)"
+                }
+
+        # Update memory cache with fresh data (single reference swap)
+        payload_bytes = orjson.dumps(data)
+        scraped_at_mono = time.monotonic()
+        _cache_entry = CacheEntry(
+            data=data,
+            payload_bytes=payload_bytes,
+            etag=compute_etag(payload_bytes),
+            scraped_at_mono=scraped_at_mono,
+            expires_at=scraped_at_mono + CACHE_TTL,
+            stale_until=scraped_at_mono + STALE_TTL
+        )
+
+        _persist_to_disk(payload_bytes)
+
+        # Update Redis cache (if available)
+        if _redis_client:
+            try:
+                await _redis_client.setex(
+                    REDIS_CACHE_KEY,
+                    STALE_TTL,
+                    payload_bytes
+                )
+                logger.debug("✅ Data cached in Redis")
+            except Exception as e:
+                logger.warning(f"⚠️ Redis cache write error: {e}")
 
+        return {
+            **data,
+            "cached": False,
+            "cache_age_seconds": 0
+        }
+
+    except Exception as scrape_error:
+        # If scraping fails completely, return old cache if available
+        entry = _cache_entry
+        if entry:
+            logger.error(f"❌ Scraping failed: {scrape_error} - falling back to stale cache")
+            cache_age = int(time.monotonic() - entry.scraped_at_mono)
             return {
-                "success": True,
-                "indicators": indicators,
-                "total_count": len(indicators),
-                "critical_count": sum(1 for ind in indicators if ind.get("in_critical_zone")),
-                "scraped_at": datetime.now().isoformat(),
-                "source": "crypto-toolbox.vercel.app"
+                **entry.data,
+                "cached": True,
+                "cache_age_seconds": cache_age,
+                "cache_source": "memory_fallback",
+                "scraping_failed": True,
+                "failure_reason": str(scrape_error)
             }
+        # No cache available - re-raise exception
+        raise
 
-        finally:
-            await page.close()
+
+async def _join_refresh() -> Dict[str, Any]:
+    """
+    Start the cache refresh or join the one already in flight.
+
+    The refresh runs as a task stored in `_inflight`; every concurrent caller
+    awaits that same task (shielded, so a disconnecting client does not cancel
+    the scrape for the others) and gets the same result or exception.
+    """
+    global _inflight
+
+    if _inflight is None:
+        _inflight = asyncio.create_task(_refresh_cache())
+        _inflight.add_done_callback(_clear_inflight)
+    else:
+        COALESCED_WAITERS.inc()
+    return await asyncio.shield(_inflight)
+
+
+def _clear_inflight(task: asyncio.Task) -> None:
+    """
+    Reset `_inflight` once the refresh finishes (mark exception as retrieved).
+    """
+    global _inflight
+
+    if _inflight is task:
+        _inflight = None
+    if not task.cancelled():
+        task.exception()
+
+
+async def _background_refresh() -> None:
+    """
+    Refresh the cache in the background (stale-while-revalidate).
+    """
+    try:
+        await _get_data(force=True)
+    except Exception as e:
+        logger.warning(f"⚠️ Background crypto-toolbox refresh failed: {e}")
+
+
+def _schedule_refresh(reason: str = "serving stale data") -> None:
+    """
+    Start a background refresh unless one is already running.
+    """
+    global _refresh_task
+
+    if _refresh_task is not None and not _refresh_task.done():
+        return
+    if _inflight is not None:
+        return
+
+    logger.info(f"🔄 Refreshing crypto-toolbox data in background ({reason})")
+    _refresh_task = asyncio.create_task(_background_refresh())
+
+
+async def _prewarm() -> None:
+    """
+    Warm the cache right after startup so the first request does not block on a scrape.
+
+    Uses the normal cache path: a warm Redis entry avoids scraping at all.
+    """
+    await asyncio.sleep(1)
+    try:
+        await _get_data()
+        logger.info("🔥 Crypto-toolbox cache prewarmed")
+    except Exception as e:
+        logger.warning(f"⚠️ Crypto-toolbox cache prewarm failed: {e}")
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    """
+    HTTP caching headers sent with every indicators response.
+    """
+    return {"ETag": etag, "Cache-Control": HTTP_CACHE_CONTROL} if etag else {}
 
 
-async def _get_data(force: bool = False) -> Dict[str, Any]:
+def _cached_response(payload_bytes: bytes, age: int, source: str, etag: str,
+                     if_none_match: Optional[str] = None) -> Response:
+    """
+    Build a cache-hit response from pre-serialized JSON bytes.
+
+    Cache metadata is spliced in front of the stored object instead of copying
+    the data dict and re-encoding it on every hit. Returns 304 (no body) when
+    the client already holds the same payload.
+
+    Args:
+        payload_bytes: Serialized data object (starts with '{')
+        age: Cache age in seconds
+        source: cache_source value (suffix '_stale' adds `X-Cache: STALE`)
+        etag: ETag of payload_bytes
+        if_none_match: Client If-None-Match header
+    """
+    headers = _cache_headers(etag)
+    if source.endswith("_stale"):
+        headers["X-Cache"] = "STALE"
+
+    CACHE_HITS.labels(source).inc()
+    if etag_matches(if_none_match, etag):
+        NOT_MODIFIED.inc()
+        return Response(status_code=304, headers=headers)
+
+    prefix = b'{"cached":true,"cache_age_seconds":%d,"cache_source":"%s",' % (age, source.encode())
+    return Response(
+        content=prefix + payload_bytes[1:],
+        media_type="application/json",
+        headers=headers
+    )
+
+
+async def _get_data(force: bool = False, if_none_match: Optional[str] = None) -> Union[Dict[str, Any], Response]:
     """
     Get crypto-toolbox data (cached or fresh).
 
     Cache strategy:
     1. Check Redis cache (if available) - persists across restarts
     2. Check memory cache - faster but volatile
-    3. Scrape fresh data if needed
+    3. Serve stale data (< STALE_TTL) and refresh in background
+    4. Scrape fresh data if needed (cold cache or force)
 
     Args:
         force: Force refresh bypassing cache
+        if_none_match: Client If-None-Match header (cache hits may answer 304)
 
     Returns:
-        Data dict with cache metadata
+        Cache hit: ready-to-send JSON Response (see _cached_response)
+        Refresh: data dict with cache metadata
     """
-    now = time.time()
+    mono_now = time.monotonic()
 
     # Check Redis cache first (if available and not forcing)
     if not force and _redis_client:
         try:
             cached_json = await _redis_client.get(REDIS_CACHE_KEY)
             if cached_json:
-                cached_data = json.loads(cached_json)
                 ttl = await _redis_client.ttl(REDIS_CACHE_KEY)
-                age = CACHE_TTL - ttl if ttl > 0 else 0
+                age = STALE_TTL - ttl if ttl > 0 else 0
+                stale = age >= CACHE_TTL
+                if stale:
+                    _schedule_refresh()
                 logger.info(f"💾 Returning Redis cached data (age: {age}s)")
-                return {
-                    **cached_data,
-                    "cached": True,
-                    "cache_age_seconds": age,
-                    "cache_source": "redis"
-                }
+                payload_bytes = cached_json.encode()
+                return _cached_response(
+                    payload_bytes, age, "redis_stale" if stale else "redis",
+                    compute_etag(payload_bytes), if_none_match
+                )
         except Exception as e:
             logger.warning(f"⚠️ Redis cache read error: {e}")
 
     # Check memory cache (unless force refresh)
-    if not force and _cache["data"] and (now - _cache["timestamp"] < CACHE_TTL):
-        age = int(now - _cache["timestamp"])
+    entry = _cache_entry
+    if not force and entry and mono_now < entry.expires_at:
+        age = int(mono_now - entry.scraped_at_mono)
         logger.info(f"💾 Returning memory cached data (age: {age}s)")
-        return {
-            **_cache["data"],
-            "cached": True,
-            "cache_age_seconds": age,
-            "cache_source": "memory"
-        }
-
-    # Prevent thundering herd during refresh
-    async with _lock_refresh:
-        # Double-check cache after acquiring lock
-        now = time.time()
-        if not force and _cache["data"] and (now - _cache["timestamp"] < CACHE_TTL):
-            age = int(now - _cache["timestamp"])
-            return {
-                **_cache["data"],
-                "cached": True,
-                "cache_age_seconds": age,
-                "cache_source": "memory"
-            }
+        return _cached_response(entry.payload_bytes, age, "memory", entry.etag, if_none_match)
 
-        # Scrape fresh data
-        logger.info("🔄 Scraping fresh data...")
-        try:
-            data = await _scrape_crypto_toolbox()
-
-            # ✅ Validation before caching: Don't cache if data looks invalid
-            indicators = data.get("indicators", [])
-            if indicators:
-                non_zero_count = sum(1 for ind in indicators if ind.get("value_numeric", 0) != 0)
-                zero_percentage = 100 - (non_zero_count / len(indicators) * 100)
-
-                # If >80% zeros, keep old cache (don't overwrite good data with bad)
-                if zero_percentage > 80 and _cache["data"]:
-                    logger.error(f"❌ Not caching invalid data ({zero_percentage:.1f}% zeros) - keeping previous cache")
-                    cache_age = int(time.time() - _cache["timestamp"])
-                    return {
-                        **_cache["data"],
-                        "cached": True,
-                        "cache_age_seconds": cache_age,
-                        "cache_source": "memory_fallback",
-                        "scraping_failed": True,
-                        "failure_reason": f"Invalid data detected ({zero_percentage:.1f}% zeros)"
-                    }
-
-            # Update memory cache with fresh data
-            _cache["data"] = data
-            _cache["timestamp"] = time.time()
-
-            # Update Redis cache (if available)
-            if _redis_client:
-                try:
-                    await _redis_client.setex(
-                        REDIS_CACHE_KEY,
-                        CACHE_TTL,
-                        json.dumps(data)
-                    )
-                    logger.debug("✅ Data cached in Redis")
-                except Exception as e:
-                    logger.warning(f"⚠️ Redis cache write error: {e}")
-
-            return {
-                **data,
-                "cached": False,
-                "cache_age_seconds": 0
-            }
+    # Stale but still usable: serve it now, refresh in background
+    if not force and entry and mono_now < entry.stale_until:
+        age = int(mono_now - entry.scraped_at_mono)
+        _schedule_refresh()
+        return _cached_response(entry.payload_bytes, age, "memory_stale", entry.etag, if_none_match)
 
-        except Exception as scrape_error:
-            # If scraping fails completely, return old cache if available
-            if _cache["data"]:
-                logger.error(f"❌ Scraping failed: {scrape_error} - falling back to stale cache")
-                cache_age = int(time.time() - _cache["timestamp"])
-                return {
-                    **_cache["data"],
-                    "cached": True,
-                    "cache_age_seconds": cache_age,
-                    "cache_source": "memory_fallback",
-                    "scraping_failed": True,
-                    "failure_reason": str(scrape_error)
-                }
-            # No cache available - re-raise exception
-            raise
+    # Single-flight: all concurrent misses await the same in-flight scrape
+    CACHE_MISSES.inc()
+    return await _join_refresh()
 
 
 # ============================================================================
@@ -488,7 +1196,11 @@ async def _get_data(force: bool = False) -> Dict[str, Any]:
 # ============================================================================
 
 @router.get("")
-async def get_crypto_toolbox_data(force: bool = Query(False, description="Force refresh bypassing cache")):
+async def get_crypto_toolbox_data(
+    request: Request,
+    response: Response,
+    force: bool = Query(False, description="Force refresh bypassing cache")
+):
     """
     Get crypto-toolbox indicators.
 
@@ -497,12 +1209,18 @@ async def get_crypto_toolbox_data(force: bool = Query(False, description="Force
 
     Returns:
         JSON with indicators and cache metadata
+        (header `X-Cache: STALE` when served stale during background refresh,
+        304 Not Modified when If-None-Match matches the cached ETag)
 
     Raises:
         HTTPException 502: If scraping fails
     """
     try:
-        return await _get_data(force=force)
+        data = await _get_data(force=force, if_none_match=request.headers.get("if-none-match"))
+        entry = _cache_entry
+        if isinstance(data, dict) and entry:
+            response.headers.update(_cache_headers(entry.etag))
+        return data
     except Exception as e:
         logger.exception("❌ Crypto-toolbox scraping error")
         raise HTTPException(
@@ -530,13 +1248,14 @@ async def health_check():
     Returns:
         Status and cache metadata
     """
-    cache_age = int(time.time() - _cache["timestamp"]) if _cache["timestamp"] else None
+    entry = _cache_entry
+    cache_age = int(time.monotonic() - entry.scraped_at_mono) if entry else None
     browser_connected = _browser is not None and _browser.is_connected()
 
     return {
         "status": "healthy" if browser_connected else "degraded",
         "browser_connected": browser_connected,
-        "cache_status": "active" if _cache["data"] else "empty",
+        "cache_status": "active" if entry else "empty",
         "cache_age_seconds": cache_age,
         "timestamp": datetime.now().isoformat()
     }
@@ -547,13 +1266,14 @@ async def clear_cache():
     """
     Clear cache (admin/debug endpoint).
 
-    Clears both memory and Redis cache.
+    Clears memory, Redis and the disk snapshot, then refills them in the
+    background so the next request does not block on a cold scrape.
 
     Returns:
         Success message
     """
-    global _cache
-    _cache = {"data": None, "timestamp": 0.0}
+    global _cache_entry
+    _cache_entry = None
 
     # Clear Redis cache if available
     if _redis_client:
@@ -563,5 +1283,18 @@ async def clear_cache():
         except Exception as e:
             logger.warning(f"⚠️ Redis cache clear error: {e}")
 
+    # Disk snapshot: otherwise a restart before the refresh lands restores the
+    # cleared data. Let an in-flight write finish first so it cannot recreate it.
+    if _persist_task is not None and not _persist_task.done():
+        await _persist_task
+    try:
+        DISK_CACHE_PATH.unlink()
+        logger.info("🧹 Disk cache cleared")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"⚠️ Disk cache clear error: {e}")
+
     logger.info("🧹 Memory cache cleared")
-    return {"message": "Cache cleared successfully (memory + redis)"}
+    _schedule_refresh("cache cleared")
+    return {"message": "Cache cleared successfully (memory + redis + disk)"}
@@ -3,7 +3,6 @@ Debug Router - Development Endpoints
 Extracted from api/main.py for better organization
 """
 import os
-import re
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
@@ -133,6 +132,33 @@ async def debug_api_keys(debug_token: Optional[str] = Query(None), user: str = D
     }
 
 
+# Mapping champ du payload -> nom de variable dans .env
+_API_KEY_ENV_MAPPINGS = (
+    ("coingecko_api_key", "COINGECKO_API_KEY"),
+    ("cointracking_api_key", "COINTRACKING_API_KEY"),
+    ("cointracking_api_secret", "COINTRACKING_API_SECRET"),
+    ("fred_api_key", "FRED_API_KEY"),
+)
+
+
+def _merge_env_updates(content: str, updates: dict[str, str]) -> str:
+    """
+    Applique des KEY=value à un contenu .env en une seule passe ligne à ligne.
+
+    Les lignes existantes sont remplacées sur place (commentaires et ordre
+    conservés), les clés absentes sont ajoutées en fin de fichier.
+    """
+    lines = content.splitlines()
+    seen = set()
+    for i, line in enumerate(lines):
+        key, sep, _ = line.partition("=")
+        if sep and key in updates:
+            lines[i] = f"{key}={updates[key]}"
+            seen.add(key)
+    lines.extend(f"{key}={value}" for key, value in updates.items() if key not in seen)
+    return "\n".join(lines) + "\n"
+
+
 @router.post("/api-keys")
 async def update_api_keys(payload: APIKeysRequest, debug_token: Optional[str] = Query(None)):
     """Met à jour les clés API dans le fichier .env (sécurisé)"""
@@ -149,38 +175,17 @@ async def update_api_keys(payload: APIKeysRequest, debug_token: Optional[str] =
         # Créer le fichier .env s'il n'existe pas
         env_file.write_text("# Clés API générées automatiquement\n")
 
-    content = env_file.read_text()
-
-    # Définir les mappings clé -> nom dans .env
-    key_mappings = {
-        "coingecko_api_key": "COINGECKO_API_KEY",
-        "cointracking_api_key": "COINTRACKING_API_KEY",
-        "cointracking_api_secret": "COINTRACKING_API_SECRET",
-        "fred_api_key": "FRED_API_KEY"
-    }
-
-    updated = False
     payload_dict = payload.model_dump(exclude_none=True)  # Convertir le modèle Pydantic en dict
-    for field_key, env_key in key_mappings.items():
-        if field_key in payload_dict and payload_dict[field_key]:
-            # Chercher si la clé existe déjà
-            pattern = rf"^{env_key}=.*$"
-            new_line = f"{env_key}={payload_dict[field_key]}"
-
-            if re.search(pattern, content, re.MULTILINE):
-                # Remplacer la ligne existante
-                content = re.sub(pattern, new_line, content, flags=re.MULTILINE)
-            else:
-                # Ajouter la nouvelle clé
-                content += f"\n{new_line}"
-            updated = True
+    updates = {
+        env_key: payload_dict[field_key]
+        for field_key, env_key in _API_KEY_ENV_MAPPINGS
+        if payload_dict.get(field_key)
+    }
 
+    updated = bool(updates)
     if updated:
-        env_file.write_text(content)
+        env_file.write_text(_merge_env_updates(env_file.read_text(), updates))
         # Recharger les variables d'environnement dans le process courant
-        for field_key, env_key in key_mappings.items():
-            val = payload_dict.get(field_key)
-            if val:
-                os.environ[env_key] = val
+        os.environ.update(updates)
 
     return {"success": True, "updated": updated}
@@ -19,6 +19,11 @@ logger = logging.getLogger("crypto-rebalancer")
 
 router = APIRouter(tags=["health"])
 
+# 1x1 transparent PNG, décodé une seule fois à l'import (contenu statique)
+_FAVICON_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8/x8AAwMCAO1iYl8AAAAASUVORK5CYII="
+)
+
 
 @router.get("/health")
 async def health():
@@ -35,17 +40,11 @@ async def healthz():
 @router.get("/favicon.ico")
 async def favicon():
     """Serve a tiny placeholder favicon to avoid 404s in the browser console."""
-    try:
-        # 1x1 transparent PNG
-        b64 = (
-            "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8/x8AAwMCAO1iYl8AAAAASUVORK5CYII="
-        )
-        data = base64.b64decode(b64)
-        return Response(content=data, media_type="image/png")
-    except Exception as e:
-        # Fallback to no-content if decoding somehow fails
-        logger.warning(f"Failed to decode favicon data: {e}")
-        return Response(status_code=204)
+    return Response(
+        content=_FAVICON_PNG,
+        media_type="image/png",
+        headers={"Cache-Control": "public, max-age=86400"},
+    )
 
 
 @router.get("/test-simple")
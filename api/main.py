@@ -1,9 +1,12 @@
 from __future__ import annotations
 from typing import Any, Dict, List
+from collections import defaultdict
 from time import monotonic
+import asyncio
 import os, sys, inspect, hashlib, time, json
 from datetime import datetime
 import httpx
+import orjson
 from fastapi import FastAPI, Query, Body, Response, HTTPException, Request, APIRouter, Depends, Header, Path
 import logging
 from logging.handlers import RotatingFileHandler
@@ -17,6 +20,7 @@ from api.middlewares import (
     request_timing_middleware,
     request_logger_middleware,
     no_cache_dev_middleware,
+    UserSecretsScopeMiddleware,
 )
 from api.services.location_assigner import assign_locations_to_actions
 from api.services.price_enricher import enrich_actions_with_prices, get_data_age_minutes
@@ -26,10 +30,11 @@ from api.services.cointracking_helpers import (
     pick_primary_location_for_symbol,
     load_ctapi_exchanges
 )
-from api.services.csv_helpers import load_csv_balances, to_csv
+from api.services.csv_helpers import load_csv_balances, iter_csv
 from api.services.utils import parse_min_usd, to_rows, norm_primary_symbols
+from api.utils.formatters import FastJSONResponse
 from fastapi import middleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from pathlib import Path
 from fastapi.staticfiles import StaticFiles
@@ -169,7 +174,12 @@ from api.models import APIKeysRequest, PortfolioMetricsRequest
 
 # Logger already configured above
 
-app = FastAPI(docs_url="/docs", redoc_url="/redoc", openapi_url="/openapi.json")
+app = FastAPI(
+    docs_url="/docs",
+    redoc_url="/redoc",
+    openapi_url="/openapi.json",
+    default_response_class=FastJSONResponse,
+)
 logger.info("FastAPI initialized: docs=%s redoc=%s openapi=%s",
             "/docs", "/redoc", "/openapi.json")
 
@@ -212,7 +222,7 @@ async def crypto_exception_handler(request: Request, exc: CryptoRebalancerExcept
     elif isinstance(exc, DataException):
         status_code = ErrorCodes.DATA_NOT_FOUND
     
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status_code,
         content={
             "ok": False,
@@ -232,7 +242,7 @@ async def generic_exception_handler(request: Request, exc: Exception):
         exc_info=True
     )
 
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
         content={
             "ok": False,
@@ -304,6 +314,9 @@ app.middleware("http")(request_logger_middleware)
 # No-cache for static files (development only)
 app.middleware("http")(no_cache_dev_middleware)
 
+# Per-request memo for user secrets lookups
+app.add_middleware(UserSecretsScopeMiddleware)
+
 BASE_DIR = Path(__file__).resolve().parent.parent  # répertoire du repo (niveau au-dessus d'api/)
 STATIC_DIR = BASE_DIR / "static"                    # D:\Python\smartfolio\static
 DATA_DIR = BASE_DIR / "data"                        # D:\Python\smartfolio\data
@@ -363,10 +376,9 @@ try:
 except (OSError, RuntimeError) as e:
     logger.warning(f"Could not mount /tests: {e}")
 
-# Cache prix unifié utilisant le système centralisé
-_PRICE_CACHE: Dict[str, tuple] = {}  # symbol -> (ts, price)
-from api.utils.cache import cache_get as _cache_get, cache_set as _cache_set
- 
+# Cache prix des actions: voir _PRICE_CACHE dans api/services/price_enricher.py
+from api.utils.cache import cache_get as _cache_get, cache_set as _cache_set, compute_etag, etag_matches
+
 # >>> BEGIN: CT-API helpers (centralized constants) >>>
 try:
     from connectors import cointracking_api as ct_api
@@ -439,32 +451,66 @@ async def resolve_current_balances(
 # Debug endpoint removed
 
 # ---------- balances ----------
+BALANCES_CACHE_CONTROL = "private, max-age=30, must-revalidate"
+
+
 @app.get("/balances/current")
 async def balances_current(
     source: str = Query("cointracking"),
     min_usd: float = Query(1.0),
-    user: str = Depends(get_active_user)
+    user: str = Depends(get_active_user),
+    if_none_match: str | None = Header(None),
 ):
+    """
+    Balances courantes filtrées, avec ETag: l'UI qui poll reçoit un 304 sans
+    corps tant que le snapshot n'a pas changé.
+    """
     from api.unified_data import get_unified_filtered_balances
-    return await get_unified_filtered_balances(source=source, min_usd=min_usd, user_id=user)
+    data = await get_unified_filtered_balances(source=source, min_usd=min_usd, user_id=user)
+
+    body = FastJSONResponse(data).body
+    etag = compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": BALANCES_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # ---------- rebalance (JSON) ----------
-@app.post("/rebalance/plan")
-async def rebalance_plan(
-    source: str = Query("cointracking"),
-    min_usd_raw: str | None = Query(None, alias="min_usd"),
-    pricing: str = Query("local"),   # local | auto
-    dynamic_targets: bool = Query(False, description="Use dynamic targets from CCS/cycle module"),
-    payload: Dict[str, Any] = Body(...),
-    pricing_diag: bool = Query(False, description="Include pricing diagnostic details in response meta")
-):
-    min_usd = parse_min_usd(min_usd_raw, default=1.0)
+# Plans récents, pour que plan.csv après plan (même requête) ne recalcule pas tout
+_PLAN_CACHE: Dict[str, tuple] = {}
+PLAN_CACHE_TTL = 10  # court: les corrections de holdings doivent se propager vite
+_PLAN_CACHE_MAXSIZE = 64
+
+
+def _plan_cache_key(source: str, min_usd_raw: str | None, pricing: str, dynamic_targets: bool,
+                    payload: Dict[str, Any], pricing_diag: bool) -> str:
+    blob = orjson.dumps(
+        [source, min_usd_raw, pricing, dynamic_targets, payload, pricing_diag],
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+    )
+    return hashlib.sha1(blob).hexdigest()
 
-    # portefeuille - utiliser la fonction helper unifiée
-    from api.unified_data import get_unified_filtered_balances
-    unified_data = await get_unified_filtered_balances(source=source, min_usd=min_usd)
-    rows = unified_data.get("items", [])
+
+async def _compute_rebalance_plan(
+    source: str,
+    min_usd_raw: str | None,
+    pricing: str,
+    dynamic_targets: bool,
+    payload: Dict[str, Any],
+    pricing_diag: bool = False,
+) -> Dict[str, Any]:
+    """Construit le plan de rebalancement (partagé par /rebalance/plan et /rebalance/plan.csv).
+
+    Le plan est mémoïsé PLAN_CACHE_TTL secondes par requête identique; il est
+    partagé entre appels et ne doit pas être modifié par l'appelant.
+    """
+    cache_key = _plan_cache_key(source, min_usd_raw, pricing, dynamic_targets, payload, pricing_diag)
+    cached = _cache_get(_PLAN_CACHE, cache_key, PLAN_CACHE_TTL)
+    if cached is not None:
+        return cached
+
+    min_usd = parse_min_usd(min_usd_raw, default=1.0)
 
     # targets - support for dynamic CCS-based targets
     if dynamic_targets and payload.get("dynamic_targets_pct"):
@@ -484,6 +530,19 @@ async def rebalance_plan(
                 if g:
                     group_targets_pct[g] = p
 
+    # Pas de cibles (ex: premier rendu UI) -> plan vide, sans appel connecteur ni calcul
+    if not group_targets_pct:
+        return {
+            "actions": [],
+            "unknown_aliases": [],
+            "meta": {"source_used": None, "items_count": 0, "pricing_mode": pricing},
+        }
+
+    # portefeuille - utiliser la fonction helper unifiée
+    from api.unified_data import get_unified_filtered_balances
+    unified_data = await get_unified_filtered_balances(source=source, min_usd=min_usd)
+    rows = unified_data.get("items", [])
+
     primary_symbols = norm_primary_symbols(payload.get("primary_symbols"))
 
     # Permettre un fallback: "pricing_diag" dans le body JSON si non passé en query
@@ -493,7 +552,9 @@ async def rebalance_plan(
         except (ValueError, TypeError, KeyError):
             pricing_diag = False
 
-    plan = plan_rebalance(
+    # plan_rebalance est synchrone et CPU-bound: l'exécuter hors de la boucle d'événements
+    plan = await asyncio.to_thread(
+        plan_rebalance,
         rows=rows,
         group_targets_pct=group_targets_pct,
         min_usd=min_usd,
@@ -514,14 +575,11 @@ async def rebalance_plan(
     from services.rebalance import _format_hint_for_location, _get_exec_hint
     
     # Créer un index des holdings par groupe pour les actions sans location
-    holdings_by_group = {}
+    holdings_by_group: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
     for row in rows:
         group = row.get("group")
-        if not group:
-            continue
-        if group not in holdings_by_group:
-            holdings_by_group[group] = []
-        holdings_by_group[group].append(row)
+        if group:
+            holdings_by_group[group].append(row)
     
     for action in plan.get("actions", []):
         location = action.get("location")
@@ -533,7 +591,7 @@ async def rebalance_plan(
         else:
             # Action sans location spécifique - utiliser l'ancienne logique comme fallback
             group = action.get("group", "")
-            group_items = holdings_by_group.get(group, [])
+            group_items = holdings_by_group.get(group) or []
             action["exec_hint"] = _get_exec_hint(action, {group: group_items})
 
     # meta pour UI - fusionner avec les métadonnées pricing existantes
@@ -554,9 +612,24 @@ async def rebalance_plan(
             update_unknown_aliases_cache(unknown_aliases)
         except ImportError:
             pass  # Ignore si pas disponible
-    
+
+    _cache_set(_PLAN_CACHE, cache_key, plan, maxsize=_PLAN_CACHE_MAXSIZE)
     return plan
 
+
+@app.post("/rebalance/plan")
+async def rebalance_plan(
+    source: str = Query("cointracking"),
+    min_usd_raw: str | None = Query(None, alias="min_usd"),
+    pricing: str = Query("local"),   # local | auto
+    dynamic_targets: bool = Query(False, description="Use dynamic targets from CCS/cycle module"),
+    payload: Dict[str, Any] = Body(...),
+    pricing_diag: bool = Query(False, description="Include pricing diagnostic details in response meta")
+):
+    plan = await _compute_rebalance_plan(source, min_usd_raw, pricing, dynamic_targets, payload, pricing_diag)
+    # Réponse orjson directe: évite le passage jsonable_encoder sur des milliers d'actions
+    return FastJSONResponse(plan)
+
 # ---------- rebalance (CSV) ----------
 @app.options("/rebalance/plan.csv")
 async def rebalance_plan_csv_preflight():
@@ -572,11 +645,10 @@ async def rebalance_plan_csv(
     payload: Dict[str, Any] = Body(...)
 ):
     # réutilise le JSON pour construire le CSV
-    plan = await rebalance_plan(source=source, min_usd_raw=min_usd_raw, pricing=pricing, dynamic_targets=dynamic_targets, payload=payload)
+    plan = await _compute_rebalance_plan(source, min_usd_raw, pricing, dynamic_targets, payload)
     actions = plan.get("actions") or []
-    csv_text = to_csv(actions)
     headers = {"Content-Disposition": 'attachment; filename="rebalance-actions.csv"'}
-    return Response(content=csv_text, media_type="text/csv", headers=headers)
+    return StreamingResponse(iter_csv(actions), media_type="text/csv", headers=headers)
 
 
 # ---------- helpers prix + csv ----------
@@ -15,10 +15,12 @@ from .security import add_security_headers_middleware
 from .timing import request_timing_middleware
 from .logging import request_logger_middleware
 from .cache import no_cache_dev_middleware
+from .secrets_scope import UserSecretsScopeMiddleware
 
 __all__ = [
     "add_security_headers_middleware",
     "request_timing_middleware",
     "request_logger_middleware",
     "no_cache_dev_middleware",
+    "UserSecretsScopeMiddleware",
 ]
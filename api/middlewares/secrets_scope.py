@@ -0,0 +1,31 @@
+"""
+Per-request user secrets scope middleware.
+
+Opens a request-local memo in services.user_secrets so repeated
+get_user_secrets() calls within one request skip the stat + cache lookup.
+
+Plain ASGI (no BaseHTTPMiddleware): no extra task group or memory stream
+per request, only a ContextVar set/reset around the downstream app.
+"""
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from services.user_secrets import begin_request_scope, end_request_scope
+
+
+class UserSecretsScopeMiddleware:
+    """Scope user secrets lookups to the current HTTP request"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = begin_request_scope()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_request_scope(token)
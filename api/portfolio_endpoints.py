@@ -7,13 +7,18 @@ Endpoints:
 - POST /portfolio/snapshot - Sauvegarder snapshot historique
 - GET /portfolio/trend - Données tendance graphiques
 - GET /portfolio/alerts - Alertes dérive vs targets
+- GET /portfolio/bundle - Métriques + performance + alertes (une seule résolution balances)
 """
 
 from fastapi import APIRouter, Query, HTTPException, Depends
 from typing import Dict, Any
+import asyncio
 import logging
 
+import numpy as np
+
 from services.portfolio import PortfolioAnalytics
+from connectors.cointracking import invalidate_balance_cache
 from api.deps import get_active_user
 from api.utils.formatters import success_response, error_response
 
@@ -30,6 +35,24 @@ portfolio_analytics = PortfolioAnalytics()
 # Configuration
 COMPUTE_ON_STUB_SOURCES = False
 
+# Targets par défaut des alertes de dérive (peuvent être dynamiques dans le futur)
+_DEFAULT_TARGETS = (
+    ("BTC", 35),
+    ("ETH", 25),
+    ("Stablecoins", 10),
+    ("SOL", 10),
+    ("L1/L0 majors", 10),
+    ("Others", 10),
+)
+_DEFAULT_TARGET_SUM = 100.0  # échelle des targets (en %)
+_DEFAULT_GROUPS = tuple(group for group, _ in _DEFAULT_TARGETS)
+_DEFAULT_TARGETS_ARR = np.array([pct for _, pct in _DEFAULT_TARGETS], dtype=np.float64)
+
+async def _calculate_metrics(balances: Dict[str, Any]) -> Dict[str, Any]:
+    """calculate_portfolio_metrics dans un thread : ne bloque pas la boucle asyncio"""
+    return await asyncio.to_thread(portfolio_analytics.calculate_portfolio_metrics, balances)
+
+
 # Helper to get resolve function dynamically
 def _get_resolve_balances():
     """Dynamic import to avoid circular dependency"""
@@ -52,6 +75,79 @@ def _to_rows(items):
     ]
 
 
+def _compute_alerts(metrics: Dict[str, Any], drift_threshold: float) -> Dict[str, Any]:
+    """
+    Calcule les alertes de dérive par groupe à partir des métriques portfolio.
+
+    Args:
+        metrics: Résultat de calculate_portfolio_metrics
+        drift_threshold: Seuil de dérive en % (critique au-delà de 1.5x)
+
+    Returns:
+        Dict status/message/max_drift/compteurs/alerts
+    """
+    current_distribution = metrics.get("group_distribution", {})
+    total_value = metrics.get("total_value_usd", 0)
+
+    # Calculer les déviations (vectorisé sur les groupes)
+    current_values = [current_distribution.get(group, 0) for group in _DEFAULT_GROUPS]
+    current_arr = np.fromiter(current_values, dtype=np.float64, count=len(current_values))
+    if total_value > 0:
+        current_pct_arr = current_arr / total_value * _DEFAULT_TARGET_SUM
+    else:
+        current_pct_arr = np.zeros_like(current_arr)
+
+    diff_arr = _DEFAULT_TARGETS_ARR - current_pct_arr
+    drift_arr = np.abs(diff_arr)
+    value_diff_arr = diff_arr / _DEFAULT_TARGET_SUM * total_value
+
+    # Déterminer le niveau d'alerte (> 15% critique, > 10% warning par défaut)
+    critical_mask = drift_arr > drift_threshold * 1.5
+    warning_mask = ~critical_mask & (drift_arr > drift_threshold)
+    levels = np.where(critical_mask, "critical", np.where(warning_mask, "warning", "ok"))
+
+    critical_count = int(np.count_nonzero(critical_mask))
+    warning_count = int(np.count_nonzero(warning_mask))
+    max_drift = float(drift_arr.max(initial=0.0))
+
+    alerts = [
+        {
+            "group": group,
+            "target_pct": target_pct,
+            "current_pct": round(float(current_pct), 2),
+            "current_value": current_value,
+            "drift": round(float(drift), 2),
+            "drift_direction": "over" if current_pct > target_pct else "under",
+            "level": str(level),
+            "action": "buy" if value_diff > 0 else "sell",
+            "action_amount": round(abs(float(value_diff)), 2)
+        }
+        for (group, target_pct), current_value, current_pct, drift, level, value_diff in zip(
+            _DEFAULT_TARGETS, current_values, current_pct_arr, drift_arr, levels, value_diff_arr
+        )
+    ]
+
+    # Statut global
+    if critical_count > 0:
+        overall_status = "critical"
+        message = f"{critical_count} groupe(s) en dérive critique"
+    elif warning_count > 0:
+        overall_status = "warning"
+        message = f"{warning_count} groupe(s) en dérive modérée"
+    else:
+        overall_status = "ok"
+        message = "Portfolio aligné avec les targets"
+
+    return {
+        "status": overall_status,
+        "message": message,
+        "max_drift": round(max_drift, 2),
+        "critical_count": critical_count,
+        "warning_count": warning_count,
+        "alerts": alerts
+    }
+
+
 @router.get("/portfolio/metrics")
 async def portfolio_metrics(
     user: str = Depends(get_active_user),
@@ -85,7 +181,7 @@ async def portfolio_metrics(
             return error_response("No real data: stub source in use", code=400)
 
         # Calculer les métriques
-        metrics = portfolio_analytics.calculate_portfolio_metrics(balances)
+        metrics = await _calculate_metrics(balances)
         performance = portfolio_analytics.calculate_performance_metrics(
             metrics,
             user_id=user,
@@ -121,6 +217,8 @@ async def save_portfolio_snapshot(
         saved = portfolio_analytics.save_portfolio_snapshot(balances, user_id=user, source=source)
 
         if saved:
+            # Le prochain affichage doit refléter l'état réel, pas le cache balances
+            invalidate_balance_cache()
             return success_response(
                 data={"saved": True},
                 meta={"user": user, "source": source, "message": "Snapshot sauvegardé"}
@@ -168,89 +266,12 @@ async def get_portfolio_alerts(
         balances = {"source_used": res.get("source_used"), "items": rows}
 
         # Calculer les métriques actuelles
-        metrics = portfolio_analytics.calculate_portfolio_metrics(balances)
-
-        if not metrics.get("ok"):
-            return error_response("Impossible de calculer les métriques", code=500)
-
-        current_distribution = metrics["metrics"]["group_distribution"]
-        total_value = metrics["metrics"]["total_value_usd"]
-
-        # Targets par défaut (peuvent être dynamiques dans le futur)
-        default_targets = {
-            "BTC": 35,
-            "ETH": 25,
-            "Stablecoins": 10,
-            "SOL": 10,
-            "L1/L0 majors": 10,
-            "Others": 10
-        }
-
-        # Calculer les déviations
-        alerts = []
-        max_drift = 0
-        critical_count = 0
-        warning_count = 0
-
-        for group, target_pct in default_targets.items():
-            current_value = current_distribution.get(group, 0)
-            current_pct = (current_value / total_value * 100) if total_value > 0 else 0
-
-            drift = abs(current_pct - target_pct)
-            drift_direction = "over" if current_pct > target_pct else "under"
-
-            # Déterminer le niveau d'alerte
-            if drift > drift_threshold * 1.5:  # > 15% par défaut
-                level = "critical"
-                critical_count += 1
-            elif drift > drift_threshold:  # > 10% par défaut
-                level = "warning"
-                warning_count += 1
-            else:
-                level = "ok"
-
-            if drift > max_drift:
-                max_drift = drift
-
-            # Calculer l'action recommandée
-            value_diff = (target_pct - current_pct) / 100 * total_value
-            action = "buy" if value_diff > 0 else "sell"
-            action_amount = abs(value_diff)
-
-            alerts.append({
-                "group": group,
-                "target_pct": target_pct,
-                "current_pct": round(current_pct, 2),
-                "current_value": current_value,
-                "drift": round(drift, 2),
-                "drift_direction": drift_direction,
-                "level": level,
-                "action": action,
-                "action_amount": round(action_amount, 2)
-            })
-
-        # Statut global
-        if critical_count > 0:
-            overall_status = "critical"
-            message = f"{critical_count} groupe(s) en dérive critique"
-        elif warning_count > 0:
-            overall_status = "warning"
-            message = f"{warning_count} groupe(s) en dérive modérée"
-        else:
-            overall_status = "ok"
-            message = "Portfolio aligné avec les targets"
+        metrics = await _calculate_metrics(balances)
 
         return success_response(
-            data={
-                "status": overall_status,
-                "message": message,
-                "max_drift": round(max_drift, 2),
-                "critical_count": critical_count,
-                "warning_count": warning_count,
-                "alerts": alerts
-            },
+            data=_compute_alerts(metrics, drift_threshold),
             meta={
-                "total_value": total_value,
+                "total_value": metrics.get("total_value_usd", 0),
                 "drift_threshold": drift_threshold,
                 "user": user,
                 "source": source
@@ -261,6 +282,65 @@ async def get_portfolio_alerts(
         return error_response(str(e), code=500)
 
 
+@router.get("/portfolio/bundle")
+async def portfolio_bundle(
+    user: str = Depends(get_active_user),
+    source: str = Query("cointracking"),
+    anchor: str = Query("prev_snapshot"),
+    window: str = Query("24h"),
+    min_usd: float = Query(1.0),
+    drift_threshold: float = Query(10.0)
+):
+    """
+    Métriques, performance et alertes de dérive en un seul appel.
+
+    Les balances sont résolues une seule fois ; performance et alertes sont
+    ensuite calculées en parallèle hors de la boucle d'événements.
+
+    Args:
+        user: ID utilisateur (from authenticated context)
+        source: Source de données (cointracking, cointracking_api, etc.)
+        anchor: Type d'ancre pour P&L ("midnight", "prev_snapshot", "prev_close")
+        window: Fenêtre temporelle ("24h", "7d", "30d", "ytd")
+        min_usd: Seuil minimal USD
+        drift_threshold: Seuil de dérive en % pour les alertes
+
+    Returns:
+        {"metrics", "performance", "alerts"} au format success_response
+    """
+    try:
+        resolve_func = _get_resolve_balances()
+        res = await resolve_func(source=source, user_id=user, min_usd=min_usd)
+        balances = {"source_used": res.get("source_used"), "items": _to_rows(res.get("items", []))}
+
+        if ((balances.get('source_used') or '').startswith('stub') or balances.get('source_used') == 'none') and not COMPUTE_ON_STUB_SOURCES:
+            return error_response("No real data: stub source in use", code=400)
+
+        metrics = await _calculate_metrics(balances)
+
+        performance, alerts = await asyncio.gather(
+            asyncio.to_thread(
+                portfolio_analytics.calculate_performance_metrics,
+                metrics, user_id=user, source=source, anchor=anchor, window=window
+            ),
+            asyncio.to_thread(_compute_alerts, metrics, drift_threshold),
+        )
+
+        return success_response(
+            data={"metrics": metrics, "performance": performance, "alerts": alerts},
+            meta={
+                "source": source,
+                "anchor": anchor,
+                "window": window,
+                "drift_threshold": drift_threshold,
+                "user": user
+            }
+        )
+    except Exception as e:
+        logger.exception("Error calculating portfolio bundle")
+        return error_response(str(e), code=500)
+
+
 @router.get("/portfolio/export-lists")
 async def export_crypto_lists(
     user: str = Depends(get_active_user),
@@ -25,6 +25,9 @@ import re
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/portfolio/optimization", tags=["Portfolio Optimization"])
 
+# Symboles traités comme stables/fiat dans les stats de portefeuille
+_STABLE_SYMBOLS = frozenset(FIAT_STABLE_FIXED)
+
 class OptimizationRequest(BaseModel):
     """Request model for portfolio optimization"""
     objective: str = "max_sharpe"
@@ -502,10 +505,9 @@ async def analyze_portfolio(
         if not items:
             raise HTTPException(status_code=400, detail="No portfolio data found")
 
-        # Aggregate stats
+        # Aggregate stats (une seule passe Python, sommes vectorisées)
         values = []
-        total_value = 0.0
-        stable_value = 0.0
+        stable_flags = []
         symbols = []
         for it in items:
             v = float(it.get("value_usd") or 0.0)
@@ -513,18 +515,21 @@ async def analyze_portfolio(
             if v <= 0 or not sym:
                 continue
             values.append(v)
-            total_value += v
             symbols.append(sym)
-            if sym in FIAT_STABLE_FIXED:
-                stable_value += v
+            stable_flags.append(sym in _STABLE_SYMBOLS)
+
+        vals = np.array(values, dtype=np.float64)
+        total_value = float(vals.sum())
+        stable_value = float(vals[np.array(stable_flags, dtype=bool)].sum())
 
         if total_value <= 0:
             raise HTTPException(status_code=400, detail="Total portfolio value is zero")
 
         # Concentration metrics
-        weights = [v / total_value for v in sorted(values, reverse=True)]
-        top10_weight = sum(weights[:10])
-        hhi = sum(w * w for w in weights)  # Herfindahl-Hirschman Index
+        sorted_vals = np.sort(vals)[::-1]
+        weights = sorted_vals / total_value
+        top10_weight = float(weights[:10].sum())
+        hhi = float(np.dot(weights, weights))  # Herfindahl-Hirschman Index
 
         # History coverage
         # Consider a wider set of windows for better coverage-based suggestion
@@ -540,9 +545,8 @@ async def analyze_portfolio(
         # Suggest min_usd to target N assets
         suggested_min_usd = min_usd
         try:
-            sorted_vals = sorted(values, reverse=True)
             if 1 <= target_assets <= len(sorted_vals):
-                cutoff = sorted_vals[target_assets - 1]
+                cutoff = float(sorted_vals[target_assets - 1])
                 # Nudge down slightly to include borderline assets
                 suggested_min_usd = max(min_usd, round(cutoff * 0.95, 2))
         except Exception:
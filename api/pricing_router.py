@@ -2,7 +2,6 @@
 Pricing Router - Pricing Diagnostic Endpoints
 Extracted from api/main.py for better organization
 """
-import os
 import logging
 from typing import Dict
 from fastapi import APIRouter, Query
@@ -31,7 +30,7 @@ async def pricing_diagnostic(
       - price_source (local|market)
     """
     # Import des helpers depuis price_enricher (évite dépendance circulaire)
-    from api.services.price_enricher import get_data_age_minutes
+    from api.services.price_enricher import get_data_age_minutes, PRICE_HYBRID_MAX_AGE_MIN
 
     try:
         # Récupérer holdings unifiés avec filtrage homogène
@@ -75,7 +74,7 @@ async def pricing_diagnostic(
                 market_price_map = {}
 
         # Décision effective (même logique que 'auto' => hybride)
-        max_age_min = float(os.getenv("PRICE_HYBRID_MAX_AGE_MIN", "30"))
+        max_age_min = PRICE_HYBRID_MAX_AGE_MIN
         data_age_min = get_data_age_minutes(source_used)
         needs_market_correction = data_age_min > max_age_min
 
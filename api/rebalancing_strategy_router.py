@@ -4,12 +4,12 @@ Extracted from api/main.py (Phase 2C)
 """
 from __future__ import annotations
 from typing import Dict, List, Optional
-import json
-import hashlib
-from fastapi import APIRouter, HTTPException, Header
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import APIRouter, HTTPException, Header, Response
 from pydantic import BaseModel, Field
 
+from api.utils.cache import compute_etag, etag_matches
+
 router = APIRouter(prefix="", tags=["strategies"])
 
 # Stratégies de rebalancing prédéfinies
@@ -130,42 +130,45 @@ class StrategyDetailResponse(BaseModel):
     ok: bool = True
     strategy: Strategy
 
-# Helper functions
+# Payloads statiques sérialisés une seule fois à l'import
 def _strategies_payload() -> StrategyListResponse:
     return StrategyListResponse(strategies=[Strategy(**v) for v in REBALANCING_STRATEGIES.values()])
 
-def _strategies_etag() -> str:
-    blob = json.dumps(REBALANCING_STRATEGIES, sort_keys=True).encode("utf-8")
-    return hashlib.md5(blob).hexdigest()
+_STRATEGIES_JSON: bytes = orjson.dumps(_strategies_payload().model_dump())
+_STRATEGIES_ETAG: str = compute_etag(_STRATEGIES_JSON)
+_STRATEGY_DETAILS: Dict[str, bytes] = {
+    k: orjson.dumps(StrategyDetailResponse(strategy=Strategy(**v)).model_dump())
+    for k, v in REBALANCING_STRATEGIES.items()
+}
 
 # Endpoints
-@router.get("/strategies/list")
-async def get_rebalancing_strategies(if_none_match: str | None = Header(default=None)) -> JSONResponse:
+@router.get("/strategies/list", response_model=StrategyListResponse)
+async def get_rebalancing_strategies(if_none_match: str | None = Header(default=None)) -> Response:
     """Liste des stratégies de rebalancing prédéfinies avec cache ETag"""
-    etag = _strategies_etag()
-    if if_none_match and etag == if_none_match:
-        return JSONResponse(status_code=304, content=None, headers={"ETag": etag})
-    payload = _strategies_payload().model_dump()
-    return JSONResponse(payload, headers={"Cache-Control": "public, max-age=120", "ETag": etag})
+    headers = {"Cache-Control": "public, max-age=120", "ETag": _STRATEGIES_ETAG}
+    if etag_matches(if_none_match, _STRATEGIES_ETAG):
+        return Response(status_code=304, headers=headers)
+    return Response(content=_STRATEGIES_JSON, media_type="application/json", headers=headers)
 
-@router.get("/api/strategies/list")
-async def get_rebalancing_strategies_api_alias(if_none_match: str | None = Header(default=None)) -> JSONResponse:
+@router.get("/api/strategies/list", response_model=StrategyListResponse)
+async def get_rebalancing_strategies_api_alias(if_none_match: str | None = Header(default=None)) -> Response:
     """Alias pour compatibilité front attendu (/api/strategies/list)."""
     return await get_rebalancing_strategies(if_none_match)
 
-@router.get("/api/backtesting/strategies")
-async def get_backtesting_strategies(if_none_match: str | None = Header(default=None)) -> JSONResponse:
+@router.get("/api/backtesting/strategies", response_model=StrategyListResponse)
+async def get_backtesting_strategies(if_none_match: str | None = Header(default=None)) -> Response:
     """Alias pour la page de backtesting (même payload que /strategies/list)."""
     return await get_rebalancing_strategies(if_none_match)
 
-@router.get("/strategies/{strategy_id}")
-async def get_strategy_details(strategy_id: str) -> StrategyDetailResponse:
+@router.get("/strategies/{strategy_id}", response_model=StrategyDetailResponse)
+async def get_strategy_details(strategy_id: str) -> Response:
     """Détails d'une stratégie spécifique"""
-    if strategy_id not in REBALANCING_STRATEGIES:
+    body = _STRATEGY_DETAILS.get(strategy_id)
+    if body is None:
         raise HTTPException(status_code=404, detail="Stratégie non trouvée")
-    return StrategyDetailResponse(strategy=Strategy(**REBALANCING_STRATEGIES[strategy_id]))
+    return Response(content=body, media_type="application/json")
 
-@router.get("/api/strategies/{strategy_id}")
-async def get_strategy_details_api_alias(strategy_id: str) -> StrategyDetailResponse:
+@router.get("/api/strategies/{strategy_id}", response_model=StrategyDetailResponse)
+async def get_strategy_details_api_alias(strategy_id: str) -> Response:
     """Alias pour compatibilité front attendu (/api/strategies/{id})."""
     return await get_strategy_details(strategy_id)
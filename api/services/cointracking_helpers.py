@@ -6,10 +6,18 @@ Handles exchange classification, location normalization, and CT-API integration.
 """
 
 import logging
+from itertools import groupby
+from operator import itemgetter
 from typing import Dict, List, Any, Optional
 
+from api.utils.cache import cache_get, cache_set
+
 logger = logging.getLogger(__name__)
 
+# Snapshot cache for load_ctapi_exchanges: (min_usd, key prefix) -> (result, ts)
+_SNAP_CACHE: Dict[Any, tuple] = {}
+SNAP_CACHE_TTL = 60  # aligné sur le TTL de _post_api_cached
+SNAP_CACHE_MAXSIZE = 32  # min_usd vient de la query string: borner les clés
 
 def normalize_loc(label: str) -> str:
     """
@@ -41,14 +49,14 @@ def classify_location(loc: str) -> int:
 
     Used for determining optimal sell execution path.
     """
-    from constants import FAST_SELL_EXCHANGES, DEFI_HINTS, COLD_HINTS
+    from constants.exchanges import FAST_SELL_PATTERN, DEFI_PATTERN, COLD_PATTERN
 
     L = normalize_loc(loc)
-    if any(L.startswith(x) for x in FAST_SELL_EXCHANGES):
+    if FAST_SELL_PATTERN.match(L):
         return 0  # CEX rapide
-    if any(h in L for h in DEFI_HINTS):
+    if DEFI_PATTERN.search(L):
         return 1  # DeFi
-    if any(h in L for h in COLD_HINTS):
+    if COLD_PATTERN.search(L):
         return 2  # Cold/Hardware
     return 3  # reste
 
@@ -67,14 +75,36 @@ def pick_primary_location_for_symbol(symbol: str, detailed_holdings: dict) -> st
 
     Used for determining primary trading venue for rebalancing actions.
     """
-    best_loc, best_val = "CoinTracking", 0.0
+    best = build_primary_location_index(detailed_holdings).get(symbol)
+    return best[0] if best else "CoinTracking"
+
+
+def build_primary_location_index(detailed_holdings: dict) -> Dict[str, tuple]:
+    """
+    Map every symbol to the exchange holding its highest USD value, in one pass.
+
+    Args:
+        detailed_holdings: Dict mapping location -> list of asset dicts
+            Each asset dict should have: symbol, value_usd
+
+    Returns:
+        Dict symbol -> (location, value_usd). Symbols whose value is never
+        positive are omitted (callers default to "CoinTracking").
+
+    Prefer this over calling pick_primary_location_for_symbol per item: it
+    walks the holdings once instead of once per symbol.
+    """
+    best: Dict[str, tuple] = {}
     for loc, assets in (detailed_holdings or {}).items():
         for a in assets or []:
-            if a.get("symbol") == symbol:
-                v = float(a.get("value_usd") or 0)
-                if v > best_val:
-                    best_val, best_loc = v, loc
-    return best_loc
+            v = float(a.get("value_usd") or 0)
+            if v <= 0:
+                continue
+            sym = a.get("symbol")
+            cur = best.get(sym)
+            if cur is None or v > cur[1]:
+                best[sym] = (loc, v)
+    return best
 
 
 async def load_ctapi_exchanges(min_usd: float = 0.0, api_key: Optional[str] = None, api_secret: Optional[str] = None) -> dict:
@@ -113,7 +143,14 @@ async def load_ctapi_exchanges(min_usd: float = 0.0, api_key: Optional[str] = No
         }
 
     Note: If min_usd is specified, filters assets and recalculates exchange totals.
+    Results are memoized for SNAP_CACHE_TTL seconds per (min_usd, api_key);
+    callers must treat the returned dict as read-only.
     """
+    cache_key = ("snap", float(min_usd or 0.0), api_key[:8] if api_key else None)
+    cached = cache_get(_SNAP_CACHE, cache_key, SNAP_CACHE_TTL)
+    if cached is not None:
+        return cached
+
     try:
         from connectors import cointracking_api as ct_api
     except ImportError:
@@ -127,30 +164,33 @@ async def load_ctapi_exchanges(min_usd: float = 0.0, api_key: Optional[str] = No
     exchanges = payload.get("exchanges") or []
     detailed = payload.get("detailed_holdings") or {}
 
-    # Filter by min_usd threshold if specified
+    # Filter by min_usd threshold if specified: flatten to (loc, value, asset)
+    # once, then regroup per location to rebuild holdings and exchange totals
     if min_usd and detailed:
+        flat = [
+            (loc, v, a)
+            for loc, assets in detailed.items()
+            for a in assets or []
+            if (v := float(a.get("value_usd") or 0)) >= min_usd
+        ]
         filtered = {}
-        for loc, assets in detailed.items():
-            keep = [a for a in (assets or []) if float(a.get("value_usd") or 0) >= min_usd]
-            if keep:
-                filtered[loc] = keep
-        detailed = filtered
-
-        # Recalculate exchange totals
         ex2 = []
-        for loc, assets in detailed.items():
-            tv = sum(float(a.get("value_usd") or 0) for a in assets)
+        # flat est déjà contigu par location (ordre d'itération du dict)
+        for loc, group in groupby(flat, key=itemgetter(0)):
+            rows = list(group)
+            filtered[loc] = [a for _, _, a in rows]
+            tv = sum(v for _, v, _ in rows)
             if tv >= min_usd:
                 ex2.append({
                     "location": loc,
                     "total_value_usd": tv,
-                    "asset_count": len(assets),
-                    "assets": sorted(
-                        assets,
-                        key=lambda x: float(x.get("value_usd") or 0),
-                        reverse=True
-                    )
+                    "asset_count": len(rows),
+                    "assets": [a for _, _, a in sorted(rows, key=itemgetter(1), reverse=True)]
                 })
-        exchanges = sorted(ex2, key=lambda x: x["total_value_usd"], reverse=True)
+        detailed = filtered
+        exchanges = sorted(ex2, key=itemgetter("total_value_usd"), reverse=True)
 
-    return {"exchanges": exchanges, "detailed_holdings": detailed}
+    result = {"exchanges": exchanges, "detailed_holdings": detailed}
+    if exchanges or detailed:
+        cache_set(_SNAP_CACHE, cache_key, result, maxsize=SNAP_CACHE_MAXSIZE)
+    return result
@@ -6,12 +6,97 @@ Handles flexible CSV parsing with multiple column name variants and CSV export.
 """
 
 import csv
+import io
 import os
 import logging
-from typing import List, Dict, Any
+import tempfile
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Miroir Parquet (optionnel) des balances parsées, à côté du CSV source
+try:
+    import pandas as pd
+    import pyarrow  # noqa: F401  (moteur Parquet de pandas)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+_ITEM_COLUMNS = ["symbol", "alias", "amount", "value_usd", "location"]
+
+# Variantes de noms de colonnes, par ordre de priorité
+_SYMBOL_COLUMNS = ("Ticker", "Currency", "Coin", "Symbol", "Asset")
+_AMOUNT_COLUMNS = ("Amount", "amount", "Qty", "Quantity", "quantity")
+_VALUE_COLUMNS = ("Value in USD", "Value (USD)", "USD Value", "Current Value (USD)", "value_usd", "Value", "value")
+_LOCATION_COLUMNS = ("Exchange", "exchange", "Location", "location", "Wallet", "wallet")
+
+
+def _column_indices(header_index: Dict[str, int], candidates: Sequence[str]) -> Tuple[int, ...]:
+    """Indices des colonnes candidates présentes dans l'en-tête (ordre de priorité conservé)."""
+    return tuple(header_index[c] for c in candidates if c in header_index)
+
+
+def _first_cell(row: List[str], indices: Tuple[int, ...]) -> Optional[str]:
+    """Première cellule non vide parmi les colonnes données."""
+    for i in indices:
+        if i < len(row):
+            v = row[i].strip()
+            if v:
+                return v
+    return None
+
+
+def _first_float(row: List[str], indices: Tuple[int, ...]) -> float:
+    """Premier nombre parsable parmi les colonnes données (virgule décimale acceptée)."""
+    for i in indices:
+        if i < len(row):
+            v = row[i].strip()
+            if v:
+                try:
+                    return float(v.replace(",", "."))
+                except ValueError:
+                    continue
+    return 0.0
+
+
+def _parquet_mirror_path(csv_file_path: str) -> str:
+    return csv_file_path + ".parquet"
+
+
+def _read_parquet_mirror(csv_file_path: str) -> Optional[List[Dict[str, Any]]]:
+    """Balances depuis le miroir Parquet s'il est au moins aussi récent que le CSV, sinon None."""
+    if not PARQUET_AVAILABLE:
+        return None
+    pq_path = _parquet_mirror_path(csv_file_path)
+    try:
+        if os.path.getmtime(pq_path) < os.path.getmtime(csv_file_path):
+            return None
+        return pd.read_parquet(pq_path, columns=_ITEM_COLUMNS).to_dict("records")
+    except OSError:
+        return None
+    except Exception as e:
+        logger.warning(f"Parquet mirror unreadable for {csv_file_path}, reparsing CSV: {e}")
+        return None
+
+
+def _write_parquet_mirror(csv_file_path: str, items: List[Dict[str, Any]]) -> None:
+    """Écrit (atomiquement) le miroir Parquet Snappy des balances parsées ; best effort."""
+    if not PARQUET_AVAILABLE:
+        return
+    pq_path = _parquet_mirror_path(csv_file_path)
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=".mirror.", suffix=".tmp", dir=os.path.dirname(pq_path) or ".")
+        os.close(fd)
+        pd.DataFrame.from_records(items, columns=_ITEM_COLUMNS).to_parquet(
+            tmp_path, compression="snappy", index=False
+        )
+        os.replace(tmp_path, pq_path)
+    except Exception as e:
+        logger.warning(f"Could not write Parquet mirror for {csv_file_path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 
 async def load_csv_balances(csv_file_path: str) -> List[Dict[str, Any]]:
     """
@@ -41,11 +126,17 @@ async def load_csv_balances(csv_file_path: str) -> List[Dict[str, Any]]:
         - Auto-detects CSV dialect (delimiter: , or ;)
         - Filters out rows with missing symbol, zero amount, or zero value
         - Handles commas in numeric values (e.g., "1,234.56")
+        - Parsed items are mirrored to "<csv>.parquet" (when pyarrow is available)
+          and served from there while the mirror is newer than the CSV
     """
     items = []
     if not os.path.exists(csv_file_path):
         return items
 
+    cached = _read_parquet_mirror(csv_file_path)
+    if cached is not None:
+        return cached
+
     try:
         with open(csv_file_path, 'r', encoding='utf-8-sig', newline='') as f:
             # Auto-detect CSV dialect
@@ -59,66 +150,86 @@ async def load_csv_balances(csv_file_path: str) -> List[Dict[str, Any]]:
                     delimiter = ","
                 dialect = _Dialect()
 
-            reader = csv.DictReader(f, dialect=dialect)
+            # Colonnes résolues une seule fois depuis l'en-tête, puis lecture positionnelle
+            reader = csv.reader(f, dialect=dialect)
+            header = next(reader, None)
+            if not header:
+                return items
+            header_index = {(k.strip() if isinstance(k, str) else k): i for i, k in enumerate(header)}
+            symbol_cols = _column_indices(header_index, _SYMBOL_COLUMNS)
+            amount_cols = _column_indices(header_index, _AMOUNT_COLUMNS)
+            value_cols = _column_indices(header_index, _VALUE_COLUMNS)
+            location_cols = _column_indices(header_index, _LOCATION_COLUMNS)
+
             for row in reader:
-                # Normalize keys and values (strip whitespace)
-                normalized_row = {
-                    (k.strip() if isinstance(k, str) else k): (v.strip() if isinstance(v, str) else v)
-                    for k, v in row.items()
-                }
-
-                # Extract symbol (multiple column name variants)
-                symbol = None
-                for key in ("Ticker", "Currency", "Coin", "Symbol", "Asset"):
-                    if key in normalized_row and normalized_row[key]:
-                        symbol = normalized_row[key].upper().strip()
-                        break
-
-                # Extract amount (multiple column name variants)
-                amount = 0.0
-                for key in ("Amount", "amount", "Qty", "Quantity", "quantity"):
-                    if key in normalized_row and normalized_row[key]:
-                        try:
-                            # Handle comma as decimal separator
-                            amount = float(str(normalized_row[key]).replace(",", "."))
-                            break
-                        except ValueError:
-                            continue
-
-                # Extract USD value (multiple column name variants)
-                value_usd = 0.0
-                for key in ("Value in USD", "Value (USD)", "USD Value", "Current Value (USD)", "value_usd", "Value", "value"):
-                    if key in normalized_row and normalized_row[key]:
-                        try:
-                            # Handle comma as decimal separator
-                            value_usd = float(str(normalized_row[key]).replace(",", "."))
-                            break
-                        except ValueError:
-                            continue
-
-                # Extract location (multiple column name variants)
-                location = "CoinTracking"
-                for key in ("Exchange", "exchange", "Location", "location", "Wallet", "wallet"):
-                    if key in normalized_row and normalized_row[key]:
-                        location = normalized_row[key].strip()
-                        break
+                symbol = _first_cell(row, symbol_cols)
+                if not symbol:
+                    continue
+                amount = _first_float(row, amount_cols)
+                value_usd = _first_float(row, value_cols)
 
                 # Only add valid rows (with symbol, positive amount and value)
-                if symbol and amount > 0 and value_usd > 0:
+                if amount > 0 and value_usd > 0:
+                    symbol = symbol.upper()
                     items.append({
                         "symbol": symbol,
                         "alias": symbol,
                         "amount": amount,
                         "value_usd": value_usd,
-                        "location": location
+                        "location": _first_cell(row, location_cols) or "CoinTracking"
                     })
 
+        _write_parquet_mirror(csv_file_path, items)
+
     except Exception as e:
         logger.error(f"Error parsing CSV file {csv_file_path}: {e}")
 
     return items
 
 
+CSV_HEADER = ["group", "alias", "symbol", "action", "usd", "est_quantity", "price_used", "exec_hint"]
+
+
+def iter_csv(actions: List[Dict[str, Any]], chunk_rows: int = 500) -> Iterator[str]:
+    """
+    Stream rebalancing actions as CSV text chunks.
+
+    Rows are formatted by csv.writer (fields containing commas or quotes are
+    quoted) into a small buffer that is flushed every chunk_rows rows, so
+    the full export is never held in memory.
+
+    Args:
+        actions: List of action dicts (see to_csv for keys)
+        chunk_rows: Number of rows per yielded chunk
+
+    Yields:
+        CSV text chunks, each ending with a newline
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(CSV_HEADER)
+    pending = 1
+    for a in actions or []:
+        writer.writerow([
+            a.get("group", ""),
+            a.get("alias", ""),
+            a.get("symbol", ""),
+            a.get("action", ""),
+            f"{float(a.get('usd') or 0.0):.2f}",
+            ("" if a.get("est_quantity") is None else f"{a.get('est_quantity')}"),
+            ("" if a.get("price_used") is None else f"{a.get('price_used')}"),
+            a.get("exec_hint", ""),
+        ])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+            pending = 0
+    if pending:
+        yield buf.getvalue()
+
+
 def to_csv(actions: List[Dict[str, Any]]) -> str:
     """
     Generate CSV string from rebalancing actions.
@@ -144,18 +255,9 @@ def to_csv(actions: List[Dict[str, Any]]) -> str:
     Notes:
         - USD values formatted to 2 decimal places
         - Empty fields for missing optional values
+        - Fields containing commas or quotes are quoted (RFC 4180)
         - exec_hint provides human-readable execution guidance
+        - Prefer iter_csv for HTTP responses (streamed, constant memory)
     """
-    lines = ["group,alias,symbol,action,usd,est_quantity,price_used,exec_hint"]
-    for a in actions or []:
-        lines.append("{},{},{},{},{:.2f},{},{},{}".format(
-            a.get("group", ""),
-            a.get("alias", ""),
-            a.get("symbol", ""),
-            a.get("action", ""),
-            float(a.get("usd") or 0.0),
-            ("" if a.get("est_quantity") is None else f"{a.get('est_quantity')}"),
-            ("" if a.get("price_used") is None else f"{a.get('price_used')}"),
-            a.get("exec_hint", "")
-        ))
-    return "\n".join(lines)
+    # Pas de saut de ligne final (format historique)
+    return "".join(iter_csv(actions))[:-1]
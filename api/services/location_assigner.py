@@ -7,10 +7,15 @@ logic for SELL actions (split by holdings across exchanges).
 """
 
 import logging
+from collections import defaultdict
+from operator import itemgetter
 from typing import Dict, List, Any
 
 logger = logging.getLogger(__name__)
 
+# Keys rewritten on every sell split (everything else is copied from the action)
+_SPLIT_OVERRIDES = frozenset(("usd", "location"))
+
 
 def assign_locations_to_actions(
     plan: Dict[str, Any],
@@ -25,7 +30,8 @@ def assign_locations_to_actions(
 
     Args:
         plan: Rebalancing plan containing actions
-        rows: Current balance rows with symbol, location, value_usd
+        rows: Current balance rows as produced by to_rows()
+            (upper-cased symbol, float value_usd, location)
         min_trade_usd: Minimum trade size in USD (default: 25.0)
 
     Returns:
@@ -42,25 +48,23 @@ def assign_locations_to_actions(
         f"{len(rows)} rows, {len(plan.get('actions', []))} actions"
     )
 
-    # Build holdings map: holdings[symbol][location] -> total value_usd
-    holdings: Dict[str, Dict[str, float]] = {}
+    # Build holdings map in a single pass: holdings[symbol][location] -> total value_usd
+    holdings: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
     locations_seen = set()
 
+    # Rows come from to_rows(): symbol already upper-cased, value_usd already a float
     for r in rows or []:
-        sym = (r.get("symbol") or "").upper()
-        loc = r.get("location") or "Unknown"
+        loc = r["location"] or "Unknown"
         locations_seen.add(loc)
-        val = float(r.get("value_usd") or 0.0)
-
-        if sym and val > 0:
-            holdings.setdefault(sym, {}).setdefault(loc, 0.0)
-            holdings[sym][loc] += val
+        val = r["value_usd"]
+        if val > 0:
+            holdings[r["symbol"]][loc] += val
 
     logger.info(
         f"📍 assign_locations_to_actions: "
         f"{len(locations_seen)} locations found: {sorted(locations_seen)}"
     )
-    logger.info(f"📍 Sample holdings: {dict(list(holdings.items())[:3])}")
+    logger.info(f"📍 Sample holdings: {dict((k, dict(v)) for k, v in list(holdings.items())[:3])}")
 
     actions = plan.get("actions") or []
     out_actions: List[Dict[str, Any]] = []
@@ -76,10 +80,11 @@ def assign_locations_to_actions(
             continue
 
         # SELL: Split across exchanges where coin is held
-        if usd < 0 and sym in holdings and holdings[sym]:
+        if usd < 0 and sym in holdings:
             to_sell = -usd
-            locs = [(ex, v) for ex, v in holdings[sym].items() if v > 0]
-            total_val = sum(v for _, v in locs)
+            # Only positive values are ever accumulated, so no filtering needed
+            locs = list(holdings[sym].items())
+            total_val = sum(holdings[sym].values())
 
             # No holdings detected -> leave as 'Unknown'
             if total_val <= 0:
@@ -90,6 +95,9 @@ def assign_locations_to_actions(
             # Proportional allocation by value_usd
             alloc_sum = 0.0
             tmp_parts: List[Dict[str, Any]] = []
+            # Template built once per action; each split only adds usd/location
+            base = {k: v for k, v in a.items() if k not in _SPLIT_OVERRIDES}
+            min_part = max(0.01, float(min_trade_usd or 0))
 
             for i, (ex, val) in enumerate(locs):
                 share = to_sell * (val / total_val)
@@ -102,18 +110,13 @@ def assign_locations_to_actions(
                     part = round(to_sell - alloc_sum, 2)
 
                 # Only create action if above minimum threshold
-                if part >= max(0.01, float(min_trade_usd or 0)):
-                    na = dict(a)
-                    na["usd"] = -part
-                    na["location"] = ex
-                    tmp_parts.append(na)
+                if part >= min_part:
+                    tmp_parts.append({**base, "usd": -part, "location": ex})
 
             # If all parts below min_trade_usd, consolidate to biggest exchange
             if not tmp_parts:
-                ex_big = max(locs, key=lambda t: t[1])[0]
-                na = dict(a)
-                na["location"] = ex_big
-                tmp_parts.append(na)
+                ex_big = max(locs, key=itemgetter(1))[0]
+                tmp_parts.append({**a, "location": ex_big})
 
             out_actions.extend(tmp_parts)
         else:
@@ -9,10 +9,56 @@ or hybrid approach with intelligent fallback.
 import os
 import time
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable
+
+import numpy as np
+
+from api.utils.cache import cache_get, cache_set
 
 logger = logging.getLogger(__name__)
 
+# Hybrid pricing configuration (process config, not per-request input)
+PRICE_HYBRID_MAX_AGE_MIN = float(os.getenv("PRICE_HYBRID_MAX_AGE_MIN", "30"))
+PRICE_HYBRID_DEVIATION_PCT = float(os.getenv("PRICE_HYBRID_DEVIATION_PCT", "5.0"))
+
+# Market prices memoized per symbol across requests: symbol -> (price, ts)
+_PRICE_CACHE: Dict[str, tuple] = {}
+PRICE_TTL = int(os.getenv("PRICE_CACHE_TTL_S", "30"))
+_PRICE_CACHE_MAXSIZE = 2048
+
+# CSV mtime lookups (stat syscalls) memoized briefly: COINTRACKING_CSV -> ((mtime,), ts)
+_MTIME_CACHE: Dict[Optional[str], tuple] = {}
+_MTIME_TTL = 5
+
+
+def _csv_mtime() -> Optional[float]:
+    """Resolve the balances CSV and return its mtime (memoized _MTIME_TTL seconds)."""
+    env_path = os.getenv("COINTRACKING_CSV")
+    cached = cache_get(_MTIME_CACHE, env_path, _MTIME_TTL)
+    if cached is not None:
+        return cached[0]
+
+    csv_path = env_path
+    if not csv_path:
+        # Use same path resolution as connector
+        default_cur = "CoinTracking - Current Balance_mini.csv"
+        candidates = [os.path.join("data", default_cur), default_cur]
+        for candidate in candidates:
+            if candidate and os.path.exists(candidate):
+                csv_path = candidate
+                break
+
+    mtime = None
+    if csv_path and os.path.exists(csv_path):
+        try:
+            mtime = os.path.getmtime(csv_path)
+        except Exception as e:
+            logger.warning(f"Failed to get mtime for CSV file {csv_path}: {e}")
+
+    # Wrapped in a tuple so a missing file (None) is cached too
+    cache_set(_MTIME_CACHE, env_path, (mtime,))
+    return mtime
+
 
 def get_data_age_minutes(source_used: str) -> float:
     """
@@ -31,23 +77,9 @@ def get_data_age_minutes(source_used: str) -> float:
     """
     if source_used == "cointracking":
         # For local CSV, check file modification time
-        csv_path = os.getenv("COINTRACKING_CSV")
-        if not csv_path:
-            # Use same path resolution as connector
-            default_cur = "CoinTracking - Current Balance_mini.csv"
-            candidates = [os.path.join("data", default_cur), default_cur]
-            for candidate in candidates:
-                if candidate and os.path.exists(candidate):
-                    csv_path = candidate
-                    break
-
-        if csv_path and os.path.exists(csv_path):
-            try:
-                mtime = os.path.getmtime(csv_path)
-                age_seconds = time.time() - mtime
-                return age_seconds / 60.0
-            except Exception as e:
-                logger.warning(f"Failed to get mtime for CSV file {csv_path}: {e}")
+        mtime = _csv_mtime()
+        if mtime is not None:
+            return (time.time() - mtime) / 60.0
 
         # Fallback: Consider CSV data as recent to use local prices
         return 5.0  # 5 minutes default (recent)
@@ -60,6 +92,44 @@ def get_data_age_minutes(source_used: str) -> float:
         return 0.0
 
 
+async def get_market_prices(symbols: Iterable[str]) -> Dict[str, float]:
+    """
+    Resolve market prices for symbols, fetching only those not cached.
+
+    Symbols still fresh in _PRICE_CACHE (PRICE_TTL seconds) are served from
+    memory; the remainder is fetched in a single batch call.
+
+    Args:
+        symbols: Upper-cased symbols
+
+    Returns:
+        Dict symbol -> price (symbols without a known price are omitted)
+    """
+    prices: Dict[str, float] = {}
+    missing: List[str] = []
+    for sym in symbols:
+        cached = cache_get(_PRICE_CACHE, sym, PRICE_TTL)
+        if cached is None:
+            missing.append(sym)
+        else:
+            prices[sym] = cached
+
+    if missing:
+        try:
+            from services.pricing import aget_prices_usd
+            fresh = await aget_prices_usd(missing)
+        except Exception as e:
+            logger.debug(f"Async pricing failed, falling back to sync: {e}")
+            from services.pricing import get_prices_usd
+            fresh = get_prices_usd(missing)
+        for sym, price in fresh.items():
+            if price is not None:
+                cache_set(_PRICE_CACHE, sym, price, maxsize=_PRICE_CACHE_MAXSIZE)
+                prices[sym] = price
+
+    return prices
+
+
 async def enrich_actions_with_prices(
     plan: Dict[str, Any],
     rows: List[Dict[str, Any]],
@@ -77,7 +147,8 @@ async def enrich_actions_with_prices(
 
     Args:
         plan: Rebalancing plan containing actions
-        rows: Current balance rows with symbol, amount, value_usd
+        rows: Current balance rows as produced by to_rows()
+            (upper-cased symbol, float value_usd, amount float or None)
         pricing_mode: Pricing strategy ("local", "auto", "hybrid")
         source_used: Data source identifier (for age calculation)
         diagnostic: If True, include detailed pricing information in response
@@ -90,20 +161,21 @@ async def enrich_actions_with_prices(
         - If data is fresh: Prefer local prices, fallback to market if missing
         - If local price unavailable: Use market price as fallback
     """
-    # Hybrid configuration
-    max_age_min = float(os.getenv("PRICE_HYBRID_MAX_AGE_MIN", "30"))
-    max_deviation_pct = float(os.getenv("PRICE_HYBRID_DEVIATION_PCT", "5.0"))
+    # Hybrid configuration (read once at import, see module constants)
+    max_age_min = PRICE_HYBRID_MAX_AGE_MIN
+    max_deviation_pct = PRICE_HYBRID_DEVIATION_PCT
 
-    # Calculate local prices (always needed for hybrid)
+    # Calculate local prices (always needed for hybrid).
+    # Rows come from to_rows(): symbol upper-cased, value_usd float, amount float or None
     local_price_map: Dict[str, float] = {}
     for row in rows or []:
-        sym = row.get("symbol")
-        if not sym:
-            continue
-        value_usd = float(row.get("value_usd") or 0.0)
-        amount = float(row.get("amount") or 0.0)
-        if value_usd > 0 and amount > 0:
-            local_price_map[sym.upper()] = value_usd / amount
+        value_usd = row["value_usd"]
+        amount = row["amount"]
+        if value_usd > 0 and amount and amount > 0:
+            local_price_map[row["symbol"]] = value_usd / amount
+
+    # Data age is resolved once per request (CSV source -> stat syscall)
+    data_age_min = get_data_age_minutes(source_used)
 
     # Prepare prices based on mode
     price_map: Dict[str, float] = {}
@@ -124,19 +196,11 @@ async def enrich_actions_with_prices(
             if sym:
                 symbols.add(sym.upper())
 
-        data_age_min = get_data_age_minutes(source_used)
         needs_market_correction = data_age_min > max_age_min
         missing_local_prices = symbols - set(local_price_map.keys())
 
         if (needs_market_correction or missing_local_prices) and symbols:
-            try:
-                from services.pricing import aget_prices_usd
-                market_price_map = await aget_prices_usd(list(symbols))
-            except Exception as e:
-                logger.debug(f"Async pricing failed, falling back to sync: {e}")
-                from services.pricing import get_prices_usd
-                market_price_map = get_prices_usd(list(symbols))
-            market_price_map = {k: v for k, v in market_price_map.items() if v is not None}
+            market_price_map = await get_market_prices(symbols)
 
         # Force hybrid selection logic for next step
         pricing_mode = "hybrid"
@@ -146,7 +210,6 @@ async def enrich_actions_with_prices(
         price_map = local_price_map.copy()
 
         # Determine if correction is needed
-        data_age_min = get_data_age_minutes(source_used)
         needs_market_correction = data_age_min > max_age_min
 
         # Get required symbols
@@ -162,17 +225,14 @@ async def enrich_actions_with_prices(
 
         # Fetch market prices if data is stale OR local prices missing
         if (needs_market_correction or needs_market_fallback) and symbols:
-            try:
-                from services.pricing import aget_prices_usd
-                market_price_map = await aget_prices_usd(list(symbols))
-            except Exception as e:
-                logger.debug(f"Async pricing failed, falling back to sync: {e}")
-                from services.pricing import get_prices_usd
-                market_price_map = get_prices_usd(list(symbols))
-            market_price_map = {k: v for k, v in market_price_map.items() if v is not None}
+            market_price_map = await get_market_prices(symbols)
 
-    # Enrich actions
+    # Enrich actions: resolve prices per action, then compute est_quantity
+    # for all priced actions in one vectorized pass (SoA: usd[] / price[])
     pricing_details = [] if diagnostic else None
+    priced_actions: List[Dict[str, Any]] = []
+    priced_usd: List[float] = []
+    priced_price: List[float] = []
     for a in plan.get("actions", []) or []:
         sym = a.get("symbol")
         if not sym or a.get("usd") is None or a.get("price_used"):
@@ -199,8 +259,6 @@ async def enrich_actions_with_prices(
 
         elif pricing_mode == "hybrid":
             # Hybrid logic with intelligent fallback
-            data_age_min = get_data_age_minutes(source_used)
-
             if data_age_min > max_age_min:
                 # Stale data -> prefer market prices
                 if market_price:
@@ -223,11 +281,14 @@ async def enrich_actions_with_prices(
             a["price_used"] = float(final_price)
             a["price_source"] = price_source
             try:
-                a["est_quantity"] = round(float(a["usd"]) / float(final_price), 8)
+                priced_usd.append(float(a["usd"]))
             except Exception as e:
                 logger.warning(
                     f"Failed to calculate est_quantity for action {a.get('symbol')}: {e}"
                 )
+            else:
+                priced_actions.append(a)
+                priced_price.append(a["price_used"])
 
         if diagnostic:
             pricing_details.append({
@@ -238,6 +299,14 @@ async def enrich_actions_with_prices(
                 "price_source": price_source
             })
 
+    if priced_actions:
+        # Prices are strictly positive here, so no division-by-zero masking is needed
+        quantities = np.round(
+            np.asarray(priced_usd, dtype=np.float64) / np.asarray(priced_price, dtype=np.float64), 8
+        )
+        for a, qty in zip(priced_actions, quantities.tolist()):
+            a["est_quantity"] = qty
+
     # Add pricing metadata
     if not plan.get("meta"):
         plan["meta"] = {}
@@ -249,7 +318,7 @@ async def enrich_actions_with_prices(
         plan["meta"]["pricing_hybrid"] = {
             "max_age_min": max_age_min,
             "max_deviation_pct": max_deviation_pct,
-            "data_age_min": get_data_age_minutes(source_used)
+            "data_age_min": data_age_min
         }
     if diagnostic and pricing_details is not None:
         plan["meta"]["pricing_details"] = pricing_details
@@ -60,7 +60,9 @@ def to_rows(raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 
     Notes:
         - Filters out rows without symbol
-        - Converts all values to appropriate types
+        - Converts all values to appropriate types once, so downstream
+          stages (location assignment, pricing) can skip re-coercion:
+          symbol is upper-cased and value_usd is always a float
         - Amount can be None if not provided by connector
     """
     out: List[Dict[str, Any]] = []
@@ -68,11 +70,12 @@ def to_rows(raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         symbol = r.get("symbol") or r.get("coin") or r.get("name")
         if not symbol:
             continue
+        amount = r.get("amount")
         out.append({
-            "symbol": str(symbol),
+            "symbol": str(symbol).upper(),
             "alias": (r.get("alias") or r.get("name") or r.get("symbol")),
             "value_usd": float(r.get("value_usd") or r.get("value") or 0.0),
-            "amount": float(r.get("amount") or 0.0) if r.get("amount") else None,
+            "amount": float(amount) if amount else None,
             "location": r.get("location") or r.get("exchange") or "Unknown",
         })
     return out
@@ -289,6 +289,13 @@ def get_shutdown_handler():
             except Exception as e:
                 logger.warning(f"⚠️ Task scheduler cleanup failed: {e}")
 
+            # Close shared CoinTracking HTTP client
+            try:
+                from connectors.cointracking_api import aclose_ct_client
+                await aclose_ct_client()
+            except Exception as e:
+                logger.warning(f"⚠️ CoinTracking client cleanup failed: {e}")
+
             # Close Playwright browser if initialized
             try:
                 from api.crypto_toolbox_endpoints import shutdown_playwright
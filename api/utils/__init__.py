@@ -7,6 +7,7 @@ from .formatters import (
     paginated_response,
     legacy_response,
     StandardResponse,
+    FastJSONResponse,
     to_csv,
     format_currency,
     format_percentage,
@@ -20,6 +21,7 @@ __all__ = [
     "paginated_response",
     "legacy_response",
     "StandardResponse",
+    "FastJSONResponse",
     # Data formatters
     "to_csv",
     "format_currency",
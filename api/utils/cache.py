@@ -1,27 +1,54 @@
 """
 Cache utilities for API endpoints
+
+Entries are stored as (value, timestamp) tuples using time.monotonic(), so
+TTLs are immune to wall-clock adjustments (NTP, DST).
 """
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+import hashlib
 import time
 
 def cache_get(cache: Dict, key: Any, ttl: int):
     """Get value from cache if not expired"""
     if key in cache:
         val, ts = cache[key]
-        if time.time() - ts < ttl:
+        if time.monotonic() - ts < ttl:
             return val
     return None
 
-def cache_set(cache: Dict, key: Any, val: Any):
-    """Set value in cache with timestamp"""
-    cache[key] = (val, time.time())
+def cache_set(cache: Dict, key: Any, val: Any, maxsize: Optional[int] = None):
+    """Set value in cache with timestamp.
+
+    When maxsize is given, the oldest entries (insertion order) are evicted
+    so the cache never holds more than maxsize keys.
+    """
+    cache.pop(key, None)
+    cache[key] = (val, time.monotonic())
+    if maxsize is not None:
+        while len(cache) > maxsize:
+            del cache[next(iter(cache))]
 
 def cache_clear_expired(cache: Dict, ttl: int):
     """Remove expired entries from cache"""
-    now = time.time()
+    now = time.monotonic()
     expired_keys = [
         k for k, (_, ts) in cache.items() 
         if now - ts >= ttl
     ]
     for k in expired_keys:
-        del cache[k]
\ No newline at end of file
+        del cache[k]
+
+
+def compute_etag(payload: bytes) -> str:
+    """Weak ETag for a serialized response body"""
+    return f'W/"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match or not etag:
+        return False
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip() == "*" or tag.strip().removeprefix("W/") == opaque
+        for tag in if_none_match.split(",")
+    )
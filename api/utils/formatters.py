@@ -5,6 +5,7 @@ This module provides:
 1. CSV/currency/percentage formatters (existing)
 2. Standard API response formatters (new) - success_response(), error_response()
 3. JSON sanitization utilities - sanitize_for_json()
+4. FastJSONResponse - orjson-backed default response class
 
 Usage:
     from api.utils.formatters import success_response, error_response, sanitize_for_json
@@ -16,8 +17,9 @@ Usage:
 """
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
+import orjson
 import csv
 import io
 import math
@@ -130,6 +132,26 @@ def sanitize_for_json(data: Any, replace_inf_with: Optional[float] = None) -> An
         return data
 
 
+# ============================================================================
+# Fast JSON Response
+# ============================================================================
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson-backed response used as the application's default_response_class.
+
+    Accepts non-string dict keys (serialized as strings, like stdlib json)
+    and numpy arrays/scalars, so endpoints can return analytics payloads
+    without a jsonable_encoder pass. NaN/inf are rendered as null.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
 # ============================================================================
 # Standard API Response Formatters
 # ============================================================================
@@ -1,7 +1,9 @@
 from __future__ import annotations
 import os
 import csv
-from typing import Any, Dict, List, Optional
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
 
 try:
     # API (si présent)
@@ -526,15 +528,54 @@ async def get_unified_balances_by_exchange(source: str = "cointracking") -> Dict
     return await get_unified_balances_by_exchange("cointracking")
 
 
-async def get_current_balances(source: str = "cointracking") -> Dict[str, Any]:
-    s = (source or "").lower()
-    if s in ("stub", "demo"):
-        return get_demo_balances()
-    if s == "cointracking":
-        return get_current_balances_from_csv()
+# ---------- Cache balances (TTL + single-flight) ----------
+# Plusieurs onglets du dashboard résolvent les balances en parallèle : un seul
+# appel upstream (CT-API ou parsing CSV) par clé et par fenêtre TTL. Un verrou
+# par clé : un fetch CT-API lent ne bloque pas les appelants de la source CSV.
+CT_BALANCE_TTL = float(os.getenv("CT_BALANCE_TTL", "30"))
+_BAL_CACHE: Dict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]] = {}  # key -> (expires, payload)
+_BAL_LOCKS: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+
+
+def invalidate_balance_cache() -> None:
+    """Vide le cache des balances (ex: après sauvegarde d'un snapshot)."""
+    _BAL_CACHE.clear()
+
+
+def _balance_cache_key(source: str) -> Tuple[str, str, str]:
+    return (source, os.getcwd(), os.getenv("COINTRACKING_CSV") or "")
+
+
+async def _fetch_current_balances(s: str) -> Dict[str, Any]:
     if s == "cointracking_api":
         if get_balances_via_api is None:
             return {"source_used": "cointracking_api", "items": []}
         res = await get_balances_via_api()
         return res or {"source_used": "cointracking_api", "items": []}
-    return get_current_balances_from_csv()
+    # Parsing CSV synchrone (glob + lecture fichiers) : hors de la boucle d'événements
+    return await asyncio.to_thread(get_current_balances_from_csv)
+
+
+async def get_current_balances(source: str = "cointracking") -> Dict[str, Any]:
+    s = (source or "").lower()
+    if s in ("stub", "demo"):
+        return get_demo_balances()
+    if s != "cointracking_api":
+        s = "cointracking"
+
+    key = _balance_cache_key(s)
+    hit = _BAL_CACHE.get(key)
+    if hit is None or time.monotonic() >= hit[0]:
+        async with _BAL_LOCKS.setdefault(key, asyncio.Lock()):
+            # Re-vérifier : une requête concurrente a pu remplir le cache pendant l'attente
+            hit = _BAL_CACHE.get(key)
+            if hit is None or time.monotonic() >= hit[0]:
+                res = await _fetch_current_balances(s)
+                if not res.get("items"):
+                    return res
+                hit = (time.monotonic() + CT_BALANCE_TTL, res)
+                _BAL_CACHE[key] = hit
+    res = hit[1]
+    return {**res, "items": list(res["items"])}
+
+
@@ -7,8 +7,10 @@ from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
 from dotenv import load_dotenv
+import httpx
 from collections import defaultdict
-from functools import partial
+from functools import lru_cache
+from operator import itemgetter
 
 import logging
 logger = logging.getLogger(__name__)
@@ -97,7 +99,7 @@ def _cache_set(key: tuple, payload: dict) -> None:
 
 async def _post_api_cached_async(method: str, params: Optional[Dict[str, Any]] = None, ttl: int = 60,
                                 api_key: Optional[str] = None, api_secret: Optional[str] = None) -> Dict[str, Any]:
-    """Version async de _post_api_cached utilisant un executor pour éviter le blocking I/O"""
+    """Version async de _post_api_cached (client httpx partagé, pas de thread bloqué)"""
     # Inclure les clés API dans la clé de cache pour éviter les collisions entre utilisateurs
     cache_key_parts = [method, json.dumps(params or {}, sort_keys=True)]
     if api_key:
@@ -108,10 +110,8 @@ async def _post_api_cached_async(method: str, params: Optional[Dict[str, Any]] =
     if hit is not None:
         return hit
 
-    # Utiliser un executor pour ne pas bloquer la boucle d'événements
-    loop = asyncio.get_running_loop()
-    payload = await loop.run_in_executor(None, partial(_post_api, method, params, api_key, api_secret))
-    
+    payload = await _post_api_async(method, params, api_key, api_secret)
+
     if isinstance(payload, dict):
         _cache_set(key, payload)
     return payload
@@ -236,10 +236,50 @@ async def get_items_by_exchange(client, min_usd: float = 0.0):
 
 
 # --- HTTP Low-level ----------------------------------------------------------
-def _post_api(method: str, params: Optional[Dict[str, Any]] = None,
-              api_key: Optional[str] = None, api_secret: Optional[str] = None) -> Dict[str, Any]:
+try:
+    import h2  # noqa: F401  (active HTTP/2 côté httpx)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# Client httpx partagé : une seule poignée de main TLS, connexions keep-alive réutilisées
+_CT_CLIENT: Optional[httpx.AsyncClient] = None
+_CT_CLIENT_LOCK = asyncio.Lock()
+
+
+async def _get_ct_client() -> httpx.AsyncClient:
+    """Retourne le client httpx partagé (créé paresseusement)."""
+    global _CT_CLIENT
+    if _CT_CLIENT is None or _CT_CLIENT.is_closed:
+        async with _CT_CLIENT_LOCK:
+            if _CT_CLIENT is None or _CT_CLIENT.is_closed:
+                _CT_CLIENT = httpx.AsyncClient(
+                    http2=_HTTP2_AVAILABLE,
+                    timeout=25,
+                    limits=httpx.Limits(max_keepalive_connections=10),
+                    headers={"User-Agent": "smartfolio/1.0"},
+                )
+    return _CT_CLIENT
+
+
+async def aclose_ct_client() -> None:
+    """Ferme le client httpx partagé (appelé au shutdown FastAPI)."""
+    global _CT_CLIENT
+    if _CT_CLIENT is not None:
+        await _CT_CLIENT.aclose()
+        _CT_CLIENT = None
+
+
+@lru_cache(maxsize=32)
+def _hmac_prototype(secret: str) -> "hmac.HMAC":
+    """État HMAC-SHA512 déjà initialisé avec la clé (à .copy() avant usage, jamais muté)."""
+    return hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha512)
+
+
+def _signed_request(method: str, params: Optional[Dict[str, Any]] = None,
+                    api_key: Optional[str] = None, api_secret: Optional[str] = None) -> Tuple[str, bytes, Dict[str, str]]:
     """
-    Appel POST CoinTracking v1 :
+    Prépare un appel POST CoinTracking v1 :
       - URL = {API_BASE}/
       - body form-urlencoded: method, nonce, ...extra params
       - headers: Key, Sign (HMAC-SHA512 du body avec SECRET)
@@ -262,28 +302,34 @@ def _post_api(method: str, params: Optional[Dict[str, Any]] = None,
         form.update(params)
 
     body = urlencode(form).encode("utf-8")
-    sign = hmac.new(sec.encode("utf-8"), body, hashlib.sha512).hexdigest()
-
-    req = Request(
-        url,
-        data=body,
-        headers={
-            "Key": key,
-            "Sign": sign,
-            "Content-Type": "application/x-www-form-urlencoded",
-            "User-Agent": "smartfolio/1.0",
-        },
-        method="POST",
-    )
+    h = _hmac_prototype(sec).copy()
+    h.update(body)
+    sign = h.hexdigest()
+    headers = {
+        "Key": key,
+        "Sign": sign,
+        "Content-Type": "application/x-www-form-urlencoded",
+        "User-Agent": "smartfolio/1.0",
+    }
+    return url, body, headers
+
+
+def _parse_json(raw: str) -> Dict[str, Any]:
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        raise RuntimeError(f"Réponse non JSON: {raw[:200]}...")
+
+
+def _post_api(method: str, params: Optional[Dict[str, Any]] = None,
+              api_key: Optional[str] = None, api_secret: Optional[str] = None) -> Dict[str, Any]:
+    """Appel POST CoinTracking v1 synchrone (urllib), voir _signed_request."""
+    url, body, headers = _signed_request(method, params, api_key, api_secret)
+    req = Request(url, data=body, headers=headers, method="POST")
 
     try:
         with urlopen(req, timeout=25) as resp:
-            raw = resp.read().decode("utf-8", errors="replace")
-            try:
-                payload = json.loads(raw)
-            except json.JSONDecodeError:
-                raise RuntimeError(f"Réponse non JSON: {raw[:200]}...")
-            return payload
+            return _parse_json(resp.read().decode("utf-8", errors="replace"))
     except HTTPError as e:
         raise RuntimeError(f"HTTP {e.code}: {e.read().decode('utf-8','replace')}")
     except URLError as e:
@@ -291,6 +337,21 @@ def _post_api(method: str, params: Optional[Dict[str, Any]] = None,
     except (OSError, TimeoutError) as e:
         raise RuntimeError(f"Network error: {e}")
 
+
+async def _post_api_async(method: str, params: Optional[Dict[str, Any]] = None,
+                          api_key: Optional[str] = None, api_secret: Optional[str] = None) -> Dict[str, Any]:
+    """Appel POST CoinTracking v1 asynchrone via le client httpx partagé."""
+    url, body, headers = _signed_request(method, params, api_key, api_secret)
+    client = await _get_ct_client()
+
+    try:
+        resp = await client.post(url, content=body, headers=headers)
+    except httpx.RequestError as e:
+        raise RuntimeError(f"Network error: {e}")
+    if resp.status_code >= 400:
+        raise RuntimeError(f"HTTP {resp.status_code}: {resp.text}")
+    return _parse_json(resp.text)
+
 # --- Parsing helpers ---------------------------------------------------------
 def _num(x: Any) -> Optional[float]:
     if x is None:
@@ -302,15 +363,29 @@ def _num(x: Any) -> Optional[float]:
     except (ValueError, TypeError):
         return None
 
+# Clés de repli, par ordre de priorité (les payloads CT varient selon l'endpoint)
+_SYMBOL_KEYS = ("symbol", "coin", "currency", "ticker", "name")
+_LOCATION_KEYS = ("exchange", "wallet", "location", "place", "group")
+_VALUE_FIAT_KEYS = ("value_fiat", "fiat", "usd", "value")
+_PRICE_FIAT_KEYS = ("price_fiat", "fiat_price", "price_usd", "price")
+
+def _first_num(d: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[float]:
+    """Première valeur numérique parmi `keys` ; 0 est une valeur valide, pas un manquant."""
+    for k in keys:
+        v = _num(d.get(k))
+        if v is not None:
+            return v
+    return None
+
 def _sym(d: Dict[str, Any]) -> Optional[str]:
-    for k in ("symbol","coin","currency","ticker","name"):
+    for k in _SYMBOL_KEYS:
         v = d.get(k)
         if v:
             return str(v).upper()
     return None
 
 def _location(d: Dict[str, Any]) -> Optional[str]:
-    for k in ("exchange","wallet","location","place","group"):
+    for k in _LOCATION_KEYS:
         v = d.get(k)
         if v:
             return str(v)
@@ -344,10 +419,10 @@ def _extract_rows_from_getBalance(payload: Dict[str, Any]) -> List[Dict[str, Any
         if not sym:
             continue
         amt = _num(it.get("amount"))
-        val_fiat = _num(it.get("value_fiat") or it.get("fiat") or it.get("usd") or it.get("value"))
+        val_fiat = _first_num(it, _VALUE_FIAT_KEYS)
         # prix direct si exposé, sinon calcule value/amount
-        px = _num(it.get("price_fiat") or it.get("fiat_price") or it.get("price_usd") or it.get("price"))
-        if px is None and val_fiat is not None and amt is not None and amt > 0:
+        px = _first_num(it, _PRICE_FIAT_KEYS)
+        if not px and val_fiat is not None and amt is not None and amt > 0:
             px = val_fiat / amt
 
         rows.append({
@@ -649,6 +724,70 @@ def _get_details_dict(payload: Dict[str, Any]) -> Dict[str, Any]:
     # dernier recours : si 'payload' lui-même est déjà la map
     return payload if isinstance(payload, dict) else {}
 
+# --- Sonde de changement (getBalance conditionnel) ---------------------------
+# La CT-API n'expose ni ETag ni If-Modified-Since : on sonde la dernière
+# transaction (getTrades limit=1) et on resert les lignes normalisées du dernier
+# getBalance si elle n'a pas bougé. CT_BALANCE_MAX_AGE borne la dérive des
+# valorisations (prix). Appel à froid : getBalance seul, comme avant la sonde
+# (CT-API limitée en débit) ; l'empreinte n'est prise qu'à la revalidation.
+CT_BALANCE_MAX_AGE = float(os.getenv("CT_BALANCE_MAX_AGE", "300"))
+_BALANCE_TTL = 60  # même fenêtre que l'ancien _post_api_cached_async("getBalance")
+# key -> (marker, fetched_at, checked_at, rows normalisées) ; horodatages monotonic
+_BALANCE_PROBE: dict[Optional[str], tuple[Optional[str], float, float, tuple]] = {}
+
+
+async def _last_change_marker(api_key: Optional[str] = None, api_secret: Optional[str] = None) -> Optional[str]:
+    """Empreinte de la dernière transaction CT, ou None si la sonde échoue."""
+    try:
+        p = await _post_api_async("getTrades", {"limit": 1, "order": "DESC"}, api_key, api_secret)
+    except (RuntimeError, ValueError) as e:
+        logger.debug(f"CT change probe failed: {e}")
+        return None
+    if not isinstance(p, dict):
+        return None
+    trades = {k: v for k, v in p.items() if k not in ("success", "method")}
+    return json.dumps(trades, sort_keys=True, default=str)
+
+
+def _rows_from_balance_payload(p: Any) -> List[Dict[str, Any]]:
+    """Lignes normalisées d'un payload getBalance (détails parfois sous 'result')."""
+    rows = _extract_rows_from_getBalance(p) or []
+    if not rows and isinstance(p, dict) and isinstance(p.get("result"), dict):
+        rows = _extract_rows_from_getBalance(p["result"]) or []
+    return rows
+
+
+async def _get_balance_rows(api_key: Optional[str] = None, api_secret: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Lignes getBalance mémoïsées par clé API, revalidées par la sonde au-delà du TTL.
+
+    Renvoie une nouvelle liste de copies : l'appelant peut la modifier sans
+    toucher au cache.
+    """
+    key = api_key[:8] if api_key else None
+    now = time.monotonic()
+    prev = _BALANCE_PROBE.get(key)
+    current = None
+
+    if prev is not None and now - prev[1] < CT_BALANCE_MAX_AGE:
+        marker, fetched_at, checked_at, rows = prev
+        if now - checked_at < _BALANCE_TTL:
+            return [dict(r) for r in rows]
+        # Sonde avant getBalance : une transaction arrivée entre les deux rend
+        # l'empreinte plus ancienne que les lignes -> simple refetch au tour suivant
+        current = await _last_change_marker(api_key, api_secret)
+        if marker is not None and current == marker:
+            logger.debug("CT change probe: no new transaction, reusing getBalance rows")
+            _BALANCE_PROBE[key] = (marker, fetched_at, now, rows)
+            return [dict(r) for r in rows]
+
+    payload = await _post_api_async("getBalance", {}, api_key, api_secret)
+    rows = _rows_from_balance_payload(payload)
+    if isinstance(payload, dict):
+        _BALANCE_PROBE[key] = (current, now, now, tuple(rows))
+    return rows
+
+
 # --- Public API --------------------------------------------------------------
 async def get_current_balances(source: str = "cointracking_api",
                                api_key: Optional[str] = None, api_secret: Optional[str] = None) -> dict:
@@ -658,10 +797,7 @@ async def get_current_balances(source: str = "cointracking_api",
     """
     # 1) getBalance
     try:
-        p = await _post_api_cached_async("getBalance", {}, ttl=60, api_key=api_key, api_secret=api_secret)
-        rows = _extract_rows_from_getBalance(p) or []
-        if not rows and isinstance(p, dict) and isinstance(p.get("result"), dict):
-            rows = _extract_rows_from_getBalance(p["result"]) or []
+        rows = await _get_balance_rows(api_key=api_key, api_secret=api_secret)
         # on retourne tel quel (même si value_usd == 0) ; le min_usd est géré par l'API FastAPI
         return {"source_used": "cointracking_api", "items": rows}
     except (RuntimeError, ValueError, KeyError):
@@ -712,14 +848,7 @@ async def get_current_balances(source: str = "cointracking_api",
 
 def _get_coin_value_fiat(d: dict) -> float | None:
     # CoinTracking renvoie parfois fiat, parfois value_fiat / usd
-    for k in ("fiat", "value_fiat", "usd", "value"):
-        v = d.get(k)
-        if v is not None:
-            try:
-                return float(str(v).replace(",", "").strip())
-            except (ValueError, TypeError):
-                pass
-    return None
+    return _first_num(d, ("fiat", "value_fiat", "usd", "value"))
 
 # cointracking_api.py
 
@@ -746,66 +875,56 @@ async def get_balances_by_exchange_via_api(api_key: Optional[str] = None, api_se
     rows_gb = _extract_rows_from_groupedBalance(p_gb)
     
     # 2) Déduplication: pour chaque symbol, aggréger les quantités mais garder la location principale
-    symbol_aggregated: Dict[str, Dict[str, Any]] = {}
+    #    (accumulateur dict en une passe : pour 20-200 lignes, bien plus léger qu'un DataFrame)
+    sym_totals: Dict[str, List[float]] = {}  # symbol -> [total_amount, total_value_usd]
     location_values: Dict[str, Dict[str, float]] = {}  # symbol -> {location: value}
-    
-    def _clean_ex(name: str) -> str:
-        n = (name or "").replace(" Balance", "").strip()
-        return n.title() if n else "Unknown"
-    
+
     for r in rows_gb:
         sym = str(r.get("symbol", "")).upper()
         amt = float(r.get("amount", 0))
         val = float(r.get("value_usd", 0))
-        loc = _clean_ex(r.get("location", ""))
-        
-        if sym and amt > 0 and val > 0:
-            # Agréger les quantités par symbole
-            if sym not in symbol_aggregated:
-                symbol_aggregated[sym] = {
-                    "symbol": sym,
-                    "total_amount": 0.0,
-                    "total_value_usd": 0.0,
-                    "price_usd": None
-                }
-                location_values[sym] = {}
-            
-            symbol_aggregated[sym]["total_amount"] += amt
-            symbol_aggregated[sym]["total_value_usd"] += val
-            location_values[sym][loc] = location_values[sym].get(loc, 0.0) + val
-            
-            # Calculer prix moyen pondéré
-            if symbol_aggregated[sym]["total_amount"] > 0:
-                symbol_aggregated[sym]["price_usd"] = symbol_aggregated[sym]["total_value_usd"] / symbol_aggregated[sym]["total_amount"]
+        if not (sym and amt > 0 and val > 0):
+            continue
+        loc = str(r.get("location") or "").replace(" Balance", "").strip().title() or "Unknown"
 
-    # 3) Attribution de la location principale (plus grande valeur) par symbole
-    detailed: Dict[str, List[Dict[str, Any]]] = {}
-    
-    for sym, data in symbol_aggregated.items():
-        # Trouver la location avec la plus grande valeur pour ce symbole
-        if sym in location_values and location_values[sym]:
-            primary_location = max(location_values[sym].items(), key=lambda x: x[1])[0]
+        acc = sym_totals.get(sym)
+        if acc is None:
+            sym_totals[sym] = [amt, val]
+            location_values[sym] = {loc: val}
         else:
-            primary_location = "CoinTracking"
-        
-        detailed.setdefault(primary_location, []).append({
+            acc[0] += amt
+            acc[1] += val
+            locs = location_values[sym]
+            locs[loc] = locs.get(loc, 0.0) + val
+
+    # 3) Attribution de la location principale (plus grande valeur) par symbole,
+    #    totaux par exchange cumulés dans la même passe
+    detailed: Dict[str, List[Dict[str, Any]]] = {}
+    totals: Dict[str, float] = defaultdict(float)
+
+    for sym, (total_amount, total_value_usd) in sym_totals.items():
+        loc = max(location_values[sym].items(), key=itemgetter(1))[0]
+        value_usd = round(total_value_usd, 8)
+        price_usd = total_value_usd / total_amount
+        detailed.setdefault(loc, []).append({
             "symbol": sym,
             "alias": sym,
-            "amount": data["total_amount"],
-            "value_usd": round(data["total_value_usd"], 8),
-            "price_usd": round(data["price_usd"], 8) if data["price_usd"] else None,
-            "location": primary_location
+            "amount": total_amount,
+            "value_usd": value_usd,
+            "price_usd": round(price_usd, 8) if price_usd else None,
+            "location": loc
         })
+        totals[loc] += value_usd
 
-    exchanges: List[Dict[str, Any]] = []
-    for ex, items in list(detailed.items()):
-        tv = sum(i.get("value_usd", 0.0) for i in items)
-        if tv <= 0:
-            detailed.pop(ex, None)
-            continue
-        exchanges.append({"location": ex, "total_value_usd": round(tv, 2), "asset_count": len(items)})
+    exchanges: List[Dict[str, Any]] = [
+        {"location": ex, "total_value_usd": round(totals[ex], 2), "asset_count": len(items)}
+        for ex, items in detailed.items()
+        if totals[ex] > 0
+    ]
+    for ex in [ex for ex in detailed if totals[ex] <= 0]:
+        detailed.pop(ex)
 
-    exchanges.sort(key=lambda e: e["total_value_usd"], reverse=True)
+    exchanges.sort(key=itemgetter("total_value_usd"), reverse=True)
     return {"source_used": "cointracking_api", "exchanges": exchanges, "detailed_holdings": detailed}
 
 def _normalize_exchange_name(raw: str) -> str:
@@ -881,7 +1000,7 @@ async def get_exchanges_totals(min_usd: float = 0.0) -> list[dict]:
         agg[ex]["location"] = ex
         agg[ex]["total_value_usd"] += val
 
-    out = sorted(agg.values(), key=lambda x: x["total_value_usd"], reverse=True)
+    out = sorted(agg.values(), key=itemgetter("total_value_usd"), reverse=True)
     return out
 
 async def get_coins_by_exchange(min_usd: float = 0.0) -> list[dict]:
@@ -2,6 +2,8 @@
 Module centralisé pour la gestion des exchanges et de leurs priorités.
 Unifie les constantes dupliquées à travers le projet.
 """
+import re
+from functools import lru_cache
 from typing import Dict, List
 
 # Classifications d'exchanges
@@ -79,9 +81,31 @@ SPECIAL_WALLET_PRIORITY: int = 25
 SPECIAL_WALLET_PREFIXES: List[str] = ["Metamask", "Solana", "Ron", "Siacoin", "Vsync"]
 
 
+def _alternation(names: List[str]) -> str:
+    return "|".join(map(re.escape, names))
+
+
+# Index et motifs précompilés (une seule passe C par label au lieu de k startswith/in)
+_PRIORITY_MAP: Dict[str, int] = {k.casefold(): v for k, v in EXCHANGE_PRIORITIES.items()}
+FAST_SELL_PATTERN = re.compile(f"^(?:{_alternation(FAST_SELL_EXCHANGES)})", re.IGNORECASE)
+DEFI_PATTERN = re.compile(_alternation(DEFI_HINTS), re.IGNORECASE)
+COLD_PATTERN = re.compile(_alternation(COLD_HINTS), re.IGNORECASE)
+_SPECIAL_WALLET_PATTERN = re.compile(f"^(?:{_alternation(SPECIAL_WALLET_PREFIXES)})")
+
+# Noms canoniques (première casse déclarée gagne: "MetaMask" plutôt que "Metamask")
+_CANONICAL_NAMES: Dict[str, str] = {}
+for _name in [*EXCHANGE_PRIORITIES, *FAST_SELL_EXCHANGES, *DEFI_HINTS, *COLD_HINTS]:
+    _CANONICAL_NAMES.setdefault(_name.casefold(), _name)
+del _name
+_SUFFIX_PATTERN = re.compile(r"\s+(?:balance|wallets?|account)$", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
 def normalize_exchange_name(exchange_name: str) -> str:
     """
     Normalise le nom d'un exchange pour standardiser les comparaisons.
+
+    Mémoïsé: les mêmes labels reviennent sur chaque ligne de chaque requête.
     
     Args:
         exchange_name: Nom brut de l'exchange
@@ -92,24 +116,20 @@ def normalize_exchange_name(exchange_name: str) -> str:
     if not exchange_name:
         return "Unknown"
     
-    # Nettoyage de base
-    name = exchange_name.strip()
-    name = name.replace("_", " ").replace("-", " ")
-    name = name.title()
-    
-    # Suppression des suffixes communs
-    suffixes_to_remove = [" Balance", " Wallet", " Account", " Wallets"]
-    for suffix in suffixes_to_remove:
-        if name.endswith(suffix):
-            name = name[:-len(suffix)]
-            break
+    # Nettoyage de base + suppression d'un suffixe commun (Balance, Wallet(s), Account)
+    name = exchange_name.replace("_", " ").replace("-", " ").strip()
+    name = _SUFFIX_PATTERN.sub("", name, count=1)
     
-    return name
+    # Exchanges connus: casse canonique ("okx" -> "OKX"), sinon Title Case
+    return _CANONICAL_NAMES.get(name.casefold()) or name.title()
 
 
+@lru_cache(maxsize=1024)
 def get_exchange_priority(exchange_name: str) -> int:
     """
     Retourne la priorité d'un exchange (plus petit = plus prioritaire).
+
+    Mémoïsé: appelé comme clé de tri pour chaque location de chaque action.
     
     Args:
         exchange_name: Nom de l'exchange
@@ -119,14 +139,14 @@ def get_exchange_priority(exchange_name: str) -> int:
     """
     normalized_name = normalize_exchange_name(exchange_name)
     
-    # Vérifier d'abord les priorités exactes
-    if normalized_name in EXCHANGE_PRIORITIES:
-        return EXCHANGE_PRIORITIES[normalized_name]
+    # Vérifier d'abord les priorités exactes (insensible à la casse: "Okx" -> "OKX")
+    priority = _PRIORITY_MAP.get(normalized_name.casefold())
+    if priority is not None:
+        return priority
     
     # Vérifier les préfixes spéciaux
-    for prefix in SPECIAL_WALLET_PREFIXES:
-        if normalized_name.startswith(prefix):
-            return SPECIAL_WALLET_PRIORITY
+    if _SPECIAL_WALLET_PATTERN.match(normalized_name):
+        return SPECIAL_WALLET_PRIORITY
     
     # Priorité par défaut
     return DEFAULT_EXCHANGE_PRIORITY
@@ -168,7 +188,7 @@ def is_fast_sell_exchange(exchange_name: str) -> bool:
         True si l'exchange permet des ventes rapides
     """
     normalized_name = normalize_exchange_name(exchange_name)
-    return any(normalized_name.startswith(fast_ex) for fast_ex in FAST_SELL_EXCHANGES)
+    return FAST_SELL_PATTERN.match(normalized_name) is not None
 
 
 def is_defi_exchange(exchange_name: str) -> bool:
@@ -182,7 +202,7 @@ def is_defi_exchange(exchange_name: str) -> bool:
         True si l'exchange est DeFi
     """
     normalized_name = normalize_exchange_name(exchange_name)
-    return any(hint in normalized_name for hint in DEFI_HINTS)
+    return DEFI_PATTERN.search(normalized_name) is not None
 
 
 def is_cold_storage(exchange_name: str) -> bool:
@@ -196,9 +216,10 @@ def is_cold_storage(exchange_name: str) -> bool:
         True si l'exchange est du cold storage
     """
     normalized_name = normalize_exchange_name(exchange_name)
-    return any(hint in normalized_name for hint in COLD_HINTS)
+    return COLD_PATTERN.search(normalized_name) is not None
 
 
+@lru_cache(maxsize=1024)
 def format_exec_hint(location: str, action_type: str) -> str:
     """Génère un hint d'exécution court basé sur la priorité (venue class).
 
@@ -206,6 +227,8 @@ def format_exec_hint(location: str, action_type: str) -> str:
       - "Sell on Binance"
       - "Sell on Uniswap (DeFi)"
       - "Buy on Ledger (manual)"
+
+    Mémoïsé: le produit (location, action_type) est petit et revient à chaque action.
     """
     loc = normalize_exchange_name(location)
     p = get_exchange_priority(loc)
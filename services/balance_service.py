@@ -12,6 +12,7 @@ Usage:
         user_id="demo"
     )
 """
+import asyncio
 import logging
 from typing import Dict, Any, List
 from pathlib import Path
@@ -79,7 +80,6 @@ class BalanceService:
             }
         """
         from api.services.data_router import UserDataRouter
-        from api.services.cointracking_helpers import pick_primary_location_for_symbol
 
         logger.info(f"Resolving balances for user '{user_id}' with source '{source}'")
 
@@ -293,7 +293,7 @@ class BalanceService:
 
     async def _legacy_api_mode(self, user_id: str = "demo") -> Dict[str, Any]:
         """Legacy API mode for backward compatibility."""
-        from api.services.cointracking_helpers import load_ctapi_exchanges, pick_primary_location_for_symbol
+        from api.services.cointracking_helpers import load_ctapi_exchanges, build_primary_location_index
         from api.services.data_router import UserDataRouter
 
         try:
@@ -305,24 +305,26 @@ class BalanceService:
             api_secret = credentials.get("api_secret")
             logger.info(f"🔑 DEBUG: api_key='{api_key[:10] if api_key else None}...', api_secret='{api_secret[:10] if api_secret else None}...', len_key={len(api_key) if api_key else 0}, len_secret={len(api_secret) if api_secret else 0}")
 
-            # 1) Load snapshot by exchange via CT-API
-            snap = await load_ctapi_exchanges(min_usd=0.0, api_key=api_key, api_secret=api_secret)
-            detailed = snap.get("detailed_holdings") or {}
-
-            # 2) Per-coin view via CT-API
+            # 1) Snapshot by exchange + 2) per-coin view, fetched concurrently via CT-API
             if ct_file is not None:
-                api_bal = await ct_file.get_current_balances("cointracking_api")
+                balances_coro = ct_file.get_current_balances("cointracking_api")
             else:
                 from connectors.cointracking_api import get_current_balances as _ctapi_bal
                 # Pass credentials explicitly
-                api_bal = await _ctapi_bal(api_key=api_key, api_secret=api_secret)
+                balances_coro = _ctapi_bal(api_key=api_key, api_secret=api_secret)
+            snap, api_bal = await asyncio.gather(
+                load_ctapi_exchanges(min_usd=0.0, api_key=api_key, api_secret=api_secret),
+                balances_coro,
+            )
+            detailed = snap.get("detailed_holdings") or {}
             items = api_bal.get("items") or []
 
             # 3) For EACH coin, set location = primary exchange (max value_usd)
+            primary_locations = build_primary_location_index(detailed)
             out = []
             for it in items:
                 sym = it.get("symbol")
-                loc = pick_primary_location_for_symbol(sym, detailed)
+                loc = primary_locations.get(sym, ("CoinTracking", 0.0))[0]
                 out.append({
                     "symbol": sym,
                     "alias": it.get("alias") or sym,
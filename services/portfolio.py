@@ -14,9 +14,21 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Miroir Parquet (optionnel) de l'historique pour les lectures de tendance
+try:
+    import pandas as pd
+    import pyarrow  # noqa: F401  (moteur Parquet de pandas)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 # Timezone de référence pour tous les calculs temporels
 TZ = ZoneInfo("Europe/Zurich")
 
+# Colonnes scalaires du miroir Parquet (group_distribution reste dans le JSON)
+_TREND_COLUMNS = ["date", "total_value_usd", "asset_count", "diversity_score"]
+_MIRROR_COLUMNS = ["user_id", "source", *_TREND_COLUMNS]
+
 def _atomic_json_dump(data: dict | list, path: Path | str) -> None:
     """
     Écriture atomique d'un fichier JSON pour éviter corruption.
@@ -49,6 +61,32 @@ def _atomic_json_dump(data: dict | list, path: Path | str) -> None:
         raise
 
 
+def _write_parquet_mirror(entries: list[dict], path: Path | str) -> None:
+    """
+    Écrit le miroir Parquet (Snappy) de l'historique, de façon atomique.
+
+    Le JSON reste la source de vérité ; le miroir ne porte que les colonnes
+    scalaires lues par get_portfolio_trend (+ "ts" UTC pour filtrer par date).
+
+    Args:
+        entries: Snapshots (tous users/sources)
+        path: Chemin du fichier .parquet
+    """
+    path = Path(path)
+    df = pd.DataFrame.from_records(entries, columns=_MIRROR_COLUMNS)
+    df["ts"] = pd.to_datetime(df["date"], utc=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_path, compression="snappy", index=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 def _upsert_daily_snapshot(
     entries: list[dict],
     new_snap: dict,
@@ -402,6 +440,12 @@ class PortfolioAnalytics:
             # Sauvegarder avec écriture atomique (anti-corruption)
             _atomic_json_dump(filtered_data, self.historical_data_file)
 
+            if PARQUET_AVAILABLE:
+                try:
+                    _write_parquet_mirror(filtered_data, self._parquet_mirror_path())
+                except Exception as e:
+                    logger.warning(f"⚠️ Miroir Parquet non écrit (fallback JSON): {e}")
+
             logger.info(f"Portfolio snapshot sauvé ({metrics['total_value_usd']:.2f} USD) for user={user_id}, source={source}")
             return True
 
@@ -422,17 +466,20 @@ class PortfolioAnalytics:
         Returns:
             Données de tendance pour graphiques
         """
-        historical_data = self._load_historical_data()
-        
-        if not historical_data:
-            return {"trend_data": [], "days_available": 0}
-        
         # Filtrer les derniers jours
         cutoff_date = datetime.now(TZ) - timedelta(days=days)
-        filtered_data = [
-            entry for entry in historical_data
-            if datetime.fromisoformat(entry.get("date", "")) >= cutoff_date
-        ]
+
+        filtered_data = self._load_trend_from_parquet(cutoff_date)
+        if filtered_data is None:
+            historical_data = self._load_historical_data()
+
+            if not historical_data:
+                return {"trend_data": [], "days_available": 0}
+
+            filtered_data = [
+                entry for entry in historical_data
+                if datetime.fromisoformat(entry.get("date", "")) >= cutoff_date
+            ]
         
         # Formater pour le frontend
         trend_data = []
@@ -551,6 +598,45 @@ class PortfolioAnalytics:
         
         return recommendations[:3]  # Limiter à 3 recommandations
     
+    def _parquet_mirror_path(self) -> str:
+        """Chemin du miroir Parquet associé au fichier historique JSON"""
+        return os.path.splitext(self.historical_data_file)[0] + ".parquet"
+
+    def _load_trend_from_parquet(
+        self,
+        cutoff_date: datetime,
+        user_id: str = "demo",
+        source: str = "cointracking"
+    ) -> List[Dict[str, Any]] | None:
+        """
+        Lit la tendance depuis le miroir Parquet (projection + filtre pushdown).
+
+        Returns:
+            Entrées triées par date, ou None si le miroir est absent/périmé
+            (l'appelant retombe alors sur le JSON).
+        """
+        if not PARQUET_AVAILABLE:
+            return None
+        path = self._parquet_mirror_path()
+        try:
+            if os.path.getmtime(path) < os.path.getmtime(self.historical_data_file):
+                return None
+            df = pd.read_parquet(
+                path,
+                columns=_TREND_COLUMNS,
+                filters=[
+                    ("user_id", "==", user_id),
+                    ("source", "==", source),
+                    ("ts", ">=", pd.Timestamp(cutoff_date).tz_convert("UTC")),
+                ],
+            )
+        except OSError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Lecture miroir Parquet impossible, fallback JSON: {e}")
+            return None
+        return df.sort_values("date", kind="stable").to_dict("records")
+
     def _load_historical_data(self, user_id: str = "demo", source: str = "cointracking") -> List[Dict[str, Any]]:
         """Charge les données historiques du portfolio filtrées par user et source"""
         try:
@@ -1,6 +1,9 @@
 from __future__ import annotations
 import logging
+from operator import itemgetter
 from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 from constants import get_exchange_priority, normalize_exchange_name, format_exec_hint
 from services.taxonomy import Taxonomy
 
@@ -15,6 +18,16 @@ def _format_hint_for_location(location: str, action_type: str) -> str:
     return format_exec_hint(location, action_type)
 
 
+_BY_PRIORITY_THEN_SIZE = itemgetter(0, 1)
+
+
+def _order_locations(loc_vals: Dict[str, float]) -> List[Tuple[str, float]]:
+    """Trie {location: usd} par priorité d'exchange puis montant décroissant (tri stable)."""
+    decorated = [(get_exchange_priority(loc), -v, loc) for loc, v in loc_vals.items()]
+    decorated.sort(key=_BY_PRIORITY_THEN_SIZE)
+    return [(loc, -neg_v) for _, neg_v, loc in decorated]
+
+
 def _get_exec_hint(action: Dict[str, Any], items_by_group: Dict[str, List[Dict[str, Any]]]) -> str:
     group = action.get("group", "")
     action_type = action.get("action", "")
@@ -25,10 +38,6 @@ def _get_exec_hint(action: Dict[str, Any], items_by_group: Dict[str, List[Dict[s
     if not group_items:
         return "Trade on primary exchange"
 
-    # Utilisation des priorités centralisées
-    def prio(loc: str) -> int:
-        return get_exchange_priority(loc)
-
     # somme des valeurs par location
     loc_vals: Dict[str, float] = {}
     for it in group_items:
@@ -40,10 +49,11 @@ def _get_exec_hint(action: Dict[str, Any], items_by_group: Dict[str, List[Dict[s
     if not loc_vals:
         return "Trade on primary exchange"
 
-    ordered = sorted(loc_vals.items(), key=lambda kv: (prio(kv[0]), -kv[1]))
+    # Utilisation des priorités centralisées (constants.EXCHANGE_PRIORITIES)
+    ordered = _order_locations(loc_vals)
 
     if action_type == "sell":
-        cex = [l for l, _ in ordered if prio(l) < 15]
+        cex = [l for l, _ in ordered if get_exchange_priority(l) < 15]
         main = (cex[0] if cex else ordered[0][0])
         return _format_hint_for_location(main, "sell")
 
@@ -155,7 +165,7 @@ def _prioritize_sell_targets(hold_by_alias: Dict[str, Dict[str, float]], scored_
                 sell_targets.append((alias, location, amount, score))
 
     # Tri par score croissant (pires scores en premier)
-    sell_targets.sort(key=lambda x: x[3])
+    sell_targets.sort(key=itemgetter(3))
 
     # Retourner sans le score
     return [(alias, loc, amount) for alias, loc, amount, _ in sell_targets]
@@ -182,9 +192,6 @@ def plan_rebalance(
             s = s[:-8].strip()
         return s.title()
 
-    def prio(loc: str) -> int:
-        return get_exchange_priority(loc)
-
     def fmt_hint(loc: str, action_type: str) -> str:
         return format_exec_hint(loc, action_type)
 
@@ -217,14 +224,21 @@ def plan_rebalance(
     tx = Taxonomy.load(reload=True)
     groups_order = list(tx.groups_order or []) or ["BTC", "ETH", "Stablecoins", "SOL", "L1/L0 majors", "Others"]
 
-    # items normalisés (on conserve bien la location de chaque ligne)
+    # items normalisés (on conserve bien la location de chaque ligne), agrégés dans la même passe
+    # par groupe / alias / location (pour caper les ventes par “où c’est détenu”)
     items: List[Dict[str, Any]] = []
+    by_group: Dict[str, List[Dict[str, Any]]] = {g: [] for g in groups_order}
+    hold_by_gal: Dict[str, Dict[str, Dict[str, float]]] = {}
+    current_by_group: Dict[str, float] = {g: 0.0 for g in groups_order}
+    total_usd = 0.0
+    min_usd = float(min_usd or 0.0)
+    min_trade = float(min_trade_usd or 0.0)
     for it in rows or []:
         symbol = (it.get("symbol") or it.get("name") or it.get("coin") or "").strip()
         alias = (it.get("alias") or it.get("name") or symbol or "").strip()
         v = it.get("value_usd") if it.get("value_usd") is not None else it.get("usd_value")
         value_usd = float(v or 0.0)
-        if value_usd < float(min_usd or 0.0):
+        if value_usd < min_usd:
             continue
         loc = normalize_exchange_name(it.get("location") or "Unknown")
         g = tx.group_for_alias(alias)
@@ -233,31 +247,38 @@ def plan_rebalance(
         if not isinstance(g, str) or g not in groups_order:
             g = "Others" if "Others" in groups_order else groups_order[0]
 
-        items.append({
-            "group": g, "alias": alias or symbol, "symbol": symbol or alias,
+        a = alias or symbol
+        item = {
+            "group": g, "alias": a, "symbol": symbol or alias,
             "value_usd": value_usd, "location": loc,
-        })
-
-    total_usd = sum(x["value_usd"] for x in items) or 0.0
-
-    # agrégats par groupe / alias / location (pour caper les ventes par “où c’est détenu”)
-    by_group: Dict[str, List[Dict[str, Any]]] = {g: [] for g in groups_order}
-    hold_by_gal: Dict[str, Dict[str, Dict[str, float]]] = {}
-    current_by_group: Dict[str, float] = {g: 0.0 for g in groups_order}
-    for it in items:
-        g, a, loc, val = it["group"], it["alias"], it["location"], it["value_usd"]
-        by_group[g].append(it)
-        current_by_group[g] += val
-        hold_by_gal.setdefault(g, {}).setdefault(a, {})
-        hold_by_gal[g][a][loc] = hold_by_gal[g][a].get(loc, 0.0) + val
-
-    current_weights_pct = {
-        g: round(100.0 * (current_by_group.get(g, 0.0) / total_usd), 3) if total_usd else 0.0
-        for g in groups_order
-    }
-    target_weights_pct = {g: float(group_targets_pct.get(g, 0.0)) for g in groups_order}
-    targets_usd = {g: round(total_usd * (target_weights_pct.get(g, 0.0) / 100.0), 2) for g in groups_order}
-    deltas_by_group_usd = {g: round(targets_usd.get(g, 0.0) - current_by_group.get(g, 0.0), 2) for g in groups_order}
+        }
+        items.append(item)
+        by_group[g].append(item)
+        current_by_group[g] += value_usd
+        total_usd += value_usd
+        locs = hold_by_gal.setdefault(g, {}).setdefault(a, {})
+        locs[loc] = locs.get(loc, 0.0) + value_usd
+
+    # Poids / cibles par groupe : arithmétique vectorisée sur des tableaux alignés sur groups_order.
+    # Les arrondis restent faits par round() à la matérialisation (np.round diffère sur les demi-cents).
+    n_groups = len(groups_order)
+    cur_arr = np.fromiter((current_by_group[g] for g in groups_order), dtype=np.float64, count=n_groups)
+    tgt_pct_arr = np.fromiter((float(group_targets_pct.get(g, 0.0)) for g in groups_order),
+                              dtype=np.float64, count=n_groups)
+    tgt_usd_arr = total_usd * (tgt_pct_arr / 100.0)
+    cur_w_arr = 100.0 * (cur_arr / total_usd) if total_usd else np.zeros(n_groups)
+
+    current_weights_pct: Dict[str, float] = {}
+    target_weights_pct: Dict[str, float] = {}
+    targets_usd: Dict[str, float] = {}
+    deltas_by_group_usd: Dict[str, float] = {}
+    for g, cur, cur_w, tgt_pct, tgt_usd in zip(groups_order, cur_arr.tolist(), cur_w_arr.tolist(),
+                                               tgt_pct_arr.tolist(), tgt_usd_arr.tolist()):
+        tgt_usd = round(tgt_usd, 2)
+        current_weights_pct[g] = round(cur_w, 3)
+        target_weights_pct[g] = tgt_pct
+        targets_usd[g] = tgt_usd
+        deltas_by_group_usd[g] = round(tgt_usd - cur, 2)
 
     actions: List[Dict[str, Any]] = []
 
@@ -314,7 +335,7 @@ def plan_rebalance(
                         break
 
                     slice_usd = round(min(capacity, remaining_to_sell), 2)
-                    if slice_usd < float(min_trade_usd or 0.0):
+                    if slice_usd < min_trade:
                         continue
 
                     actions.append({
@@ -328,7 +349,7 @@ def plan_rebalance(
                     remaining_to_sell = round(remaining_to_sell - slice_usd, 2)
 
                 # Si on n'a pas pu tout vendre (pinned, min_trade_usd...), fallback proportionnel pour le reste
-                if remaining_to_sell >= float(min_trade_usd or 0.0):
+                if remaining_to_sell >= min_trade:
                     log.warning(f"UNIVERSE_FALLBACK_TO_PROPORTIONAL[g={g}] for remaining sell: {remaining_to_sell:.2f} USD")
                     # Fallback pour le reste seulement
                     agg_alias: Dict[str, float] = {}
@@ -368,13 +389,13 @@ def plan_rebalance(
             loc_map = (hold_by_gal.get(g, {}).get(alias, {}) or {}).copy()
 
             # ordre de vente : CEX (prio faible) > DApp/DeFi > Hardware
-            ordered_locs = sorted(loc_map.items(), key=lambda kv: (prio(kv[0]), -kv[1]))
+            ordered_locs = _order_locations(loc_map)
 
             for loc, capacity in ordered_locs:
                 if remaining <= 1e-9:
                     break
                 slice_usd = round(min(capacity, remaining), 2)
-                if slice_usd < float(min_trade_usd or 0.0):
+                if slice_usd < min_trade:
                     continue
                 actions.append({
                     "group": g, "alias": alias, "symbol": alias,
@@ -388,7 +409,7 @@ def plan_rebalance(
 
             # si un reste minuscule subsiste (< min_trade_usd), on l’ignore (friction)
             # si un gros reste subsiste (peu probable), on le met sur la meilleure loc
-            if remaining >= max(2 * float(min_trade_usd or 0.0), 50.0) and ordered_locs:
+            if remaining >= max(2 * min_trade, 50.0) and ordered_locs:
                 loc = ordered_locs[0][0]
                 actions.append({
                     "group": g, "alias": alias, "symbol": alias,
@@ -462,14 +483,14 @@ def plan_rebalance(
             group_loc_size[L] = group_loc_size.get(L, 0.0) + p["value_usd"]
         best_group_loc = None
         if group_loc_size:
-            best_group_loc = sorted(group_loc_size.items(), key=lambda kv: (prio(kv[0]), -kv[1]))[0][0]
+            best_group_loc = _order_locations(group_loc_size)[0][0]
 
         for alias, usd in alloc_alias.items():
-            if usd < float(min_trade_usd or 0.0):
+            if usd < min_trade:
                 continue
             loc_map = hold_by_gal.get(g, {}).get(alias, {})
             if loc_map:
-                loc = sorted(loc_map.items(), key=lambda kv: (prio(kv[0]), -kv[1]))[0][0]
+                loc = _order_locations(loc_map)[0][0]
             elif best_group_loc:
                 loc = best_group_loc
             else:
@@ -486,7 +507,7 @@ def plan_rebalance(
     # ---------- Nettoyage net 0 et sortie ----------
     # (pas d’ajustement net ici, car on a déjà capé par positions réelles)
     # filtrer les toutes petites actions
-    actions = [a for a in actions if abs(a.get("usd", 0.0)) >= float(min_trade_usd or 0.0)]
+    actions = [a for a in actions if abs(a.get("usd", 0.0)) >= min_trade]
 
     unknown_aliases_set = set()
     known_aliases = set(Taxonomy.load().aliases.keys())
@@ -0,0 +1,150 @@
+"""
+Invalidation push du cache des secrets via inotify (Linux).
+
+Un thread daemon surveille data/users, chaque data/users/<id>/ et config/ ;
+à chaque événement il prévient le UserSecretsManager, qui peut alors servir
+les secrets sans stat() par appel. Pas de dépendance (ctypes sur la libc) :
+start() renvoie None hors Linux ou si inotify est indisponible, et le
+manager garde le contrôle de mtime par stat().
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+# IN_ATTRIB couvre touch/utime (mtime modifié sans écriture)
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (+ name[len])
+
+
+class SecretsWatcher:
+    """Thread inotify ; on_user(user_id) / on_config() / on_user(None) = tout invalider"""
+
+    def __init__(self, libc, fd: int, data_dir: str, config_dir: str,
+                 on_user: Callable[[Optional[str]], None], on_config: Callable[[], None]):
+        self._libc = libc
+        self._fd = fd
+        self._data_dir = data_dir
+        self._on_user = on_user
+        self._on_config = on_config
+        self._wds: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._wake_r, self._wake_w = os.pipe()
+        self._closed = False
+
+        self._add_watch(data_dir, ("root", None), required=True)
+        self._add_watch(config_dir, ("config", None))
+        with os.scandir(data_dir) as it:
+            for entry in it:
+                if entry.is_dir():
+                    self._add_watch(entry.path, ("user", entry.name))
+
+        self._thread = threading.Thread(target=self._run, name="secrets-watcher", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def start(cls, data_dir: str, config_dir: str,
+              on_user: Callable[[Optional[str]], None],
+              on_config: Callable[[], None]) -> Optional["SecretsWatcher"]:
+        """Démarre la surveillance, ou None si inotify n'est pas utilisable"""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+            fd = libc.inotify_init1(IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1")
+        except (OSError, AttributeError) as e:
+            logger.info("inotify unavailable, secrets freshness checked by stat: %s", e)
+            return None
+        try:
+            return cls(libc, fd, data_dir, config_dir, on_user, on_config)
+        except OSError as e:
+            os.close(fd)
+            logger.warning("Cannot watch secrets directories, falling back to stat: %s", e)
+            return None
+
+    def _add_watch(self, path: str, owner: Tuple[str, Optional[str]], required: bool = False) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if required:
+                raise OSError(err, os.strerror(err), path)
+            logger.debug("inotify_add_watch failed on %s: %s", path, os.strerror(err))
+            return
+        self._wds[wd] = owner
+
+    def _run(self) -> None:
+        while True:
+            try:
+                ready, _, _ = select.select([self._fd, self._wake_r], [], [])
+                if self._wake_r in ready:
+                    return
+                buf = os.read(self._fd, 64 * 1024)
+            except OSError:
+                return
+            try:
+                self._dispatch(buf)
+            except Exception as e:  # ne jamais laisser mourir le thread en silence
+                logger.warning("Secrets watcher event error: %s", e)
+                self._on_user(None)
+
+    def _dispatch(self, buf: bytes) -> None:
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(buf[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self._on_user(None)
+                continue
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                continue
+
+            kind, user_id = self._wds.get(wd, (None, None))
+            if kind == "root" and name:
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_watch(os.path.join(self._data_dir, name), ("user", name))
+                self._on_user(name)
+            elif kind == "user":
+                self._on_user(user_id)
+            elif kind == "config" and name == "secrets_example.json":
+                self._on_config()
+
+    def discard_after_fork(self) -> None:
+        """Dans un process forké : libère les fds hérités sans toucher au thread du parent"""
+        self._closed = True
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            os.close(fd)
+
+    def close(self) -> None:
+        """Arrête le thread et libère le descripteur inotify"""
+        if self._closed:
+            return
+        self._closed = True
+        os.write(self._wake_w, b"\0")
+        self._thread.join(timeout=1)
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            os.close(fd)
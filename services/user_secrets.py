@@ -2,106 +2,380 @@
 Service pour la gestion robuste des secrets utilisateur avec fallbacks
 """
 
-import json
+import codecs
 import os
 import logging
-from typing import Dict, Any, Optional
+import mmap
+import threading
+from contextvars import ContextVar, Token
+from typing import Any, Mapping, NamedTuple, Optional
 from pathlib import Path
+from types import MappingProxyType
+
+from services.secrets_watcher import SecretsWatcher
+
+# Parse JSON en C si orjson est disponible (stdlib en repli, pas de dépendance dure)
+try:
+    import orjson as _json
+except ImportError:  # pragma: no cover
+    import json as _json
 
 logger = logging.getLogger(__name__)
 
+
+def _loads(raw: bytes) -> Any:
+    """Parse un fichier JSON lu en binaire (BOM UTF-8 toléré, fichiers édités sous Windows)"""
+    return _json.loads(raw.removeprefix(codecs.BOM_UTF8))
+
+
+# Au-delà de cette taille, orjson parse directement la projection mmap du fichier
+# (pas de copie noyau -> bytes Python). En dessous, un read() coûte moins que mmap.
+_MMAP_MIN_SIZE = 64 * 1024
+_ZERO_COPY = getattr(_json, "__name__", "") == "orjson"  # json stdlib n'accepte pas memoryview
+
+def _fadvise(fd: int, advice_name: str) -> None:
+    """posix_fadvise best-effort (absent sous Windows/macOS)"""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        pass
+
+
+def _load_json_file(path: str) -> Any:
+    """Lit et parse un fichier JSON ; FileNotFoundError si absent"""
+    with open(path, 'rb') as f:
+        fd = f.fileno()
+        _fadvise(fd, "POSIX_FADV_SEQUENTIAL")
+        try:
+            if not _ZERO_COPY or os.fstat(fd).st_size < _MMAP_MIN_SIZE:
+                return _loads(f.read())
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                skip = len(codecs.BOM_UTF8) if view[:3] == codecs.BOM_UTF8 else 0
+                with view[skip:] as body:
+                    return _json.loads(body)
+        finally:
+            # Le fichier n'est relu qu'au prochain changement de mtime : inutile
+            # de garder ses pages en cache noyau une fois parsé.
+            _fadvise(fd, "POSIX_FADV_DONTNEED")
+
+
+# Mémo par requête HTTP (user_id -> secrets) : actif uniquement entre
+# begin_request_scope() / end_request_scope(), posés par le middleware API.
+# Les appels répétés d'une même requête évitent stat() + lookup du cache.
+_request_secrets: ContextVar[Optional[dict]] = ContextVar("user_secrets_request_memo", default=None)
+
+def begin_request_scope() -> Token:
+    """Ouvre un mémo de secrets pour la requête courante"""
+    return _request_secrets.set({})
+
+def end_request_scope(token: Token) -> None:
+    """Ferme le mémo ouvert par begin_request_scope()"""
+    _request_secrets.reset(token)
+
+# Fallback ultime, partagé en lecture seule entre tous les utilisateurs sans secrets
+_EMPTY_SECRETS_TEMPLATE: Mapping[str, Any] = MappingProxyType({
+    "dev_mode": MappingProxyType({"enabled": True, "mock_data": True}),
+    "coingecko": MappingProxyType({"api_key": "", "pro": False}),
+    "cointracking": MappingProxyType({"api_key": "", "api_secret": ""}),
+    "binance": MappingProxyType({"api_key": "", "api_secret": "", "testnet": True}),
+    "kraken": MappingProxyType({"api_key": "", "api_secret": ""}),
+    "exchanges": MappingProxyType({"default": "binance"}),
+})
+
+_UNSET = object()
+_EMPTY_SECTION: Mapping[str, Any] = MappingProxyType({})
+
+
+class Secrets(NamedTuple):
+    """Vue typée des secrets, calculée une fois par (user_id, mtime)"""
+    raw: Mapping[str, Any]
+    dev_mode_enabled: bool
+    default_exchange: str
+    exchanges: Mapping[str, Mapping[str, Any]]
+
+
+def _parse_secrets(raw: Mapping[str, Any]) -> Secrets:
+    """Valide le schéma une seule fois ; sections figées en lecture seule"""
+    dev_mode = raw.get("dev_mode")
+    exchanges = raw.get("exchanges")
+    default = exchanges.get("default", "binance") if isinstance(exchanges, Mapping) else "binance"
+    return Secrets(
+        raw=raw,
+        dev_mode_enabled=bool(dev_mode.get("enabled", False)) if isinstance(dev_mode, Mapping) else False,
+        default_exchange=default,
+        exchanges=MappingProxyType({
+            name: section if isinstance(section, MappingProxyType) else MappingProxyType(section)
+            for name, section in raw.items() if isinstance(section, Mapping)
+        }),
+    )
+
+
 class UserSecretsManager:
     """Gestionnaire de secrets avec fallbacks et mode dev"""
 
     def __init__(self):
         self.config_dir = Path("config")
         self.data_dir = Path("data/users")
-        self._cache = {}
+        # Chemins en str précalculés : pas d'objets Path construits par appel
+        self._example_path = os.path.join(self.config_dir, "secrets_example.json")
+        self._user_path_prefix = os.path.join(self.data_dir, "")
+        self._example_template = self._load_example_template()
+        # Borne commune des caches : un user_id inconnu par requête ne doit pas
+        # faire grossir le process indéfiniment (multi-tenant)
+        self._cache_max = max(1, int(os.getenv("USER_SECRETS_CACHE_MAX", "512")))
+        # Cache unique partagé entre threads : user_id -> (mtime_ns, Secrets), lu sans
+        # verrou ; un fichier modifié change le mtime -> rechargement. Un miss prend le
+        # verrou de cet utilisateur seulement (double-checked) : une lecture disque
+        # lente ne bloque pas les autres. _lock ne protège que les écritures.
+        self._fresh: dict = {}
+        self._user_locks: dict = {}
+        self._lock = threading.RLock()
+        self._gen = 0
+        # Fraîcheur : un stat() par appel, ou (USER_SECRETS_WATCH=1, Linux) mtimes
+        # mémorisés et invalidés par inotify -> aucun syscall en régime établi
+        self._known_mtimes: Optional[dict] = None
+        self._watcher: Optional[SecretsWatcher] = None
+        if os.getenv("USER_SECRETS_WATCH", "0") == "1":
+            self._start_watcher()
+        # "demo" est l'utilisateur par défaut de tous les helpers : chargé dès l'init
+        self._get_cached("demo", self._stat_mtime("demo"))
+
+    def _load_example_template(self) -> Optional[Mapping[str, Any]]:
+        """Charge config/secrets_example.json une seule fois (lecture seule)"""
+        # open() direct : ENOENT suffit, pas de exists() préalable
+        try:
+            template = _load_json_file(self._example_path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Failed to load example secrets: %s", e)
+            return None
+        if not isinstance(template, dict) or not isinstance(template.get("dev_mode"), dict):
+            logger.warning("Ignoring example secrets: missing dev_mode section")
+            return None
+        return MappingProxyType(template)
 
-    def get_user_secrets(self, user_id: str = "demo") -> Dict[str, Any]:
+    def _user_secrets_path(self, user_id: str) -> str:
+        """data/users/{user_id}/secrets.json, par simple concaténation de str"""
+        return f"{self._user_path_prefix}{user_id}{os.sep}secrets.json"
+
+    def get_user_secrets(self, user_id: str = "demo") -> Mapping[str, Any]:
         """
         Récupère les secrets d'un utilisateur avec fallbacks:
         1. data/users/{user_id}/secrets.json
         2. config/secrets_example.json avec dev_mode
         3. Secrets vides avec dev_mode activé
+
+        Le résultat est mis en cache et partagé : à traiter en lecture seule.
         """
-        if user_id in self._cache:
-            return self._cache[user_id]
+        return self.get_secrets_view(user_id).raw
+
+    def get_secrets_view(self, user_id: str = "demo") -> Secrets:
+        """Secrets parsés (vue typée), mêmes fallbacks et cache que get_user_secrets"""
+        memo = _request_secrets.get()
+        if memo is not None:
+            secrets = memo.get(user_id)
+            if secrets is not None:
+                return secrets
 
-        # Chemin principal des secrets utilisateur
-        user_secrets_path = self.data_dir / user_id / "secrets.json"
+        secrets = self._get_cached(user_id, self._stat_mtime(user_id))
 
+        if memo is not None:
+            memo[user_id] = secrets
+        return secrets
+
+    def _stat_mtime(self, user_id: str) -> Optional[int]:
+        """Un seul stat() : existence + fraîcheur (mtime) de l'entrée en cache"""
+        known = self._known_mtimes
+        if known is None:
+            try:
+                return os.stat(self._user_secrets_path(user_id)).st_mtime_ns
+            except OSError:
+                return None
+
+        mtime_ns = known.get(user_id, _UNSET)
+        if mtime_ns is not _UNSET:
+            return mtime_ns
+        gen = self._gen
+        try:
+            mtime_ns = os.stat(self._user_secrets_path(user_id)).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        with self._lock:
+            # Un événement reçu pendant le stat() rend la valeur douteuse : pas mémorisée
+            if gen == self._gen:
+                known[user_id] = mtime_ns
+                if len(known) > self._cache_max:
+                    del known[next(iter(known))]
+        return mtime_ns
+
+    def _start_watcher(self) -> None:
+        self._watcher = SecretsWatcher.start(
+            str(self.data_dir), str(self.config_dir), self._on_user_changed, self.clear_cache
+        )
+        self._known_mtimes = {} if self._watcher is not None else None
+
+    def _after_fork_in_child(self) -> None:
+        """Le thread inotify et le verrou ne survivent pas à fork() (workers RQ) : on les recrée"""
+        self._lock = threading.RLock()
+        self._user_locks = {}
+        if self._watcher is not None:
+            self._watcher.discard_after_fork()
+            self._start_watcher()
+
+    def _on_user_changed(self, user_id: Optional[str]) -> None:
+        """Callback inotify : oublie le mtime mémorisé (None = tous les utilisateurs)"""
+        with self._lock:
+            self._gen += 1
+            if user_id is None:
+                self._known_mtimes.clear()
+            else:
+                self._known_mtimes.pop(user_id, None)
+
+    def _get_cached(self, user_id: str, mtime_ns: Optional[int]) -> Secrets:
+        """Entrée fraîche sans verrou ; sinon chargement sous le verrou de l'utilisateur"""
+        hit = self._fresh.get(user_id)
+        if hit is not None and hit[0] == mtime_ns:
+            return hit[1]
+
+        lock = self._user_locks.setdefault(user_id, threading.Lock())
+        with lock:
+            hit = self._fresh.get(user_id)
+            if hit is not None and hit[0] == mtime_ns:
+                return hit[1]
+            gen = self._gen
+            secrets = self._load_secrets(user_id, mtime_ns)
+            with self._lock:
+                # clear_cache() pendant le chargement : résultat servi mais pas mémorisé
+                if gen == self._gen:
+                    self._fresh.pop(user_id, None)
+                    self._fresh[user_id] = (mtime_ns, secrets)
+                    if len(self._fresh) > self._cache_max:
+                        del self._fresh[next(iter(self._fresh))]
+                # Les verrous ne vivent que le temps d'un chargement
+                if self._user_locks.get(user_id) is lock:
+                    del self._user_locks[user_id]
+        return secrets
+
+    def _load_secrets(self, user_id: str, mtime_ns: Optional[int]) -> Secrets:
+        """Chaîne de fallbacks (non mémoïsée, voir _get_cached) ; mtime_ns None = pas de fichier"""
         secrets = None
 
-        # 1. Essayer de charger les secrets utilisateur
-        if user_secrets_path.exists():
+        # 1. Essayer de charger les secrets utilisateur (le stat de l'appelant tient lieu de exists())
+        if mtime_ns is not None:
             try:
-                with open(user_secrets_path, 'r', encoding='utf-8') as f:
-                    secrets = json.load(f)
-                    logger.info(f"Secrets loaded for user {user_id}")
+                secrets = _load_json_file(self._user_secrets_path(user_id))
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Secrets loaded for user %s", user_id)
+            except FileNotFoundError:
+                pass
             except Exception as e:
-                logger.warning(f"Failed to load user secrets for {user_id}: {e}")
+                logger.warning("Failed to load user secrets for %s: %s", user_id, e)
 
-        # 2. Fallback sur exemple si disponible
-        if secrets is None:
-            example_path = self.config_dir / "secrets_example.json"
-            if example_path.exists():
-                try:
-                    with open(example_path, 'r', encoding='utf-8') as f:
-                        secrets = json.load(f)
-                        secrets["dev_mode"]["enabled"] = True
-                        logger.info(f"Using example secrets for user {user_id} (dev mode)")
-                except Exception as e:
-                    logger.warning(f"Failed to load example secrets: {e}")
-
-        # 3. Fallback ultime - secrets vides avec dev mode
+        # 2. Fallback sur exemple si disponible (template parsé à l'init ; seul
+        #    dev_mode est modifié, donc seul ce sous-arbre est copié)
+        if secrets is None and self._example_template is not None:
+            secrets = dict(self._example_template)
+            secrets["dev_mode"] = {**self._example_template["dev_mode"], "enabled": True}
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Using example secrets for user %s (dev mode)", user_id)
+
+        # 3. Fallback ultime - secrets vides avec dev mode (constante partagée)
         if secrets is None:
-            secrets = {
-                "dev_mode": {"enabled": True, "mock_data": True},
-                "coingecko": {"api_key": "", "pro": False},
-                "cointracking": {"api_key": "", "api_secret": ""},
-                "binance": {"api_key": "", "api_secret": "", "testnet": True},
-                "kraken": {"api_key": "", "api_secret": ""},
-                "exchanges": {"default": "binance"}
-            }
-            logger.warning(f"Using empty secrets for user {user_id} (dev mode fallback)")
-
-        # Cache et retour
-        self._cache[user_id] = secrets
-        return secrets
+            secrets = _EMPTY_SECRETS_TEMPLATE
+            logger.warning("Using empty secrets for user %s (dev mode fallback)", user_id)
+
+        return _parse_secrets(secrets)
 
-    def get_exchange_config(self, user_id: str = "demo", exchange: str = None) -> Dict[str, Any]:
-        """Récupère la config d'un exchange spécifique"""
-        secrets = self.get_user_secrets(user_id)
+    def list_users_with_secrets(self) -> frozenset:
+        """
+        Utilisateurs ayant un data/users/<id>/secrets.json.
 
-        if exchange is None:
-            exchange = secrets.get("exchanges", {}).get("default", "binance")
+        Énumération par os.scandir : le type des entrées vient de getdents
+        (DirEntry), sans stat() par utilisateur.
+        """
+        users = set()
+        try:
+            with os.scandir(self.data_dir) as it:
+                for entry in it:
+                    if not entry.is_dir():
+                        continue
+                    try:
+                        with os.scandir(entry.path) as sub:
+                            if any(e.name == "secrets.json" and e.is_file() for e in sub):
+                                users.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return frozenset(users)
 
-        return secrets.get(exchange, {})
+    def get_exchange_config(self, user_id: str = "demo", exchange: str = None) -> Mapping[str, Any]:
+        """Récupère la config d'un exchange spécifique (lecture seule)"""
+        view = self.get_secrets_view(user_id)
+        name = view.default_exchange if exchange is None else exchange
+        return view.exchanges.get(name, _EMPTY_SECTION)
 
     def is_dev_mode(self, user_id: str = "demo") -> bool:
         """Vérifie si le mode dev est activé"""
-        secrets = self.get_user_secrets(user_id)
-        return secrets.get("dev_mode", {}).get("enabled", False)
+        return self.get_secrets_view(user_id).dev_mode_enabled
 
     def clear_cache(self, user_id: str = None):
-        """Vide le cache (tout ou un utilisateur spécifique)"""
-        if user_id:
-            self._cache.pop(user_id, None)
-        else:
-            self._cache.clear()
+        """
+        Vide le cache d'un utilisateur ; sans user_id, vide tout et recharge
+        aussi le template d'exemple.
+        """
+        with self._lock:
+            self._gen += 1
+            if user_id:
+                self._fresh.pop(user_id, None)
+                if self._known_mtimes is not None:
+                    self._known_mtimes.pop(user_id, None)
+            else:
+                self._fresh.clear()
+                if self._known_mtimes is not None:
+                    self._known_mtimes.clear()
+                self._example_template = self._load_example_template()
+        if not user_id or user_id == "demo":
+            self._get_cached("demo", self._stat_mtime("demo"))
+
+# Instance globale, créée au premier usage (l'init lit secrets_example.json :
+# inutile pour les process qui ne touchent jamais aux secrets)
+_manager: Optional[UserSecretsManager] = None
+_manager_lock = threading.Lock()
+
+def _get_manager() -> UserSecretsManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = UserSecretsManager()
+    return _manager
+
+def _after_fork_in_child() -> None:
+    if _manager is not None:
+        _manager._after_fork_in_child()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
 
-# Instance globale
-user_secrets_manager = UserSecretsManager()
+def __getattr__(name: str) -> Any:
+    # Compatibilité : `from services.user_secrets import user_secrets_manager`
+    if name == "user_secrets_manager":
+        return _get_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Fonctions helper pour compatibilité
-def get_user_secrets(user_id: str = "demo") -> Dict[str, Any]:
+def get_user_secrets(user_id: str = "demo") -> Mapping[str, Any]:
     """Helper function pour récupérer les secrets d'un utilisateur"""
-    return user_secrets_manager.get_user_secrets(user_id)
+    return _get_manager().get_user_secrets(user_id)
 
 def is_dev_mode(user_id: str = "demo") -> bool:
     """Helper function pour vérifier le mode dev"""
-    return user_secrets_manager.is_dev_mode(user_id)
+    return _get_manager().is_dev_mode(user_id)
 
 def get_coingecko_api_key(user_id: str = None) -> str:
     """
@@ -118,5 +392,5 @@ def get_coingecko_api_key(user_id: str = None) -> str:
         return os.getenv("COINGECKO_API_KEY", "")
 
     # Utiliser UserSecretsManager pour récupérer la clé utilisateur
-    secrets = user_secrets_manager.get_user_secrets(user_id)
+    secrets = _get_manager().get_user_secrets(user_id)
     return secrets.get("coingecko", {}).get("api_key", "")
\ No newline at end of file
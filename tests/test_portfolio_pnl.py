@@ -23,8 +23,9 @@ def temp_history_file():
     fd, path = tempfile.mkstemp(suffix=".json")
     os.close(fd)
     yield path
-    if os.path.exists(path):
-        os.remove(path)
+    for p in (path, os.path.splitext(path)[0] + ".parquet"):
+        if os.path.exists(p):
+            os.remove(p)
 
 
 @pytest.fixture
@@ -458,5 +459,37 @@ class TestSnapshotSaving:
         assert users == {test_user_id, test_user_id_2}
 
 
+class TestPortfolioTrend:
+    """Tests pour get_portfolio_trend (JSON + miroir Parquet)"""
+
+    def test_trend_from_json(self, portfolio_analytics, sample_balances, monkeypatch):
+        """Vérifie la tendance via le JSON quand le miroir Parquet est indisponible"""
+        import services.portfolio as portfolio_module
+        monkeypatch.setattr(portfolio_module, "PARQUET_AVAILABLE", False)
+
+        portfolio_analytics.save_portfolio_snapshot(sample_balances, user_id="demo", source="cointracking")
+        trend = portfolio_analytics.get_portfolio_trend(days=30)
+
+        assert trend["days_available"] == 1
+        assert trend["trend_data"][0]["total_value"] == 100000
+        assert not os.path.exists(portfolio_analytics._parquet_mirror_path())
+
+    def test_trend_from_parquet_mirror(self, portfolio_analytics, sample_balances):
+        """Vérifie que le miroir Parquet est écrit et relu avec le même résultat"""
+        pytest.importorskip("pyarrow")
+
+        portfolio_analytics.save_portfolio_snapshot(sample_balances, user_id="demo", source="cointracking")
+        portfolio_analytics.save_portfolio_snapshot(sample_balances, user_id="other", source="cointracking")
+
+        assert os.path.exists(portfolio_analytics._parquet_mirror_path())
+        cutoff = datetime.now(TZ) - timedelta(days=30)
+        rows = portfolio_analytics._load_trend_from_parquet(cutoff)
+        assert rows is not None and len(rows) == 1
+
+        trend = portfolio_analytics.get_portfolio_trend(days=30)
+        assert trend["days_available"] == 1
+        assert trend["trend_data"][0]["total_value"] == 100000
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
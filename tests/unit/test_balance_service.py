@@ -436,6 +436,71 @@ class TestBalanceServiceIntegration:
         assert len(result["items"]) > 0
 
 
+class TestConnectorBalanceCache:
+    """Test TTL/single-flight cache in connectors.cointracking.get_current_balances."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_fetch(self):
+        """Concurrent callers trigger a single upstream fetch."""
+        import asyncio
+        from connectors import cointracking as ct
+
+        ct.invalidate_balance_cache()
+        payload = {"source_used": "cointracking", "items": [{"symbol": "BTC", "value_usd": 1.0}]}
+        with patch.object(ct, "get_current_balances_from_csv", return_value=payload) as mock_csv:
+            results = await asyncio.gather(*(ct.get_current_balances("cointracking") for _ in range(5)))
+
+            assert mock_csv.call_count == 1
+            assert all(r["items"] == payload["items"] for r in results)
+
+            # Invalidation forces a fresh fetch
+            ct.invalidate_balance_cache()
+            await ct.get_current_balances("cointracking")
+            assert mock_csv.call_count == 2
+        ct.invalidate_balance_cache()
+
+    @pytest.mark.asyncio
+    async def test_empty_results_not_cached(self):
+        """Empty results are not cached so a fresh CSV upload is picked up."""
+        from connectors import cointracking as ct
+
+        ct.invalidate_balance_cache()
+        empty = {"source_used": "cointracking", "items": []}
+        with patch.object(ct, "get_current_balances_from_csv", return_value=empty) as mock_csv:
+            await ct.get_current_balances("cointracking")
+            await ct.get_current_balances("cointracking")
+
+            assert mock_csv.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_api_fetch_does_not_block_csv_source(self):
+        """A pending CT-API fetch does not hold up CSV-source callers."""
+        import asyncio
+        from connectors import cointracking as ct
+
+        ct.invalidate_balance_cache()
+        release = asyncio.Event()
+
+        async def slow_api():
+            await release.wait()
+            return {"source_used": "cointracking_api", "items": [{"symbol": "ETH", "value_usd": 2.0}]}
+
+        payload = {"source_used": "cointracking", "items": [{"symbol": "BTC", "value_usd": 1.0}]}
+        with patch.object(ct, "get_balances_via_api", side_effect=slow_api), \
+                patch.object(ct, "get_current_balances_from_csv", return_value=payload):
+            api_task = asyncio.create_task(ct.get_current_balances("cointracking_api"))
+            await asyncio.sleep(0)
+
+            csv_res = await asyncio.wait_for(ct.get_current_balances("cointracking"), timeout=1)
+            assert csv_res["items"] == payload["items"]
+            assert not api_task.done()
+
+            release.set()
+            api_res = await api_task
+            assert api_res["items"][0]["symbol"] == "ETH"
+        ct.invalidate_balance_cache()
+
+
 if __name__ == "__main__":
     # Allow running tests directly
     pytest.main([__file__, "-v"])
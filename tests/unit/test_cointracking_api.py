@@ -0,0 +1,182 @@
+"""
+Unit tests for connectors.cointracking_api HTTP layer.
+
+Uses httpx.MockTransport in place of the shared client (no network).
+"""
+import hashlib
+import hmac
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+import connectors.cointracking_api as ct_api
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    """Install a shared client backed by a recording MockTransport"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        form = parse_qs(request.content.decode())
+        if form["method"][0] == "boom":
+            return httpx.Response(500, text="server error")
+        return httpx.Response(200, json={"success": 1, "method": form["method"][0]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(ct_api, "_CT_CLIENT", client)
+    ct_api._CACHE.clear()
+    yield calls
+    ct_api._CACHE.clear()
+
+
+class TestPostApiAsync:
+    """Tests for _post_api_async() / _post_api_cached_async()"""
+
+    @pytest.mark.asyncio
+    async def test_signed_request_on_shared_client(self, mock_client):
+        """Test body is HMAC-SHA512 signed and the shared client is reused"""
+        payload = await ct_api._post_api_async("getBalance", api_key="k", api_secret="s")
+        await ct_api._post_api_async("getBalance", api_key="k", api_secret="s")
+
+        assert payload["method"] == "getBalance"
+        req = mock_client[0]
+        expected = hmac.new(b"s", req.content, hashlib.sha512).hexdigest()
+        assert req.headers["Key"] == "k"
+        assert req.headers["Sign"] == expected
+        assert await ct_api._get_ct_client() is ct_api._CT_CLIENT
+        assert len(mock_client) == 2
+
+    def test_hmac_prototype_is_not_mutated(self):
+        """Test copied HMAC prototype signs like a fresh hmac.new per call"""
+        for body in (b"a=1", b"b=2", b"a=1"):
+            h = ct_api._hmac_prototype("s").copy()
+            h.update(body)
+            assert h.hexdigest() == hmac.new(b"s", body, hashlib.sha512).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_http_error_raises_runtime_error(self, mock_client):
+        """Test HTTP errors surface as RuntimeError for caller fallbacks"""
+        with pytest.raises(RuntimeError, match="HTTP 500"):
+            await ct_api._post_api_async("boom", api_key="k", api_secret="s")
+
+    @pytest.mark.asyncio
+    async def test_cached_async_hits_network_once(self, mock_client):
+        """Test cached wrapper serves repeat calls from cache"""
+        for _ in range(3):
+            await ct_api._post_api_cached_async("getBalance", {}, ttl=60, api_key="k", api_secret="s")
+
+        assert len(mock_client) == 1
+
+    @pytest.mark.asyncio
+    async def test_aclose_resets_client(self, mock_client):
+        """Test shutdown hook closes and drops the shared client"""
+        await ct_api.aclose_ct_client()
+
+        assert ct_api._CT_CLIENT is None
+
+
+class TestBalanceChangeProbe:
+    """Tests for _get_balance_rows() change probe"""
+
+    @pytest.fixture
+    def ct_server(self, monkeypatch):
+        """Shared client whose latest trade id can be changed by the test"""
+        state = {"last_trade": "1001", "calls": []}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            method = parse_qs(request.content.decode())["method"][0]
+            state["calls"].append(method)
+            if method == "getTrades":
+                return httpx.Response(200, json={"success": 1, "method": method,
+                                                 state["last_trade"]: {"time": 1}})
+            return httpx.Response(200, json={"success": 1, "method": method, "details": [
+                {"coin": "BTC", "amount": "1", "value_fiat": "50000"},
+            ]})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(ct_api, "_CT_CLIENT", client)
+        ct_api._BALANCE_PROBE.clear()
+        yield state
+        ct_api._BALANCE_PROBE.clear()
+
+    def _expire(self, seconds):
+        for key, (marker, fetched_at, checked_at, rows) in list(ct_api._BALANCE_PROBE.items()):
+            ct_api._BALANCE_PROBE[key] = (marker, fetched_at - seconds, checked_at - seconds, rows)
+
+    async def _revalidated(self, ct_server):
+        """Cold fetch, then one expiry so the entry carries a change marker"""
+        await ct_api._get_balance_rows(api_key="k", api_secret="s")
+        self._expire(ct_api._BALANCE_TTL + 1)
+        await ct_api._get_balance_rows(api_key="k", api_secret="s")
+        self._expire(ct_api._BALANCE_TTL + 1)
+        ct_server["calls"].clear()
+
+    @pytest.mark.asyncio
+    async def test_cold_call_skips_probe(self, ct_server):
+        """Test a cold call costs one getBalance, like before the probe"""
+        rows = await ct_api._get_balance_rows(api_key="k", api_secret="s")
+
+        assert ct_server["calls"] == ["getBalance"]
+        assert rows[0]["symbol"] == "BTC"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_marker_skips_get_balance(self, ct_server):
+        """Test expired entry is revalidated with getTrades only"""
+        await self._revalidated(ct_server)
+
+        rows = await ct_api._get_balance_rows(api_key="k", api_secret="s")
+        rows[0]["value_usd"] = 0.0  # caller-side mutation must not leak into the cache
+        again = await ct_api._get_balance_rows(api_key="k", api_secret="s")
+
+        assert ct_server["calls"] == ["getTrades"]
+        assert again[0]["value_usd"] == 50000.0
+
+    @pytest.mark.asyncio
+    async def test_new_trade_refetches_balance(self, ct_server):
+        """Test a new latest trade forces a fresh getBalance"""
+        await self._revalidated(ct_server)
+        ct_server["last_trade"] = "1002"
+
+        await ct_api._get_balance_rows(api_key="k", api_secret="s")
+
+        assert ct_server["calls"] == ["getTrades", "getBalance"]
+
+    @pytest.mark.asyncio
+    async def test_max_age_bounds_reuse(self, ct_server):
+        """Test entries older than CT_BALANCE_MAX_AGE are refetched without trusting the probe"""
+        await self._revalidated(ct_server)
+        self._expire(ct_api.CT_BALANCE_MAX_AGE + 1)
+
+        await ct_api._get_balance_rows(api_key="k", api_secret="s")
+
+        assert ct_server["calls"] == ["getBalance"]
+
+    @pytest.mark.asyncio
+    async def test_wall_clock_jump_does_not_expire(self, ct_server, monkeypatch):
+        """Test TTL ages use the monotonic clock"""
+        await ct_api._get_balance_rows(api_key="k", api_secret="s")
+        monkeypatch.setattr(ct_api.time, "time", lambda: 4_000_000_000.0)
+        ct_server["calls"].clear()
+
+        await ct_api._get_balance_rows(api_key="k", api_secret="s")
+
+        assert ct_server["calls"] == []
+
+
+class TestGetBalanceParsing:
+    """Tests for _extract_rows_from_getBalance() key fallbacks"""
+
+    def test_zero_value_is_not_treated_as_missing(self):
+        """Test value_fiat=0 wins over later fallback keys"""
+        rows = ct_api._extract_rows_from_getBalance({"details": [
+            {"coin": "dust", "amount": "10", "value_fiat": 0, "value": 5},
+            {"symbol": "ETH", "amount": "2", "fiat": "3,000", "price_fiat": 0},
+        ]})
+
+        assert rows[0]["symbol"] == "DUST"
+        assert rows[0]["value_usd"] == 0.0
+        assert rows[1]["value_usd"] == 3000.0
+        assert rows[1]["price_usd"] == 1500.0
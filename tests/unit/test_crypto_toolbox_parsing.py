@@ -0,0 +1,150 @@
+"""
+Unit tests for crypto-toolbox table parsing (api.crypto_toolbox_endpoints).
+
+Covers the pure-Python parsing shared by the HTTP and Playwright fetch paths,
+cache clearing and startup ordering. ETag helpers are tested in
+test_utils_cache.py.
+"""
+import pytest
+
+from api.crypto_toolbox_endpoints import (
+    _parse_comparison,
+    _parse_rows,
+    _parse_thresholds,
+    _rows_from_payload,
+)
+
+
+BMO_NAME = "BMO (par Prof. Chaîne)"
+
+
+class TestParseComparison:
+    """Tests for _parse_comparison()"""
+
+    @pytest.mark.parametrize("txt,expected", [
+        (">=80", (">=", 80.0)),
+        ("<= 20 (low)", ("<=", 20.0)),
+        (">1,000", (">", 1000.0)),
+        ("<0.5", ("<", 0.5)),
+        ("n/a", (None, None)),
+    ])
+    def test_operators(self, txt, expected):
+        assert _parse_comparison(txt) == expected
+
+
+class TestParseThresholds:
+    """Tests for _parse_thresholds() (BMO sub-indicators)"""
+
+    def test_multiple_thresholds(self):
+        raw = ">=1 (short)\n> 0.9 (long)"
+        assert _parse_thresholds(raw) == [(">=1", ">=", 1.0, "short"), ("> 0.9", ">", 0.9, "long")]
+
+    def test_no_threshold(self):
+        assert _parse_thresholds("n/a") == []
+
+
+class TestParseRows:
+    """Tests for _parse_rows()"""
+
+    def test_normal_indicator(self):
+        rows = [["MVRV Z-Score", "4.2\n(high)", ">=3.7"]]
+        indicators = _parse_rows(rows)
+
+        assert len(indicators) == 1
+        ind = indicators[0]
+        assert ind["name"] == "MVRV Z-Score"
+        assert ind["value"] == "4.2 (high)"
+        assert ind["value_numeric"] == 4.2
+        assert ind["threshold_numeric"] == 3.7
+        assert ind["threshold_operator"] == ">="
+        assert ind["in_critical_zone"] is True
+
+    def test_less_than_operator(self):
+        indicators = _parse_rows([["Fear & Greed", "25", "<20"]])
+        assert indicators[0]["in_critical_zone"] is False
+
+    def test_bmo_sub_indicators(self):
+        rows = [[BMO_NAME, "1.2\n0.8", ">=1 (short)\n>0.9 (long)"]]
+        indicators = _parse_rows(rows)
+
+        assert [i["name"] for i in indicators] == [f"{BMO_NAME} (short)", f"{BMO_NAME} (long)"]
+        assert [i["in_critical_zone"] for i in indicators] == [True, False]
+        assert indicators[1]["threshold_numeric"] == 0.9
+
+    def test_skips_incomplete_and_unparseable_rows(self):
+        rows = [["Only name"], ["No value", "n/a", ">=1"], ["No threshold", "12", "-"]]
+        assert _parse_rows(rows) == []
+
+
+class TestRowsFromPayload:
+    """Tests for _rows_from_payload() (direct HTTP path schema check)"""
+
+    def test_list_of_lists(self):
+        assert _rows_from_payload([["A", 1, ">=2"]]) == [["A", "1", ">=2"]]
+
+    def test_dict_with_indicators(self):
+        payload = {"indicators": [{"name": "A", "value": "1", "threshold": ">=2"}]}
+        assert _rows_from_payload(payload) == [["A", "1", ">=2"]]
+
+    @pytest.mark.parametrize("payload", [{}, [], {"indicators": [{"name": "A"}]}, ["bad"], "html"])
+    def test_schema_mismatch(self, payload):
+        assert _rows_from_payload(payload) is None
+
+
+class TestClearCache:
+    """Tests for POST /cache/clear disk snapshot handling"""
+
+    @pytest.mark.asyncio
+    async def test_clear_removes_disk_snapshot(self, tmp_path, monkeypatch):
+        """Test a cleared cache is not restored from disk on the next start"""
+        import api.crypto_toolbox_endpoints as ct
+
+        monkeypatch.setattr(ct, "DISK_CACHE_PATH", tmp_path / "crypto_toolbox.json")
+        monkeypatch.setattr(ct, "_redis_client", None)
+        monkeypatch.setattr(ct, "_schedule_refresh", lambda reason="": None)
+        ct._write_disk_cache(b'{"indicators": []}')
+        assert ct._load_disk_cache() is not None
+
+        result = await ct.clear_cache()
+
+        assert "disk" in result["message"]
+        assert ct._load_disk_cache() is None
+        await ct.clear_cache()  # missing snapshot is not an error
+
+
+class TestStartupWithoutPlaywright:
+    """Tests for startup_playwright() when the browser part cannot start"""
+
+    @pytest.mark.asyncio
+    async def test_redis_and_prewarm_survive_missing_playwright(self, monkeypatch):
+        """Test the HTTP path still gets its Redis cache and prewarm"""
+        import api.crypto_toolbox_endpoints as ct
+
+        class FakeRedis:
+            async def ping(self):
+                return True
+
+        async def from_url(*args, **kwargs):
+            return FakeRedis()
+
+        prewarmed = []
+
+        async def prewarm():
+            prewarmed.append(True)
+
+        monkeypatch.setattr(ct, "PLAYWRIGHT_AVAILABLE", False)
+        monkeypatch.setattr(ct, "REDIS_AVAILABLE", True)
+        monkeypatch.setattr(ct, "aioredis", type("FakeAioredis", (), {"from_url": staticmethod(from_url)}))
+        monkeypatch.setattr(ct, "_load_disk_cache", lambda: None)
+        monkeypatch.setattr(ct, "_prewarm", prewarm)
+        monkeypatch.setattr(ct, "_redis_client", None)
+        monkeypatch.setattr(ct, "_cache_entry", None)
+        monkeypatch.setattr(ct, "_prewarm_task", None)
+        monkeypatch.setattr(ct, "_browser", None)
+
+        with pytest.raises(RuntimeError, match="not installed"):
+            await ct.startup_playwright()
+        await ct._prewarm_task
+
+        assert isinstance(ct._redis_client, FakeRedis)
+        assert prewarmed == [True]
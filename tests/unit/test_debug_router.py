@@ -0,0 +1,24 @@
+"""
+Unit tests for api.debug_router helpers.
+"""
+from api.debug_router import _merge_env_updates
+
+
+class TestMergeEnvUpdates:
+    """Tests for _merge_env_updates()"""
+
+    def test_replaces_in_place_and_appends(self):
+        """Test existing keys are replaced in place, missing keys appended"""
+        content = "# comment\nFRED_API_KEY=old\n\nOTHER=1"
+
+        result = _merge_env_updates(content, {"FRED_API_KEY": "new", "COINGECKO_API_KEY": "cg"})
+
+        assert result == "# comment\nFRED_API_KEY=new\n\nOTHER=1\nCOINGECKO_API_KEY=cg\n"
+
+    def test_prefix_keys_untouched(self):
+        """Test keys sharing a prefix or commented out are not rewritten"""
+        content = "FRED_API_KEY_OLD=x\n# FRED_API_KEY=y\n"
+
+        result = _merge_env_updates(content, {"FRED_API_KEY": "z"})
+
+        assert result == "FRED_API_KEY_OLD=x\n# FRED_API_KEY=y\nFRED_API_KEY=z\n"
@@ -0,0 +1,84 @@
+"""
+Unit tests for api.portfolio_endpoints helpers and /portfolio/bundle.
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.portfolio_endpoints as pe
+from api.deps import get_active_user
+
+
+class TestComputeAlerts:
+    """Tests for _compute_alerts()"""
+
+    def test_levels_and_actions(self):
+        """Test drift levels and buy/sell actions per group"""
+        metrics = {"total_value_usd": 1000, "group_distribution": {"BTC": 600, "ETH": 100}}
+
+        result = pe._compute_alerts(metrics, drift_threshold=10.0)
+        by_group = {a["group"]: a for a in result["alerts"]}
+
+        assert by_group["BTC"]["level"] == "critical"
+        assert by_group["BTC"]["action"] == "sell"
+        assert by_group["BTC"]["action_amount"] == 250.0
+        assert by_group["ETH"]["level"] == "warning"
+        assert by_group["ETH"]["action"] == "buy"
+        assert result["status"] == "critical"
+        assert result["max_drift"] == 25.0
+
+    def test_empty_metrics(self):
+        """Test empty portfolio does not divide by zero"""
+        result = pe._compute_alerts({"total_value_usd": 0, "group_distribution": {}}, 10.0)
+
+        assert all(a["current_pct"] == 0 for a in result["alerts"])
+
+
+class TestPortfolioBundle:
+    """Tests for GET /portfolio/bundle"""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.include_router(pe.router)
+        app.dependency_overrides[get_active_user] = lambda: "demo"
+        return TestClient(app)
+
+    def test_bundle_resolves_balances_once(self, client):
+        """Test metrics, performance and alerts share one balance resolution"""
+        resolve = AsyncMock(return_value={
+            "source_used": "cointracking",
+            "items": [{"symbol": "BTC", "value_usd": 700.0}, {"symbol": "ETH", "value_usd": 300.0}],
+        })
+        with patch.object(pe, "_get_resolve_balances", return_value=resolve), \
+             patch.object(pe.portfolio_analytics, "calculate_performance_metrics", return_value={"ok": True}):
+            response = client.get("/portfolio/bundle")
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert resolve.await_count == 1
+        assert data["metrics"]["total_value_usd"] == 1000.0
+        assert data["performance"] == {"ok": True}
+        assert data["alerts"]["alerts"]
+
+
+class TestCalculateMetrics:
+    """Tests for _calculate_metrics() thread dispatch"""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop(self):
+        """Test metrics are computed in a worker thread, not on the loop thread"""
+        import threading
+
+        loop_thread = threading.get_ident()
+        seen = []
+
+        def calc(balances):
+            seen.append(threading.get_ident())
+            return {"ok": 1}
+
+        with patch.object(pe.portfolio_analytics, "calculate_portfolio_metrics", side_effect=calc):
+            assert await pe._calculate_metrics({"items": [{"symbol": "BTC"}]}) == {"ok": 1}
+
+        assert seen and seen[0] != loop_thread
@@ -0,0 +1,38 @@
+"""
+Unit tests for api.rebalancing_strategy_router (precomputed static payloads).
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.rebalancing_strategy_router as rsr
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(rsr.router)
+    return TestClient(app)
+
+
+class TestStrategyEndpoints:
+    """Tests for /strategies/list and /strategies/{id}"""
+
+    def test_list_serves_all_strategies_with_etag(self, client):
+        """Test list payload and conditional 304 on matching ETag"""
+        response = client.get("/strategies/list")
+
+        assert response.status_code == 200
+        ids = [s["id"] for s in response.json()["strategies"]]
+        assert ids == list(rsr.REBALANCING_STRATEGIES)
+
+        etag = response.headers["ETag"]
+        assert client.get("/api/strategies/list", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_details_and_unknown_id(self, client):
+        """Test per-strategy payload and 404 for unknown ids"""
+        response = client.get("/api/strategies/balanced")
+
+        assert response.status_code == 200
+        assert response.json()["strategy"]["allocations"] == rsr.REBALANCING_STRATEGIES["balanced"]["allocations"]
+        assert client.get("/strategies/unknown").status_code == 404
@@ -0,0 +1,52 @@
+"""
+Unit tests for workers.rq_worker startup helpers.
+"""
+import json
+import threading
+
+import pytest
+
+import services.user_secrets as us
+from workers import rq_worker
+
+
+@pytest.fixture
+def users_tree(tmp_path, monkeypatch):
+    """Project tree with four users as current working directory"""
+    (tmp_path / "config").mkdir()
+    for i in range(4):
+        user_dir = tmp_path / "data" / "users" / f"user{i}"
+        user_dir.mkdir(parents=True)
+        (user_dir / "secrets.json").write_text(json.dumps({"dev_mode": {"enabled": False}}), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(us, "_manager", None)
+    yield tmp_path
+    us._manager = None
+
+
+class TestWarmUserSecrets:
+    """Tests for warm_user_secrets()"""
+
+    def test_loads_run_in_parallel(self, users_tree, monkeypatch):
+        """Test every user is loaded and the file loads overlap"""
+        barrier = threading.Barrier(4, timeout=2)
+        broken = []
+        real_loads = us._loads
+
+        def loads(raw):
+            try:
+                barrier.wait()  # only passes if all four loads are in flight together
+            except threading.BrokenBarrierError:
+                broken.append(raw)
+            return real_loads(raw)
+
+        monkeypatch.setattr(us, "_loads", loads)
+
+        assert rq_worker.warm_user_secrets(max_workers=4) == 4
+        assert broken == []
+        assert {f"user{i}" for i in range(4)} <= set(us._get_manager()._fresh)
+
+    def test_disabled(self, users_tree):
+        """Test RQ_WARM_SECRETS_THREADS=0 skips the warm-up"""
+        assert rq_worker.warm_user_secrets(max_workers=0) == 0
+        assert us._manager is None
@@ -81,6 +81,18 @@ class TestUtils:
         assert result[0]["symbol"] == "BTC"
         assert result[1]["symbol"] == "ETH"
 
+    def test_to_rows_pre_normalizes_fields(self):
+        """to_rows should upper-case symbols and coerce numeric fields once"""
+        from api.services.utils import to_rows
+
+        result = to_rows([{"symbol": "btc", "value_usd": "100.5", "amount": "2"}, {"coin": "eth"}])
+
+        assert result[0]["symbol"] == "BTC"
+        assert result[0]["value_usd"] == 100.5
+        assert result[0]["amount"] == 2.0
+        assert result[1]["value_usd"] == 0.0
+        assert result[1]["amount"] is None
+
     def test_norm_primary_symbols_with_string(self):
         """norm_primary_symbols should parse comma-separated strings"""
         from api.services.utils import norm_primary_symbols
@@ -189,6 +201,68 @@ class TestCSVHelpers:
         assert "BTC,BUY,1000.00" in lines[1]
 
 
+    def test_to_csv_quotes_fields_with_commas(self):
+        """to_csv should quote fields that contain the delimiter"""
+        from api.services.csv_helpers import to_csv
+
+        result = to_csv([{"alias": "Wrapped, BTC", "symbol": "WBTC", "action": "SELL", "usd": -10}])
+
+        assert result.split("\n")[1] == ',"Wrapped, BTC",WBTC,SELL,-10.00,,,'
+
+    def test_iter_csv_streams_in_chunks(self):
+        """iter_csv should yield several chunks matching to_csv output"""
+        from api.services.csv_helpers import iter_csv, to_csv
+
+        actions = [{"symbol": "BTC", "action": "BUY", "usd": i} for i in range(25)]
+        chunks = list(iter_csv(actions, chunk_rows=10))
+
+        assert len(chunks) == 3
+        assert "".join(chunks) == to_csv(actions) + "\n"
+
+    @pytest.mark.asyncio
+    async def test_load_csv_balances_column_fallback(self, tmp_path):
+        """load_csv_balances should fall back to the next column when a cell is empty"""
+        from api.services.csv_helpers import load_csv_balances
+
+        csv_file = tmp_path / "balances.csv"
+        csv_file.write_text(
+            "Ticker;Currency;Amount;Value in USD;Value;Exchange\n"
+            "btc;;0,5;30000;;Kraken\n"
+            ";eth;2;;6000;\n"
+            "sol;;0;100;;Binance\n",
+            encoding="utf-8",
+        )
+
+        items = await load_csv_balances(str(csv_file))
+
+        assert items == [
+            {"symbol": "BTC", "alias": "BTC", "amount": 0.5, "value_usd": 30000.0, "location": "Kraken"},
+            {"symbol": "ETH", "alias": "ETH", "amount": 2.0, "value_usd": 6000.0, "location": "CoinTracking"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_load_csv_balances_uses_parquet_mirror(self, tmp_path):
+        """load_csv_balances should serve a fresh Parquet mirror and ignore a stale one"""
+        pytest.importorskip("pyarrow")
+        import os
+        from api.services.csv_helpers import load_csv_balances
+
+        csv_file = tmp_path / "balances.csv"
+        csv_file.write_text("Ticker,Amount,Value in USD\nBTC,1,50000\n", encoding="utf-8")
+
+        first = await load_csv_balances(str(csv_file))
+        mirror = tmp_path / "balances.csv.parquet"
+        assert mirror.exists()
+        assert await load_csv_balances(str(csv_file)) == first
+
+        # CSV plus récent que le miroir -> reparse
+        csv_file.write_text("Ticker,Amount,Value in USD\nETH,2,6000\n", encoding="utf-8")
+        stat = mirror.stat()
+        os.utime(csv_file, (stat.st_atime, stat.st_mtime + 10))
+        items = await load_csv_balances(str(csv_file))
+        assert [it["symbol"] for it in items] == ["ETH"]
+
+
 class TestCointrackingHelpers:
     """Tests for api/services/cointracking_helpers.py"""
 
@@ -205,6 +279,26 @@ class TestCointrackingHelpers:
         assert result_binance in [0, 1, 2, 3]
         assert result_kraken in [0, 1, 2, 3]
 
+    def test_classify_location_is_case_insensitive(self):
+        """classify_location should match labels regardless of casing/suffixes"""
+        from api.services.cointracking_helpers import classify_location
+
+        assert classify_location("okx") == 0
+        assert classify_location("binance balance") == 0
+        assert classify_location("Uniswap") == 1
+        assert classify_location("Ledger Wallets") == 2
+        assert classify_location("Some Random Place") == 3
+
+    def test_normalize_loc_uses_canonical_casing(self):
+        """normalize_loc should keep canonical casing for known exchanges"""
+        from api.services.cointracking_helpers import normalize_loc
+
+        assert normalize_loc("okx") == "OKX"
+        assert normalize_loc("kucoin_balance") == "KuCoin"
+        assert normalize_loc("Ledger Wallets") == "Ledger"
+        assert normalize_loc("my-custom exchange") == "My Custom Exchange"
+        assert normalize_loc("") == "Unknown"
+
     def test_pick_primary_location_for_symbol(self):
         """pick_primary_location_for_symbol should find highest value exchange"""
         from api.services.cointracking_helpers import pick_primary_location_for_symbol
@@ -232,6 +326,17 @@ class TestCointrackingHelpers:
         # Unknown symbol returns default
         assert pick_primary_location_for_symbol("XRP", detailed_holdings) == "CoinTracking"
 
+    def test_build_primary_location_index(self):
+        """build_primary_location_index should keep the best exchange per symbol"""
+        from api.services.cointracking_helpers import build_primary_location_index
+
+        index = build_primary_location_index({
+            "Binance": [{"symbol": "BTC", "value_usd": 50000}, {"symbol": "DUST", "value_usd": 0}],
+            "Kraken": [{"symbol": "BTC", "value_usd": 10000}, {"symbol": "ETH", "value_usd": 5000}],
+        })
+
+        assert index == {"BTC": ("Binance", 50000.0), "ETH": ("Kraken", 5000.0)}
+
     def test_pick_primary_location_empty_holdings(self):
         """pick_primary_location_for_symbol should handle empty holdings"""
         from api.services.cointracking_helpers import pick_primary_location_for_symbol
@@ -239,6 +344,60 @@ class TestCointrackingHelpers:
         assert pick_primary_location_for_symbol("BTC", {}) == "CoinTracking"
         assert pick_primary_location_for_symbol("BTC", None) == "CoinTracking"
 
+    @pytest.mark.asyncio
+    async def test_load_ctapi_exchanges_memoizes_snapshot(self):
+        """load_ctapi_exchanges should hit CT-API once per TTL window"""
+        from unittest.mock import AsyncMock, patch
+        from api.services import cointracking_helpers
+
+        cointracking_helpers._SNAP_CACHE.clear()
+        payload = {
+            "exchanges": [{"location": "Binance", "total_value_usd": 100.0, "asset_count": 1, "assets": []}],
+            "detailed_holdings": {"Binance": [{"symbol": "BTC", "value_usd": 100.0}]},
+        }
+        with patch(
+            "connectors.cointracking_api.get_balances_by_exchange_via_api",
+            new_callable=AsyncMock, return_value=payload,
+        ) as mock_api:
+            first = await cointracking_helpers.load_ctapi_exchanges(min_usd=0.0)
+            second = await cointracking_helpers.load_ctapi_exchanges(min_usd=0.0)
+            await cointracking_helpers.load_ctapi_exchanges(min_usd=0.0, api_key="other-user-key")
+
+        assert first is second
+        assert mock_api.await_count == 2
+        cointracking_helpers._SNAP_CACHE.clear()
+
+    @pytest.mark.asyncio
+    async def test_load_ctapi_exchanges_min_usd_regroups_by_location(self):
+        """load_ctapi_exchanges should filter assets and recompute exchange totals"""
+        from unittest.mock import AsyncMock, patch
+        from api.services import cointracking_helpers
+
+        cointracking_helpers._SNAP_CACHE.clear()
+        payload = {
+            "exchanges": [],
+            "detailed_holdings": {
+                "Kraken": [{"symbol": "ETH", "value_usd": 20.0}, {"symbol": "DOGE", "value_usd": 1.0},
+                           {"symbol": "BTC", "value_usd": 80.0}],
+                "Ledger": [{"symbol": "SHIB", "value_usd": 2.0}],
+                "Binance": [{"symbol": "SOL", "value_usd": 150.0}],
+            },
+        }
+        with patch(
+            "connectors.cointracking_api.get_balances_by_exchange_via_api",
+            new_callable=AsyncMock, return_value=payload,
+        ):
+            result = await cointracking_helpers.load_ctapi_exchanges(min_usd=5.0)
+
+        assert list(result["detailed_holdings"]) == ["Kraken", "Binance"]
+        assert [a["symbol"] for a in result["detailed_holdings"]["Kraken"]] == ["ETH", "BTC"]
+        assert [e["location"] for e in result["exchanges"]] == ["Binance", "Kraken"]
+        kraken = result["exchanges"][1]
+        assert kraken["total_value_usd"] == 100.0
+        assert kraken["asset_count"] == 2
+        assert [a["symbol"] for a in kraken["assets"]] == ["BTC", "ETH"]
+        cointracking_helpers._SNAP_CACHE.clear()
+
 
 class TestLocationAssigner:
     """Tests for api/services/location_assigner.py"""
@@ -362,6 +521,25 @@ class TestPriceEnricher:
         assert result["actions"][1]["price_source"] == "local"
         assert abs(result["actions"][1]["est_quantity"] - 0.16666) < 0.001  # 500/3000 = 0.166...
 
+    @pytest.mark.asyncio
+    async def test_get_market_prices_fetches_only_uncached_symbols(self):
+        """get_market_prices should batch-fetch only symbols missing from the cache"""
+        from unittest.mock import AsyncMock, patch
+        from api.services import price_enricher
+
+        price_enricher._PRICE_CACHE.clear()
+        with patch("services.pricing.aget_prices_usd", new_callable=AsyncMock) as mock_prices:
+            mock_prices.return_value = {"BTC": 50000.0, "ETH": None}
+            first = await price_enricher.get_market_prices({"BTC", "ETH"})
+
+            mock_prices.return_value = {"SOL": 150.0}
+            second = await price_enricher.get_market_prices(["BTC", "SOL"])
+
+        assert first == {"BTC": 50000.0}
+        assert second == {"BTC": 50000.0, "SOL": 150.0}
+        assert mock_prices.await_args_list[1].args[0] == ["SOL"]
+        price_enricher._PRICE_CACHE.clear()
+
     @pytest.mark.asyncio
     async def test_enrich_actions_adds_metadata(self):
         """enrich_actions_with_prices should add pricing metadata"""
@@ -0,0 +1,383 @@
+"""
+Unit tests for services.user_secrets (UserSecretsManager).
+
+Each test runs in a temporary working directory with its own
+config/ and data/users/ trees.
+"""
+import json
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+from services.user_secrets import UserSecretsManager
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Empty project tree as current working directory"""
+    (tmp_path / "config").mkdir()
+    (tmp_path / "data" / "users").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write_user_secrets(root, user_id, payload):
+    path = root / "data" / "users" / user_id / "secrets.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    return path
+
+
+class TestGetUserSecrets:
+    """Tests for UserSecretsManager.get_user_secrets()"""
+
+    def test_user_file_is_cached_until_mtime_changes(self, workdir):
+        """Test cached secrets are reused until the file is rewritten"""
+        path = write_user_secrets(workdir, "alice", {"coingecko": {"api_key": "k1"}})
+        manager = UserSecretsManager()
+
+        first = manager.get_user_secrets("alice")
+        assert manager.get_user_secrets("alice") is first
+
+        path.write_text(json.dumps({"coingecko": {"api_key": "k2"}}), encoding="utf-8")
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert manager.get_user_secrets("alice")["coingecko"]["api_key"] == "k2"
+
+    def test_missing_user_falls_back_to_dev_mode(self, workdir):
+        """Test users without secrets.json get dev-mode secrets"""
+        manager = UserSecretsManager()
+
+        assert manager.is_dev_mode("nobody") is True
+        assert manager.get_exchange_config("nobody") == {"api_key": "", "api_secret": "", "testnet": True}
+
+    def test_new_user_file_replaces_fallback(self, workdir):
+        """Test a secrets.json created after a fallback is picked up"""
+        manager = UserSecretsManager()
+        assert manager.is_dev_mode("bob") is True
+
+        write_user_secrets(workdir, "bob", {"dev_mode": {"enabled": False}})
+
+        assert manager.is_dev_mode("bob") is False
+
+    def test_example_file_enables_dev_mode(self, workdir):
+        """Test config/secrets_example.json is used with dev_mode forced on"""
+        example = {"dev_mode": {"enabled": False}, "exchanges": {"default": "kraken"}, "kraken": {"api_key": "ex"}}
+        (workdir / "config" / "secrets_example.json").write_text(json.dumps(example), encoding="utf-8")
+        manager = UserSecretsManager()
+
+        assert manager.is_dev_mode("carol") is True
+        assert manager.get_exchange_config("carol") == {"api_key": "ex"}
+        # Le template chargé une fois n'est pas modifié par le fallback
+        assert manager._example_template["dev_mode"]["enabled"] is False
+
+    def test_empty_fallback_is_shared_and_read_only(self, workdir):
+        """Test the ultimate fallback is one shared, immutable mapping"""
+        manager = UserSecretsManager()
+
+        first = manager.get_user_secrets("u1")
+        assert manager.get_user_secrets("u2") is first
+        with pytest.raises(TypeError):
+            first["dev_mode"]["enabled"] = False
+
+    def test_concurrent_first_load_parses_once(self, workdir, monkeypatch):
+        """Test concurrent callers share a single parse of the user file"""
+        from concurrent.futures import ThreadPoolExecutor
+        import services.user_secrets as us
+
+        write_user_secrets(workdir, "dave", {"dev_mode": {"enabled": False}})
+        calls = []
+        real_loads = us._loads
+        monkeypatch.setattr(us, "_loads", lambda b: calls.append(b) or real_loads(b))
+        manager = UserSecretsManager()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(manager.get_user_secrets, ["dave"] * 32))
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+
+    def test_slow_load_does_not_block_other_users(self, workdir, monkeypatch):
+        """Test a miss only locks its own user; cached users stay lock-free"""
+        import threading
+        import services.user_secrets as us
+
+        write_user_secrets(workdir, "fast", {"dev_mode": {"enabled": False}})
+        write_user_secrets(workdir, "slow", {"dev_mode": {"enabled": False}})
+        manager = UserSecretsManager()
+        assert manager.is_dev_mode("fast") is False
+
+        entered, release = threading.Event(), threading.Event()
+        real_loads = us._loads
+
+        def blocking_loads(raw):
+            entered.set()
+            release.wait(5)
+            return real_loads(raw)
+
+        monkeypatch.setattr(us, "_loads", blocking_loads)
+        slow = threading.Thread(target=manager.is_dev_mode, args=("slow",))
+        slow.start()
+        try:
+            assert entered.wait(5)
+            # the manager-wide lock is free during the disk read
+            assert manager._lock.acquire(blocking=False)
+            manager._lock.release()
+            assert manager.is_dev_mode("fast") is False
+        finally:
+            release.set()
+            slow.join(5)
+
+    def test_utf8_bom_is_accepted(self, workdir):
+        """Test secrets saved with a UTF-8 BOM still parse"""
+        path = write_user_secrets(workdir, "erin", {})
+        path.write_bytes(b"\xef\xbb\xbf" + json.dumps({"coingecko": {"api_key": "bom"}}).encode())
+        manager = UserSecretsManager()
+
+        assert manager.get_user_secrets("erin")["coingecko"]["api_key"] == "bom"
+
+
+class TestDerivedValues:
+    """Tests for get_secrets_view() / get_exchange_config() / is_dev_mode()"""
+
+    def test_derived_values_follow_file_changes(self, workdir):
+        """Test memoized exchange config and dev mode refresh on new mtime"""
+        path = write_user_secrets(workdir, "frank", {
+            "dev_mode": {"enabled": True}, "exchanges": {"default": "kraken"}, "kraken": {"api_key": "a"},
+        })
+        manager = UserSecretsManager()
+
+        first = manager.get_exchange_config("frank")
+        assert first == {"api_key": "a"}
+        assert manager.get_exchange_config("frank") is first
+        assert manager.is_dev_mode("frank") is True
+
+        path.write_text(json.dumps({"dev_mode": {"enabled": False}, "kraken": {"api_key": "b"}}), encoding="utf-8")
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert manager.get_exchange_config("frank", "kraken") == {"api_key": "b"}
+        assert manager.get_exchange_config("frank") == {}
+        assert manager.is_dev_mode("frank") is False
+
+    def test_view_is_read_only(self, workdir):
+        """Test typed view exposes frozen sections and keeps the raw mapping"""
+        write_user_secrets(workdir, "gus", {"dev_mode": {"enabled": False}, "binance": {"api_key": "k"}})
+        view = UserSecretsManager().get_secrets_view("gus")
+
+        assert view.dev_mode_enabled is False
+        assert view.default_exchange == "binance"
+        assert view.raw["binance"]["api_key"] == "k"
+        with pytest.raises(TypeError):
+            view.exchanges["binance"]["api_key"] = "other"
+
+
+class TestDemoFastPath:
+    """Tests for the eagerly loaded "demo" entry"""
+
+    def test_demo_loaded_at_init_and_refreshed(self, workdir):
+        """Test demo is loaded once at init and reloaded when its file changes"""
+        path = write_user_secrets(workdir, "demo", {"dev_mode": {"enabled": False}})
+        manager = UserSecretsManager()
+        assert "demo" in manager._fresh
+
+        with patch.object(manager, "_load_secrets", side_effect=AssertionError("reloaded")):
+            assert manager.is_dev_mode() is False
+
+        path.write_text(json.dumps({"dev_mode": {"enabled": True}}), encoding="utf-8")
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert manager.is_dev_mode() is True
+
+
+class TestListUsersWithSecrets:
+    """Tests for list_users_with_secrets()"""
+
+    def test_only_users_with_secrets_file(self, workdir):
+        """Test directories without secrets.json and stray files are skipped"""
+        write_user_secrets(workdir, "alice", {})
+        write_user_secrets(workdir, "bob", {})
+        (workdir / "data" / "users" / "carol").mkdir()
+        (workdir / "data" / "users" / "notes.txt").write_text("x", encoding="utf-8")
+
+        assert UserSecretsManager().list_users_with_secrets() == {"alice", "bob"}
+
+    def test_missing_data_dir(self, tmp_path, monkeypatch):
+        """Test a missing data/users directory yields no users"""
+        monkeypatch.chdir(tmp_path)
+
+        assert UserSecretsManager().list_users_with_secrets() == frozenset()
+
+
+class TestModuleSingleton:
+    """Tests for the lazily created module-level manager"""
+
+    def test_manager_created_once_on_first_access(self, monkeypatch):
+        """Test user_secrets_manager is built on demand and reused"""
+        import services.user_secrets as us
+
+        monkeypatch.setattr(us, "_manager", None)
+        from services.user_secrets import user_secrets_manager
+
+        assert isinstance(user_secrets_manager, UserSecretsManager)
+        assert us.user_secrets_manager is user_secrets_manager
+        assert us._get_manager() is user_secrets_manager
+
+
+class TestRequestScope:
+    """Tests for the per-request secrets memo"""
+
+    def test_scope_skips_stat_within_request(self, workdir, monkeypatch):
+        """Test repeated lookups in one scope stat the file once"""
+        import services.user_secrets as us
+
+        write_user_secrets(workdir, "gina", {"coingecko": {"api_key": "g"}})
+        manager = UserSecretsManager()
+        stats = []
+        real_stat = os.stat
+        monkeypatch.setattr(us.os, "stat", lambda p, *a, **k: stats.append(p) or real_stat(p, *a, **k))
+
+        token = us.begin_request_scope()
+        try:
+            first = manager.get_user_secrets("gina")
+            assert manager.get_user_secrets("gina") is first
+            assert manager.is_dev_mode("gina") is False
+        finally:
+            us.end_request_scope(token)
+
+        assert len(stats) == 1
+        manager.get_user_secrets("gina")
+        assert len(stats) == 2
+
+    def test_middleware_opens_scope(self):
+        """Test the API middleware exposes a memo to the endpoint"""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        import services.user_secrets as us
+        from api.middlewares import UserSecretsScopeMiddleware
+
+        app = FastAPI()
+        app.add_middleware(UserSecretsScopeMiddleware)
+
+        @app.get("/probe")
+        async def probe():
+            return {"scoped": us._request_secrets.get() is not None}
+
+        @app.get("/probe-sync")
+        def probe_sync():
+            return {"scoped": us._request_secrets.get() is not None}
+
+        client = TestClient(app)
+        assert client.get("/probe").json() == {"scoped": True}
+        assert client.get("/probe-sync").json() == {"scoped": True}
+        assert us._request_secrets.get() is None
+
+
+class TestClearCache:
+    """Tests for clear_cache()"""
+
+    def test_user_clear_keeps_other_entries(self, workdir):
+        """Test clearing one user reloads only that user"""
+        write_user_secrets(workdir, "kim", {"dev_mode": {"enabled": False}})
+        write_user_secrets(workdir, "lee", {"dev_mode": {"enabled": False}})
+        manager = UserSecretsManager()
+        kim = manager.get_user_secrets("kim")
+        lee = manager.get_user_secrets("lee")
+
+        manager.clear_cache("kim")
+
+        assert manager.get_user_secrets("lee") is lee
+        assert manager.get_user_secrets("kim") is not kim
+
+
+class TestCacheBounds:
+    """Tests for USER_SECRETS_CACHE_MAX"""
+
+    def test_caches_are_bounded(self, workdir, monkeypatch):
+        """Test the secrets cache stays within the configured size"""
+        monkeypatch.setenv("USER_SECRETS_CACHE_MAX", "3")
+        manager = UserSecretsManager()
+
+        for i in range(10):
+            manager.is_dev_mode(f"user{i}")
+
+        assert len(manager._fresh) == 3
+        assert list(manager._fresh) == [f"user{i}" for i in (7, 8, 9)]
+
+
+class TestLoadJsonFile:
+    """Tests for _load_json_file()"""
+
+    @pytest.mark.parametrize("bom", [b"", b"\xef\xbb\xbf"])
+    def test_mmap_path_matches_read_path(self, tmp_path, monkeypatch, bom):
+        """Test the mmap branch parses like the buffered read branch"""
+        import services.user_secrets as us
+
+        path = tmp_path / "secrets.json"
+        payload = {"kraken": {"api_key": "x" * 100}}
+        path.write_bytes(bom + json.dumps(payload).encode())
+
+        small = us._load_json_file(str(path))
+        monkeypatch.setattr(us, "_MMAP_MIN_SIZE", 0)
+
+        assert us._load_json_file(str(path)) == small == payload
+
+    def test_fadvise_sequential_then_dontneed(self, tmp_path, monkeypatch):
+        """Test page cache hints wrap the read when posix_fadvise exists"""
+        import services.user_secrets as us
+
+        if not hasattr(os, "posix_fadvise"):
+            pytest.skip("posix_fadvise unavailable")
+        path = tmp_path / "secrets.json"
+        path.write_text('{"a": 1}')
+        calls = []
+        monkeypatch.setattr(os, "posix_fadvise", lambda fd, off, length, advice: calls.append(advice))
+
+        assert us._load_json_file(str(path)) == {"a": 1}
+        assert calls == [os.POSIX_FADV_SEQUENTIAL, os.POSIX_FADV_DONTNEED]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+class TestSecretsWatcher:
+    """Tests for USER_SECRETS_WATCH push invalidation"""
+
+    def _wait_for(self, predicate, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_disabled_by_default(self, workdir):
+        """Test stat polling is kept unless USER_SECRETS_WATCH=1"""
+        manager = UserSecretsManager()
+
+        assert manager._watcher is None
+        assert manager._known_mtimes is None
+
+    def test_events_invalidate_known_mtimes(self, workdir, monkeypatch):
+        """Test steady state skips stat() and file changes are pushed by inotify"""
+        monkeypatch.setenv("USER_SECRETS_WATCH", "1")
+        write_user_secrets(workdir, "hank", {"dev_mode": {"enabled": False}})
+        manager = UserSecretsManager()
+        assert manager._watcher is not None
+        try:
+            assert manager.is_dev_mode("hank") is False
+            with patch("services.user_secrets.os.stat", side_effect=AssertionError("stat called")):
+                assert manager.is_dev_mode("hank") is False
+
+            write_user_secrets(workdir, "hank", {"dev_mode": {"enabled": True}})
+            assert self._wait_for(lambda: manager.is_dev_mode("hank") is True)
+
+            # User directory created after the watcher started
+            assert manager.is_dev_mode("ivy") is True
+            write_user_secrets(workdir, "ivy", {"dev_mode": {"enabled": False}})
+            assert self._wait_for(lambda: manager.is_dev_mode("ivy") is False)
+        finally:
+            manager._watcher.close()
@@ -0,0 +1,73 @@
+"""
+Unit tests for api.utils.cache module.
+
+Tests TTL cache helpers and ETag helpers.
+"""
+import pytest
+
+from api.utils.cache import (
+    cache_get,
+    cache_set,
+    cache_clear_expired,
+    compute_etag,
+    etag_matches,
+)
+
+
+class TestCacheHelpers:
+    """Tests for cache_get() / cache_set() / cache_clear_expired()"""
+
+    def test_cache_roundtrip(self):
+        """Test value is returned until TTL expires"""
+        cache = {}
+        cache_set(cache, "k", {"v": 1})
+
+        assert cache_get(cache, "k", ttl=60) == {"v": 1}
+        assert cache_get(cache, "k", ttl=0) is None
+        assert cache_get(cache, "missing", ttl=60) is None
+
+    def test_cache_set_maxsize_evicts_oldest(self):
+        """Test maxsize bound evicts in insertion order"""
+        cache = {}
+        for key in ("a", "b", "c"):
+            cache_set(cache, key, key, maxsize=2)
+
+        assert list(cache) == ["b", "c"]
+
+        # Re-setting a key refreshes its position
+        cache_set(cache, "b", "b2", maxsize=2)
+        cache_set(cache, "d", "d", maxsize=2)
+        assert list(cache) == ["b", "d"]
+
+    def test_cache_clear_expired(self):
+        """Test expired entries are removed"""
+        cache = {}
+        cache_set(cache, "k", 1)
+        cache_clear_expired(cache, ttl=0)
+
+        assert cache == {}
+
+
+class TestEtagHelpers:
+    """Tests for compute_etag() / etag_matches()"""
+
+    def test_compute_etag_is_weak_and_stable(self):
+        """Test same payload yields same weak ETag"""
+        etag = compute_etag(b'{"items":[]}')
+
+        assert etag.startswith('W/"')
+        assert etag == compute_etag(b'{"items":[]}')
+        assert etag != compute_etag(b'{"items":[1]}')
+
+    @pytest.mark.parametrize("header", [None, "", '"other"'])
+    def test_etag_matches_rejects(self, header):
+        """Test missing or different If-None-Match does not match"""
+        assert not etag_matches(header, compute_etag(b"x"))
+
+    def test_etag_matches_accepts_list_strong_and_wildcard(self):
+        """Test weak comparison over a header list"""
+        etag = compute_etag(b"x")
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"nope", {etag.removeprefix("W/")}', etag)
+        assert etag_matches("*", etag)
@@ -1,12 +1,84 @@
 import os
-from rq import Connection, Worker
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from rq import SimpleWorker, Worker
 from redis import Redis
+from redis.connection import ConnectionPool
 
 redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-conn = Redis.from_url(redis_url)
+
+# Keepalive TCP : le worker garde sa connexion des heures, souvent inactive
+# (BRPOP) ; sans keepalive un NAT/LB peut la couper silencieusement.
+_KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, name)  # options absentes sous Windows/macOS
+}
+
+
+def make_redis_connection(url: str) -> Redis:
+    """Redis sur un pool partagé ; unix:// passe par le socket local (pas de TCP)"""
+    if url.startswith("unix://"):
+        pool = ConnectionPool.from_url(url, health_check_interval=30)
+    else:
+        pool = ConnectionPool.from_url(
+            url,
+            socket_keepalive=True,
+            socket_keepalive_options=_KEEPALIVE_OPTIONS,
+            health_check_interval=30,
+            retry_on_timeout=True,
+        )
+    return Redis(connection_pool=pool)
+
+
+conn = make_redis_connection(redis_url)
+
+# SimpleWorker exécute les jobs dans le process (pas de fork() par job).
+# RQ_FORK_PER_JOB=1 rétablit l'isolation d'un fork par job (jobs qui fuient
+# de la mémoire ou peuvent crasher l'interpréteur).
+WORKER_CLASS = Worker if os.getenv("RQ_FORK_PER_JOB", "0") == "1" else SimpleWorker
+
+# Files écoutées (ordre = priorité) et nombre de workers. Avec plusieurs workers,
+# WorkerPool lance un process par worker : les dequeues se font en parallèle
+# au lieu d'un seul BRPOP à la fois.
+QUEUES = [q.strip() for q in os.getenv("RQ_QUEUES", "default").split(",") if q.strip()]
+NUM_WORKERS = max(1, int(os.getenv("RQ_NUM_WORKERS", str(os.cpu_count() or 1))))
+
+# Threads de préchauffage des secrets au démarrage (0 = désactivé)
+WARM_SECRETS_THREADS = max(0, int(os.getenv("RQ_WARM_SECRETS_THREADS", "8")))
+
+
+def warm_user_secrets(max_workers: int = WARM_SECRETS_THREADS) -> int:
+    """
+    Charge les secrets de tous les utilisateurs de data/users avant le premier job.
+
+    Travail I/O : des threads suffisent, et le manager ne verrouille que
+    l'utilisateur en cours de chargement, donc les lectures se recouvrent.
+    Appelé avant WorkerPool.start(), le cache est hérité par les workers forkés.
+    """
+    if max_workers <= 0:
+        return 0
+    from services.user_secrets import _get_manager
+
+    manager = _get_manager()
+    users = manager.list_users_with_secrets()
+    if users:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="secrets-warmup") as ex:
+            list(ex.map(manager.get_user_secrets, users))
+    return len(users)
+
 
 if __name__ == "__main__":
-    with Connection(conn):
-        w = Worker(['default'])
-        print("Worker RQ démarré sur", redis_url)
+    warmed = warm_user_secrets()
+    if warmed:
+        print(f"Secrets préchargés pour {warmed} utilisateurs")
+    if NUM_WORKERS > 1:
+        from rq.worker_pool import WorkerPool
+
+        pool = WorkerPool(QUEUES, connection=conn, num_workers=NUM_WORKERS, worker_class=WORKER_CLASS)
+        print(f"Pool RQ de {NUM_WORKERS} workers démarré sur", redis_url, QUEUES)
+        pool.start()
+    else:
+        w = WORKER_CLASS(QUEUES, connection=conn)
+        print("Worker RQ démarré sur", redis_url, QUEUES)
         w.work(with_scheduler=True)